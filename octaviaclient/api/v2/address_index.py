@@ -0,0 +1,127 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Index of the load balancers and pools behind IP addresses"""
+
+import collections
+
+from octaviaclient.api.v2 import concurrency
+
+Match = collections.namedtuple(
+    'Match', ('address', 'kind', 'loadbalancer_id', 'loadbalancer_name',
+              'pool_id', 'pool_name', 'member_id', 'protocol_port'))
+
+
+class AddressIndex(object):
+    """Maps member and VIP addresses to their pools and load balancers"""
+
+    def __init__(self, loadbalancers, pools=(), members=()):
+        """Index objects
+
+        :param loadbalancers:
+            Load balancer ``dict``
+        :param pools:
+            Pool ``dict``
+        :param members:
+            ``(pool_id, member)`` tuples
+        """
+        self.errors = {}
+        self._loadbalancers = dict((lb['id'], lb) for lb in loadbalancers)
+        self._pools = dict((pool['id'], pool) for pool in pools)
+        self._vips = collections.defaultdict(list)
+        for lb in self._loadbalancers.values():
+            self._vips[lb.get('vip_address')].append(lb)
+        self._members = collections.defaultdict(list)
+        for pool_id, member in members:
+            self._members[member.get('address')].append((pool_id, member))
+
+    @classmethod
+    def from_api(cls, api, member_addresses=None,
+                 max_workers=concurrency.DEFAULT_WORKERS):
+        """Build an index from the list endpoints
+
+        Load balancers and pools are listed at the same time, then the
+        members of every pool having some, ``max_workers`` pools at a time.
+        Pools whose members cannot be listed are kept in :attr:`errors`.
+
+        :param member_addresses:
+            The member addresses to index, ``None`` for all of them. With a
+            single address the members are filtered by the API.
+        """
+        calls = {'loadbalancers': lambda: list(api.load_balancer_iter())}
+        if member_addresses is None or member_addresses:
+            calls['pools'] = lambda: list(api.pool_iter())
+        data = concurrency.gather(calls, max_workers)
+        pools = data.get('pools', [])
+
+        params = {}
+        if member_addresses and len(member_addresses) == 1:
+            params['address'] = member_addresses[0]
+        members = []
+        errors = {}
+        for pool_id, result, error in concurrency.imap_unordered(
+                lambda p: list(api.member_iter(p, **params)),
+                [pool['id'] for pool in pools if pool.get('members')],
+                max_workers):
+            if error:
+                errors[pool_id] = error
+                continue
+            members.extend((pool_id, member) for member in result)
+
+        index = cls(data['loadbalancers'], pools, members)
+        index.errors = errors
+        return index
+
+    @classmethod
+    def from_mirror(cls, mirror, member_addresses=None):
+        """Build an index from a :class:`~octaviaclient.api.v2.mirror.Mirror`
+
+        :param member_addresses:
+            The member addresses to index, ``None`` for all of them
+        """
+        if member_addresses is None:
+            members = mirror.query('members')
+        else:
+            members = [member for address in member_addresses
+                       for member in mirror.query('members', address=address)]
+        pools = mirror.query('pools') if members else []
+        return cls(mirror.query('loadbalancers'), pools,
+                   ((member['pool_id'], member) for member in members))
+
+    def find_vips(self, address):
+        """Find the load balancers with a VIP address
+
+        :return:
+            A list of :class:`Match`
+        """
+        return [Match(address, 'vip', lb['id'], lb.get('name'), None, None,
+                      None, None)
+                for lb in self._vips.get(address, [])]
+
+    def find_members(self, address):
+        """Find the members with an address, with their pool and LB
+
+        :return:
+            A list of :class:`Match`
+        """
+        matches = []
+        for pool_id, member in self._members.get(address, []):
+            pool = self._pools.get(pool_id, {})
+            lb_ids = [ref['id'] for ref in pool.get('loadbalancers') or []]
+            for lb_id in lb_ids or [None]:
+                lb = self._loadbalancers.get(lb_id, {})
+                matches.append(Match(
+                    address, 'member', lb_id, lb.get('name'), pool_id,
+                    pool.get('name'), member['id'],
+                    member.get('protocol_port')))
+        return matches
@@ -0,0 +1,162 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Local index of amphorae by compute ID and load balancer"""
+
+import collections
+import time
+
+from octaviaclient.api.v2 import cache
+from octaviaclient.api.v2 import octavia
+from octaviaclient.api.v2 import records
+
+# Seconds after which the index is rebuilt from scratch rather than
+# refreshed, so that objects removed from the listings are forgotten.
+FULL_REFRESH_INTERVAL = 24 * 3600
+
+INDEX_VERSION = 1
+
+
+class AmphoraIndex(object):
+    """Amphorae indexed by compute ID, load balancer ID and name
+
+    The first :meth:`refresh` lists every amphora and load balancer. Later
+    ones only fetch the changes since the previous refresh, with
+    :meth:`~octaviaclient.api.v2.octavia.OctaviaAPI.changes_since`. When a
+    ``path`` is given the index is kept in that JSON file between processes.
+    """
+
+    def __init__(self, api, path=None, max_age=FULL_REFRESH_INTERVAL):
+        """Create an index
+
+        :param api:
+            The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+        :param string path:
+            Optional JSON file backing the index
+        :param float max_age:
+            Seconds after which the index is rebuilt from scratch
+        """
+        self.api = api
+        self.path = path
+        self.max_age = max_age
+        self._reset()
+        if path:
+            self._load()
+
+    def _reset(self):
+        self.amphorae = {}
+        self.loadbalancers = {}
+        self.amphora_mark = self.loadbalancer_mark = None
+        self.built_at = None
+        self._by_compute_id = self._by_loadbalancer = None
+
+    def refresh(self):
+        """Bring the index up to date with the API"""
+        now = time.time()
+        if self.built_at is None or now - self.built_at > self.max_age:
+            self._reset()
+            self.built_at = now
+        self.amphora_mark = self._update(
+            self.api.amphora_iter, 'amphorae', self.amphorae,
+            self.amphora_mark)
+        self.loadbalancer_mark = self._update(
+            self.api.load_balancer_iter, 'loadbalancers', self.loadbalancers,
+            self.loadbalancer_mark, keys=('id', 'name', 'updated_at',
+                                          'created_at'))
+        self._by_compute_id = self._by_loadbalancer = None
+        self.save()
+
+    def _update(self, iterate, resource, objects, mark, keys=None):
+        # Objects changed at the mark are fetched again: several objects
+        # may have changed within the same second.
+        listing = self.api.changes_since(resource, mark) if mark else iterate()
+        newest = mark
+        for obj in listing:
+            newest = max(newest or '', octavia.changed_at(obj))
+            if obj.get('status', obj.get('provisioning_status')) == 'DELETED':
+                objects.pop(obj['id'], None)
+                continue
+            if keys:
+                obj = dict((k, obj.get(k)) for k in keys)
+            objects[obj['id']] = obj
+        return newest
+
+    def _build(self):
+        if self._by_compute_id is None:
+            by_compute_id = {}
+            by_loadbalancer = collections.defaultdict(list)
+            for amp in self.amphorae.values():
+                if amp.get('compute_id'):
+                    by_compute_id[amp['compute_id']] = amp
+                if amp.get('loadbalancer_id'):
+                    by_loadbalancer[amp['loadbalancer_id']].append(amp)
+            self._by_compute_id = by_compute_id
+            self._by_loadbalancer = by_loadbalancer
+
+    def by_compute_id(self, compute_id):
+        """Find the amphora running on a compute instance
+
+        :return:
+            The amphora ``dict``, or ``None``
+        """
+        self._build()
+        return self._by_compute_id.get(compute_id)
+
+    def find_loadbalancer_ids(self, loadbalancer):
+        """Find the IDs of the load balancers with a name or ID"""
+        if loadbalancer in self.loadbalancers:
+            return [loadbalancer]
+        return [lb['id'] for lb in self.loadbalancers.values()
+                if lb.get('name') == loadbalancer]
+
+    def by_loadbalancer(self, loadbalancer):
+        """Find the amphorae of a load balancer
+
+        :param string loadbalancer:
+            Name or ID of the load balancer
+        :return:
+            A list of amphora ``dict``
+        """
+        self._build()
+        amphorae = []
+        for lb_id in self.find_loadbalancer_ids(loadbalancer):
+            amphorae.extend(self._by_loadbalancer.get(lb_id, []))
+        return amphorae
+
+    def __len__(self):
+        return len(self.amphorae)
+
+    def _load(self):
+        data = cache.load_json(self.path)
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return
+        self.amphorae = data['amphorae']
+        self.loadbalancers = data['loadbalancers']
+        self.amphora_mark = data['amphora_mark']
+        self.loadbalancer_mark = data['loadbalancer_mark']
+        self.built_at = data['built_at']
+
+    def save(self):
+        """Write the index to its file, if it has one"""
+        if not self.path:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            # Listings may return records, which json cannot write
+            'amphorae': records.to_builtin(self.amphorae),
+            'loadbalancers': records.to_builtin(self.loadbalancers),
+            'amphora_mark': self.amphora_mark,
+            'loadbalancer_mark': self.loadbalancer_mark,
+            'built_at': self.built_at,
+        }
+        cache.save_json(self.path, data)
@@ -0,0 +1,210 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Client side caches"""
+
+import collections
+import errno
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+LOG = logging.getLogger(__name__)
+
+
+def load_json(path):
+    """Read a cache file written by :func:`save_json`
+
+    :return:
+        The decoded content, or ``None`` if the file is missing or cannot
+        be read
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError) as e:
+        if getattr(e, 'errno', None) != errno.ENOENT:
+            LOG.debug('Ignoring cache file %s: %s', path, e)
+        return None
+
+
+def save_json(path, data):
+    """Write a cache file, creating its directory
+
+    A temporary file is written and renamed so that concurrent processes
+    never read a partial file. Errors are logged and ignored.
+    """
+    directory = os.path.dirname(path)
+    try:
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        fd, tmp = tempfile.mkstemp(dir=directory or None)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.rename(tmp, path)
+    except (IOError, OSError) as e:
+        LOG.debug('Unable to write cache file %s: %s', path, e)
+
+
+class TTLCache(object):
+    """A thread safe key/value cache whose entries expire after a TTL
+
+    When a ``path`` is given the entries are also loaded from and saved to
+    that JSON file, so they outlive the process. Expiry times are wall
+    clock times for that reason. A file that cannot be read or written is
+    ignored: the cache is only an optimisation.
+    """
+
+    def __init__(self, ttl=300, path=None):
+        """Create a cache
+
+        :param float ttl:
+            Seconds an entry stays valid
+        :param string path:
+            Optional JSON file backing the cache
+        """
+        self.ttl = ttl
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def get(self, key, default=None):
+        """Get the value of a key that has not expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return default
+        return entry[0]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        now = time.time()
+        return sum(1 for _, expires in self._entries.values()
+                   if expires > now)
+
+    def set(self, key, value):
+        """Set the value of a key"""
+        self.update({key: value})
+
+    def update(self, values):
+        """Set the values of many keys, saving the file once"""
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (value, expires)
+            self._save()
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _load(self):
+        entries = load_json(self.path)
+        if entries is None:
+            return
+        now = time.time()
+        self._entries = dict((key, tuple(entry))
+                             for key, entry in entries.items()
+                             if entry[1] > now)
+
+    def _save(self):
+        if not self.path:
+            return
+        now = time.time()
+        entries = dict((key, entry) for key, entry in self._entries.items()
+                       if entry[1] > now)
+        save_json(self.path, entries)
+
+
+class ResponseCache(object):
+    """A thread safe LRU cache of GET responses
+
+    Responses carrying an ``ETag`` or ``Last-Modified`` header are always
+    revalidated with a conditional request and reused when the server
+    answers ``304 Not Modified``. Responses without validators are reused
+    without a request for ``ttl`` seconds, or not cached when ``ttl`` is 0.
+    """
+
+    def __init__(self, max_entries=256, ttl=0):
+        """Create a cache
+
+        :param int max_entries:
+            Number of responses kept, the least recently used are evicted
+        :param float ttl:
+            Seconds a response without validators stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, params=None):
+        """Build the cache key of a request"""
+        return (url, tuple(sorted((params or {}).items())))
+
+    @staticmethod
+    def validators(response):
+        """Get the conditional request headers revalidating a response"""
+        headers = {}
+        if response.headers.get('ETag'):
+            headers['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+        return headers
+
+    def get(self, key):
+        """Get a cached response
+
+        :return:
+            A ``(response, fresh)`` tuple, ``fresh`` telling whether the
+            response can be used without a request, or ``(None, False)``
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.pop(key)
+            self._entries[key] = entry
+        response, stored_at = entry
+        fresh = (not self.validators(response) and
+                 time.time() - stored_at < self.ttl)
+        return response, fresh
+
+    def store(self, key, response):
+        """Cache a successful response, if it can be reused"""
+        if response.status_code != 200:
+            return
+        if not self.validators(response) and not self.ttl:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (response, time.time())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every response"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
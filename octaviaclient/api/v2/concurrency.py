@@ -0,0 +1,74 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Helpers to run Octavia API calls concurrently"""
+
+from concurrent import futures
+
+DEFAULT_WORKERS = 8
+
+
+def gather(calls, max_workers=DEFAULT_WORKERS):
+    """Run independent calls concurrently
+
+    :param calls:
+        A ``dict`` of name to callable taking no arguments
+    :param int max_workers:
+        Number of calls in flight at the same time
+    :return:
+        A ``dict`` of name to result; the first error is raised
+    """
+    with futures.ThreadPoolExecutor(max_workers) as executor:
+        jobs = dict((name, executor.submit(call))
+                    for name, call in calls.items())
+        return dict((name, job.result()) for name, job in jobs.items())
+
+
+def imap_unordered(func, items, max_workers=DEFAULT_WORKERS):
+    """Apply a function to many items concurrently
+
+    At most ``max_workers`` calls are in flight and items are pulled from
+    the iterable as calls complete, so large inputs are never queued all
+    at once.
+
+    :param callable func:
+        Called with each item
+    :param items:
+        An iterable of items
+    :param int max_workers:
+        Number of calls in flight at the same time
+    :return:
+        A generator of ``(item, result, error)`` tuples in completion
+        order; ``error`` is the exception raised by the call, if any
+    """
+    items = iter(items)
+    with futures.ThreadPoolExecutor(max_workers) as executor:
+        pending = {}
+
+        def fill():
+            while len(pending) < max_workers:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                pending[executor.submit(func, item)] = item
+
+        fill()
+        while pending:
+            done, _ = futures.wait(pending,
+                                   return_when=futures.FIRST_COMPLETED)
+            for job in done:
+                item = pending.pop(job)
+                error = job.exception()
+                yield item, None if error else job.result(), error
+            fill()
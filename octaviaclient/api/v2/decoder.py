@@ -0,0 +1,143 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""JSON decoding of Octavia API responses"""
+
+import codecs
+import importlib
+import json
+import re
+
+# Optional JSON libraries tried in order, all faster than json
+FAST_DECODERS = ('orjson', 'ujson', 'simplejson')
+
+# Bytes read at once from streamed responses
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def load_decoder(names=FAST_DECODERS):
+    """Get the ``loads`` function of the first importable JSON library
+
+    :param names:
+        Module names to try in order
+    :return:
+        A callable decoding ``bytes`` or text, ``json.loads`` if none of
+        the modules is installed
+    """
+    for name in names:
+        try:
+            return importlib.import_module(name).loads
+        except ImportError:
+            continue
+    return json.loads
+
+
+loads = load_decoder()
+
+
+class _Reader(object):
+    """Text buffer fed by an iterable of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+
+    def more(self):
+        """Read the next chunk, dropping the consumed part of the buffer"""
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            text = self._decoder.decode(chunk)
+            self.buffer = self.buffer[self.pos:] + text
+            self.pos = 0
+            return True
+        return False
+
+    def skip(self):
+        """Skip whitespace, return the next character or '' at the end"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, chars):
+        char = self.skip()
+        if not char or char not in chars:
+            raise ValueError('Expected %s at position %d' % (
+                ' or '.join(repr(c) for c in chars), self.pos))
+        self.pos += 1
+        return char
+
+    def value(self, decoder):
+        """Decode the next JSON value"""
+        self.skip()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # The value may be cut at the end of the buffer
+                if not self.more():
+                    raise
+                continue
+            # Numbers may continue in the next chunk
+            if end == len(self.buffer) and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(chunks, key, others=None):
+    """Decode the items of an array in a JSON object as they arrive
+
+    Only one item is held decoded at a time, so the items of very large
+    list responses can be processed without building the whole document.
+
+    :param chunks:
+        An iterable of ``bytes``, e.g. ``response.iter_content()``
+    :param string key:
+        Top level key of the array, e.g. ``loadbalancers``
+    :param dict others:
+        Optional ``dict`` filled with the other top level keys, e.g. the
+        ``loadbalancers_links``, once the generator is exhausted
+    :return:
+        A generator of the items of the array
+    """
+    reader = _Reader(chunks)
+    decoder = json.JSONDecoder()
+    reader.expect('{')
+    if reader.skip() == '}':
+        return
+    while True:
+        name = reader.value(decoder)
+        reader.expect(':')
+        if name == key and reader.skip() == '[':
+            reader.pos += 1
+            if reader.skip() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value(decoder)
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            value = reader.value(decoder)
+            if others is not None:
+                others[name] = value
+        if reader.expect(',}') == '}':
+            return
@@ -0,0 +1,207 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Mass load balancer failover"""
+
+import collections
+import logging
+import threading
+import time
+
+from oslo_utils import timeutils
+
+from octaviaclient.api.v2 import concurrency
+from octaviaclient.api.v2 import waiter
+
+LOG = logging.getLogger(__name__)
+
+FailoverResult = collections.namedtuple(
+    'FailoverResult', ('loadbalancer_id', 'status', 'error'))
+
+# FailoverResult statuses
+COMPLETED = 'COMPLETED'
+FAILED = 'FAILED'
+SKIPPED = 'SKIPPED'
+
+
+def select_loadbalancers(api, project_id=None, provisioning_status=None,
+                         image_id=None, compute_ids=None):
+    """Select the load balancers to fail over
+
+    :param api:
+        The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+    :param string project_id:
+        Only select load balancers of this project
+    :param string provisioning_status:
+        Only select load balancers in this provisioning status
+    :param string image_id:
+        Only select load balancers with an amphora built from this image
+    :param compute_ids:
+        Only select load balancers with an amphora on one of these servers
+    :return:
+        A list of load balancer IDs, in listing order
+    """
+    filters = {}
+    if project_id:
+        filters['project_id'] = project_id
+    if provisioning_status:
+        filters['provisioning_status'] = provisioning_status
+    lb_ids = [lb['id'] for lb in api.load_balancer_iter(**filters)]
+
+    if image_id or compute_ids is not None:
+        compute_ids = None if compute_ids is None else set(compute_ids)
+        wanted = set()
+        for amp in api.amphora_iter():
+            if image_id and amp.get('image_id') != image_id:
+                continue
+            if (compute_ids is not None and
+                    amp.get('compute_id') not in compute_ids):
+                continue
+            wanted.add(amp.get('loadbalancer_id'))
+        lb_ids = [lb_id for lb_id in lb_ids if lb_id in wanted]
+    return lb_ids
+
+
+class RateLimiter(object):
+    """Token bucket shared by all the threads of an orchestrator"""
+
+    def __init__(self, rate, burst=1):
+        """Create a rate limiter
+
+        :param float rate:
+            Tokens added per second
+        :param int burst:
+            Maximum number of tokens saved up
+        """
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._watch = timeutils.StopWatch()
+        self._watch.start()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                self._tokens = min(self.burst, self._tokens +
+                                   self._watch.elapsed() * self.rate)
+                self._watch.restart()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class FailoverOrchestrator(object):
+    """Fails over many load balancers, a bounded window at a time
+
+    At most ``max_workers`` load balancers are failing over at any time: a
+    slot is only given to the next load balancer once the previous one is
+    back to ``ACTIVE``. New failovers are started at most ``rate`` times per
+    second across all slots. Once at least ``min_samples`` failovers have
+    finished, no new one is started if the share of failed ones is above
+    ``max_error_rate``: a bad image or a broken compute host then stops the
+    rollout instead of taking down the whole fleet.
+    """
+
+    def __init__(self, api, max_workers=4, rate=None, max_error_rate=0.1,
+                 min_samples=5, timeout=waiter.DEFAULT_TIMEOUT,
+                 interval=waiter.DEFAULT_INTERVAL, wait=True):
+        """Create an orchestrator
+
+        :param api:
+            The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+        :param int max_workers:
+            Number of load balancers failing over at the same time
+        :param float rate:
+            Maximum number of failovers started per second, unlimited if
+            ``None``
+        :param float max_error_rate:
+            Share of failed failovers, between 0 and 1, above which the
+            remaining ones are skipped
+        :param int min_samples:
+            Number of finished failovers before the error rate is checked
+        :param float timeout:
+            Seconds to wait for a load balancer to go back to ``ACTIVE``
+        :param float interval:
+            Seconds between two status polls
+        :param bool wait:
+            Wait for each load balancer to go back to ``ACTIVE``
+        """
+        self.api = api
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate) if rate else None
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.timeout = timeout
+        self.interval = interval
+        self.wait = wait
+        self.aborted = False
+
+    def _failover(self, lb_id):
+        if self.limiter:
+            self.limiter.acquire()
+        self.api.load_balancer_failover(lb_id=lb_id)
+        if self.wait:
+            waiter.wait_for_active(self.api, lb_id, self.timeout,
+                                   self.interval)
+
+    def run(self, lb_ids, callback=None):
+        """Fail over load balancers
+
+        :param lb_ids:
+            The IDs of the load balancers, failed over in this order
+        :param callable callback:
+            Called with each :class:`FailoverResult` as it is known
+        :return:
+            A list of :class:`FailoverResult`, in ``lb_ids`` order
+        """
+        lb_ids = list(collections.OrderedDict.fromkeys(lb_ids))
+        results = {}
+        finished = failed = 0
+
+        def candidates():
+            for lb_id in lb_ids:
+                if self.aborted:
+                    return
+                yield lb_id
+
+        for lb_id, _, error in concurrency.imap_unordered(
+                self._failover, candidates(), self.max_workers):
+            finished += 1
+            if error:
+                failed += 1
+                LOG.debug('Failover of load balancer %s failed: %s',
+                          lb_id, error)
+                result = FailoverResult(lb_id, FAILED, error)
+            else:
+                result = FailoverResult(lb_id, COMPLETED, None)
+            results[lb_id] = result
+            if callback:
+                callback(result)
+            if (not self.aborted and finished >= self.min_samples and
+                    float(failed) / finished > self.max_error_rate):
+                LOG.warning('Stopping failovers: %d of %d failed',
+                            failed, finished)
+                self.aborted = True
+
+        for lb_id in lb_ids:
+            if lb_id not in results:
+                error = 'Skipped: %d of %d failovers failed' % (failed,
+                                                                finished)
+                results[lb_id] = FailoverResult(lb_id, SKIPPED, error)
+                if callback:
+                    callback(results[lb_id])
+        return [results[lb_id] for lb_id in lb_ids]
@@ -0,0 +1,114 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Running Octavia API calls against several regions at once"""
+
+import collections
+
+from octaviaclient.api.v2 import concurrency
+from octaviaclient.api.v2 import octavia
+
+SERVICE_TYPE = 'load-balancer'
+
+RegionResult = collections.namedtuple(
+    'RegionResult', ('region', 'result', 'error'))
+
+
+def catalog_endpoints(session, interface=None, service_type=SERVICE_TYPE):
+    """Find the endpoints of a service in every region of the catalog
+
+    :param session:
+        The keystoneauth session to use
+    :param string interface:
+        Endpoint interface, e.g. ``public``
+    :return:
+        An ``OrderedDict`` of region name to endpoint URL, sorted by region
+    """
+    catalog = session.auth.get_access(session).service_catalog
+    endpoints = catalog.get_endpoints_data(service_type=service_type,
+                                           interface=interface)
+    urls = {}
+    for endpoint in endpoints.get(service_type, []):
+        urls.setdefault(endpoint.region_name, endpoint.url)
+    return collections.OrderedDict(sorted(urls.items(),
+                                          key=lambda i: i[0] or ''))
+
+
+class FanoutClient(object):
+    """A set of :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` by region
+
+    Clients are not limited to regions of one catalog: any mapping of name
+    to client can be given, e.g. the clients of several clouds.
+    """
+
+    def __init__(self, clients, max_workers=concurrency.DEFAULT_WORKERS):
+        """Create a fan-out client
+
+        :param clients:
+            A ``dict`` of region name to ``OctaviaAPI``
+        :param int max_workers:
+            Number of regions called at the same time
+        """
+        self.clients = collections.OrderedDict(clients)
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_catalog(cls, session, interface=None, regions=None,
+                     max_workers=concurrency.DEFAULT_WORKERS, **kwargs):
+        """Create one client per region of the service catalog
+
+        :param session:
+            The keystoneauth session to use
+        :param string interface:
+            Endpoint interface, e.g. ``public``
+        :param regions:
+            Only use these regions, all of them if ``None``
+        :param kwargs:
+            Passed to each ``OctaviaAPI``, e.g. ``hooks``
+        """
+        endpoints = catalog_endpoints(session, interface)
+        if regions is not None:
+            regions = set(regions)
+            endpoints = collections.OrderedDict(
+                (region, url) for region, url in endpoints.items()
+                if region in regions)
+        return cls(((region, octavia.OctaviaAPI(
+            session=session, service_type=SERVICE_TYPE, endpoint=url,
+            **kwargs)) for region, url in endpoints.items()), max_workers)
+
+    def imap(self, func):
+        """Call a function with the client of every region concurrently
+
+        :param callable func:
+            Called with an ``OctaviaAPI``
+        :return:
+            A generator of :class:`RegionResult` in completion order, so
+            that results can be used as soon as a region responds
+        """
+        for region, result, error in concurrency.imap_unordered(
+                lambda region: func(self.clients[region]), self.clients,
+                self.max_workers):
+            yield RegionResult(region, result, error)
+
+    def call(self, method, *args, **kwargs):
+        """Call an ``OctaviaAPI`` method in every region concurrently
+
+        :param string method:
+            Name of the method, e.g. ``load_balancer_list``
+        :return:
+            A generator of :class:`RegionResult` in completion order
+        """
+        return self.imap(lambda api: getattr(api, method)(*args, **kwargs))
+
+    def __len__(self):
+        return len(self.clients)
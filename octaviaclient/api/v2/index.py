@@ -0,0 +1,138 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Index of the load balancer owning each object"""
+
+import threading
+
+from octaviaclient.api.v2 import plan
+
+# References an object carries to its parents, closest to the root first.
+PARENT_KEYS = (
+    'loadbalancer_id', 'loadbalancers', 'listener_id', 'listeners',
+    'pool_id', 'pools', 'l7policy_id',
+)
+
+
+class LoadBalancerIndex(object):
+    """Maps listener, pool, member, health monitor and L7 IDs to their LB
+
+    The index is filled lazily, on first lookup, from one paginated
+    listing of each collection: pools carry the IDs of their members and
+    L7 policies the IDs of their rules, so no per-object calls are needed.
+    Creates, updates and deletes made through the owning
+    :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` keep it current.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.loaded = False
+        self._parents = {}
+        self._lock = threading.Lock()
+
+    def get(self, object_id, load=True):
+        """Find the ID of the load balancer owning an object
+
+        :param string object_id:
+            ID of a load balancer or any of its child objects
+        :param bool load:
+            Fill the index first if it was never filled
+        :return:
+            The load balancer ID, or ``None`` if the object is unknown
+        """
+        if load and not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self._fill()
+        return self._parents.get(object_id)
+
+    def __contains__(self, object_id):
+        return self.get(object_id) is not None
+
+    def __len__(self):
+        return len(self._parents)
+
+    def load(self):
+        """(Re)fill the index from the list endpoints"""
+        with self._lock:
+            self._fill()
+
+    def _fill(self):
+        api = self.api
+        parents = {}
+        for lb in api.load_balancer_iter():
+            parents[lb['id']] = lb['id']
+        for listener in api.listener_iter():
+            self._add(parents, listener)
+        for pool in api.pool_iter():
+            lb_id = self._add(parents, pool)
+            for member in pool.get('members') or []:
+                if lb_id:
+                    parents[member['id']] = lb_id
+        for policy in api.l7policy_iter():
+            lb_id = self._add(parents, policy)
+            for rule in policy.get('rules') or []:
+                if lb_id:
+                    parents[rule['id']] = lb_id
+        for monitor in api.health_monitor_iter():
+            self._add(parents, monitor)
+        self._parents = parents
+        self.loaded = True
+
+    @staticmethod
+    def _add(parents, obj, extra=()):
+        lb_id = None
+        for key in PARENT_KEYS:
+            refs = obj.get(key)
+            if not refs:
+                continue
+            if not isinstance(refs, list):
+                refs = [{'id': refs}]
+            lb_id = parents.get(refs[0]['id'])
+            if lb_id:
+                break
+        for parent_id in extra:
+            if lb_id:
+                break
+            lb_id = parents.get(parent_id)
+        if lb_id:
+            parents[obj['id']] = lb_id
+        return lb_id
+
+    def record(self, url, body):
+        """Index the object returned by a create or update
+
+        :param string url:
+            The API-specific portion of the request URL; members and
+            rules only reference their parent through it
+        :param body:
+            The decoded response, e.g. ``{'pool': {...}}``
+        """
+        if not self.loaded or not isinstance(body, dict) or len(body) != 1:
+            return
+        key, obj = list(body.items())[0]
+        if not isinstance(obj, dict) or not obj.get('id'):
+            return
+        if key == 'loadbalancer':
+            self._parents[obj['id']] = obj['id']
+            return
+        parent_ids = [i for i in plan.object_ids(url) if i != obj['id']]
+        self._add(self._parents, obj, extra=reversed(parent_ids))
+
+    def discard(self, object_id):
+        """Forget a deleted object, and its children if it is an LB"""
+        if self._parents.get(object_id) == object_id:
+            self._parents = dict((k, v) for k, v in self._parents.items()
+                                 if v != object_id)
+        else:
+            self._parents.pop(object_id, None)
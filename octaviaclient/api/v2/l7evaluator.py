@@ -0,0 +1,202 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Offline evaluation of the L7 policies of a listener"""
+
+import collections
+import re
+
+from octaviaclient.api.v2 import concurrency
+
+Route = collections.namedtuple(
+    'Route', ('l7policy_id', 'l7policy_name', 'action', 'target'))
+
+# Cheapest comparisons are evaluated first within a policy
+COMPARE_COST = {
+    'EQUAL_TO': 0,
+    'STARTS_WITH': 1,
+    'ENDS_WITH': 1,
+    'CONTAINS': 2,
+    'REGEX': 3,
+}
+
+
+class EvaluationError(Exception):
+    """An L7 rule cannot be evaluated locally"""
+
+
+def _lower_keys(mapping):
+    return dict((k.lower(), v) for k, v in (mapping or {}).items())
+
+
+def _file_type(path):
+    name = (path or '').split('?', 1)[0].rsplit('/', 1)[-1]
+    return name.rsplit('.', 1)[1] if '.' in name else ''
+
+
+# Functions extracting the value a rule type compares from a request
+# normalised by L7Evaluator._normalise
+EXTRACTORS = {
+    'HOST_NAME': lambda request, key: request['host'],
+    'PATH': lambda request, key: request['path'],
+    'FILE_TYPE': lambda request, key: request['file_type'],
+    'HEADER': lambda request, key: request['headers'].get((key or '').lower()),
+    'COOKIE': lambda request, key: request['cookies'].get(key),
+}
+
+
+def _comparator(compare_type, value, ignore_case):
+    if compare_type == 'REGEX':
+        pattern = re.compile(value, re.IGNORECASE if ignore_case else 0)
+        return lambda s: pattern.search(s) is not None
+    if ignore_case:
+        value = value.lower()
+    if compare_type == 'EQUAL_TO':
+        return lambda s: s == value
+    if compare_type == 'STARTS_WITH':
+        return lambda s: s.startswith(value)
+    if compare_type == 'ENDS_WITH':
+        return lambda s: s.endswith(value)
+    if compare_type == 'CONTAINS':
+        return lambda s: value in s
+    raise EvaluationError('Unsupported compare_type %s' % compare_type)
+
+
+def compile_rule(rule):
+    """Compile an L7 rule into a predicate on normalised requests
+
+    :param rule:
+        An L7 rule ``dict``
+    :return:
+        A callable returning whether a request matches the rule
+    """
+    rule_type = rule.get('type')
+    if rule_type not in EXTRACTORS:
+        raise EvaluationError('Unsupported rule type %s' % rule_type)
+    extract = EXTRACTORS[rule_type]
+    key = rule.get('key')
+    # Host names are matched case insensitively, like the amphora does
+    ignore_case = rule_type == 'HOST_NAME'
+    compare = _comparator(rule.get('compare_type'), rule.get('value') or '',
+                          ignore_case)
+    invert = bool(rule.get('invert'))
+
+    def match(request):
+        value = extract(request, key)
+        matched = value is not None and compare(value)
+        return matched != invert
+    return match
+
+
+class L7Evaluator(object):
+    """Routes requests the way the L7 policies of a listener would
+
+    Enabled policies are evaluated by ascending ``position``; the first one
+    whose enabled rules all match decides the route. Policies without
+    enabled rules never match. Requests matching no policy go to the
+    listener's default pool.
+    """
+
+    def __init__(self, policies, default_pool_id=None):
+        """Compile policies
+
+        :param policies:
+            L7 policy ``dict``, each with a ``rules`` list of full rules
+        :param string default_pool_id:
+            ID of the default pool of the listener
+        """
+        self.default = Route(None, None, 'DEFAULT_POOL', default_pool_id)
+        self._policies = []
+        for policy in sorted(policies, key=lambda p: p.get('position') or 0):
+            if not policy.get('admin_state_up', True):
+                continue
+            rules = sorted(
+                (r for r in policy.get('rules') or []
+                 if r.get('admin_state_up', True)),
+                key=lambda r: COMPARE_COST.get(r.get('compare_type'), 9))
+            if not rules:
+                continue
+            target = policy.get('redirect_pool_id')
+            if policy.get('action') == 'REDIRECT_TO_URL':
+                target = policy.get('redirect_url')
+            elif policy.get('action') == 'REDIRECT_PREFIX':
+                target = policy.get('redirect_prefix')
+            route = Route(policy.get('id'), policy.get('name'),
+                          policy.get('action'), target)
+            self._policies.append(
+                (tuple(compile_rule(r) for r in rules), route))
+
+    @classmethod
+    def from_api(cls, api, listener_id):
+        """Fetch and compile the L7 policies of a listener
+
+        The policies are fetched with one listing and their rules with one
+        listing per policy, made concurrently.
+        """
+        data = cls.fetch(api, listener_id)
+        return cls(data['l7policies'], data['default_pool_id'])
+
+    @staticmethod
+    def fetch(api, listener_id):
+        """Fetch the L7 policies of a listener, with their full rules
+
+        :return:
+            A ``dict`` with ``default_pool_id`` and ``l7policies`` keys,
+            suitable to be saved and given back to the constructor
+        """
+        listener = api.listener_show(listener_id)
+        policies = api.l7policy_list(listener_id=listener_id)['l7policies']
+        rules = concurrency.gather(dict(
+            (policy['id'], lambda policy_id=policy['id']: api.l7rule_list(
+                policy_id)['rules'])
+            for policy in policies))
+        for policy in policies:
+            policy['rules'] = rules[policy['id']]
+        return {'default_pool_id': listener.get('default_pool_id'),
+                'l7policies': policies}
+
+    @staticmethod
+    def _normalise(request):
+        path = request.get('path') or '/'
+        headers = _lower_keys(request.get('headers'))
+        cookies = request.get('cookies')
+        if cookies is None:
+            cookies = dict(
+                c.strip().split('=', 1)
+                for c in (headers.get('cookie') or '').split(';') if '=' in c)
+        return {
+            'host': (request.get('host') or headers.get('host') or
+                     '').split(':', 1)[0].lower(),
+            'path': path.split('?', 1)[0],
+            'file_type': _file_type(path),
+            'headers': headers,
+            'cookies': cookies,
+        }
+
+    def route(self, request):
+        """Find where a request is routed
+
+        :param request:
+            A ``dict`` with optional ``host``, ``path``, ``headers`` and
+            ``cookies`` keys
+        :return:
+            A :class:`Route`
+        """
+        request = self._normalise(request)
+        for rules, route in self._policies:
+            if all(rule(request) for rule in rules):
+                return route
+        return self.default
+
+    def __len__(self):
+        return len(self._policies)
@@ -0,0 +1,215 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Synchronising the L7 policies of a listener with a desired list"""
+
+import bisect
+import collections
+
+from octaviaclient.api.v2 import waiter
+
+# Policy attributes compared with the desired policies, besides position
+POLICY_ATTRS = ('name', 'description', 'action', 'redirect_url',
+                'redirect_pool_id', 'admin_state_up')
+
+# Rule attributes identifying a rule, with the API defaults
+RULE_DEFAULTS = collections.OrderedDict((
+    ('type', None),
+    ('compare_type', None),
+    ('key', None),
+    ('value', None),
+    ('invert', False),
+    ('admin_state_up', True),
+))
+
+Operation = collections.namedtuple(
+    'Operation', ('method', 'kwargs', 'l7policy', 'detail'))
+
+
+class SyncError(Exception):
+    """The desired policies cannot be matched with the current ones"""
+
+
+def longest_increasing_subsequence(values):
+    """Find a longest strictly increasing subsequence
+
+    :param values:
+        A list of comparable values
+    :return:
+        The ``set`` of the indexes of the subsequence in ``values``
+    """
+    tails = []
+    tail_indexes = []
+    previous = [None] * len(values)
+    for i, value in enumerate(values):
+        n = bisect.bisect_left(tails, value)
+        if n == len(tails):
+            tails.append(value)
+            tail_indexes.append(i)
+        else:
+            tails[n] = value
+            tail_indexes[n] = i
+        previous[i] = tail_indexes[n - 1] if n else None
+    indexes = set()
+    i = tail_indexes[-1] if tail_indexes else None
+    while i is not None:
+        indexes.add(i)
+        i = previous[i]
+    return indexes
+
+
+def _rule_key(rule):
+    return tuple(default if rule.get(k) is None else rule[k]
+                 for k, default in RULE_DEFAULTS.items())
+
+
+def _match(current, desired):
+    by_id = dict((p['id'], p) for p in current)
+    by_name = collections.defaultdict(list)
+    for policy in current:
+        if policy.get('name'):
+            by_name[policy['name']].append(policy)
+
+    matches = []
+    for policy in desired:
+        if policy.get('id'):
+            if policy['id'] not in by_id:
+                raise SyncError('No L7 policy with ID %s' % policy['id'])
+            matches.append(by_id[policy['id']])
+        elif len(by_name.get(policy.get('name'), ())) > 1:
+            raise SyncError('More than one L7 policy is named %s' %
+                            policy['name'])
+        else:
+            matches.append((by_name.get(policy.get('name')) or [None])[0])
+    ids = [m['id'] for m in matches if m]
+    if len(ids) != len(set(ids)):
+        raise SyncError('An L7 policy is desired more than once')
+    return matches
+
+
+def _rule_operations(policy, current_rules, desired_rules):
+    remaining = collections.defaultdict(list)
+    for rule in current_rules:
+        remaining[_rule_key(rule)].append(rule)
+    creates = []
+    for rule in desired_rules:
+        if remaining.get(_rule_key(rule)):
+            remaining[_rule_key(rule)].pop()
+        else:
+            creates.append(rule)
+    name = policy.get('name') or policy['id']
+    for rules in remaining.values():
+        for rule in rules:
+            yield Operation('l7rule_delete',
+                            {'l7rule_id': rule['id'],
+                             'l7policy_id': policy['id']},
+                            name, 'delete rule %s' % rule['id'])
+    for rule in creates:
+        yield Operation('l7rule_create',
+                        {'l7policy_id': policy['id'],
+                         'json': {'rule': dict(rule)}},
+                        name, 'create rule %s %s %s' % (
+                            rule.get('type'), rule.get('compare_type'),
+                            rule.get('value')))
+
+
+def plan(listener_id, current, desired):
+    """Compute the operations turning the current policies into desired ones
+
+    Policies are matched by ID, or else by name. Unmatched current policies
+    are deleted first. The longest run of matched policies already in the
+    desired relative order is left in place, every other matched policy is
+    moved right after its desired predecessor, and new policies are created
+    at that same spot: each ``position`` sent is only valid once the
+    previous operations are applied, but the number of moves is minimal.
+
+    :param string listener_id:
+        ID of the listener of the policies
+    :param current:
+        The current policies, each with a ``rules`` list of full rules
+    :param desired:
+        The desired policies in order, each with an optional ``rules`` list
+    :return:
+        A list of :class:`Operation`, to apply in order
+    """
+    current = sorted(current, key=lambda p: p.get('position') or 0)
+    matches = _match(current, desired)
+    matched_ids = set(m['id'] for m in matches if m)
+    operations = [
+        Operation('l7policy_delete', {'l7policy_id': policy['id']},
+                  policy.get('name') or policy['id'], 'delete')
+        for policy in current if policy['id'] not in matched_ids]
+
+    order = [p['id'] for p in current if p['id'] in matched_ids]
+    current_index = dict((policy_id, i) for i, policy_id in enumerate(order))
+    matched = [(i, m) for i, m in enumerate(matches) if m]
+    kept = set(matched[n][0] for n in longest_increasing_subsequence(
+        [current_index[m['id']] for _, m in matched]))
+
+    previous = None
+    for i, (policy, match) in enumerate(zip(desired, matches)):
+        key = match['id'] if match else ('new', i)
+        attrs = dict((k, policy[k]) for k in POLICY_ATTRS if k in policy)
+        if match is None:
+            position = order.index(previous) + 1 if previous else 0
+            order.insert(position, key)
+            attrs.update(listener_id=listener_id, position=position + 1,
+                         rules=[dict(r) for r in policy.get('rules') or []])
+            operations.append(Operation(
+                'l7policy_create', {'json': {'l7policy': attrs}},
+                policy.get('name'), 'create at position %d' % (position + 1)))
+            previous = key
+            continue
+
+        changes = dict((k, v) for k, v in attrs.items() if match.get(k) != v)
+        detail = []
+        if i not in kept:
+            old_position = order.index(key)
+            order.remove(key)
+            position = order.index(previous) + 1 if previous else 0
+            order.insert(position, key)
+            # Earlier moves may already have put it in place
+            if position != old_position:
+                changes['position'] = position + 1
+                detail.append('move to position %d' % (position + 1))
+        detail.extend('set %s' % k for k in sorted(changes)
+                      if k != 'position')
+        if changes:
+            operations.append(Operation(
+                'l7policy_set',
+                {'l7policy_id': match['id'], 'json': {'l7policy': changes}},
+                match.get('name') or match['id'], ', '.join(detail)))
+        if 'rules' in policy:
+            operations.extend(_rule_operations(
+                match, match.get('rules') or [], policy['rules'] or []))
+        previous = key
+    return operations
+
+
+def apply(api, loadbalancer_id, operations, wait=True,
+          timeout=waiter.DEFAULT_TIMEOUT, interval=waiter.DEFAULT_INTERVAL):
+    """Apply operations one at a time
+
+    :param api:
+        The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+    :param string loadbalancer_id:
+        ID of the load balancer of the listener
+    :param operations:
+        The :class:`Operation` list returned by :func:`plan`
+    :param bool wait:
+        Wait for the load balancer to go back to ``ACTIVE`` after each one
+    """
+    for operation in operations:
+        getattr(api, operation.method)(**operation.kwargs)
+        if wait:
+            waiter.wait_for_active(api, loadbalancer_id, timeout, interval)
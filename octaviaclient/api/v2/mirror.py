@@ -0,0 +1,285 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Local SQLite mirror of the Octavia resources"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from octaviaclient.api.v2 import concurrency
+from octaviaclient.api.v2 import octavia
+from octaviaclient.api.v2 import records
+
+LOG = logging.getLogger(__name__)
+
+MIRROR_VERSION = 1
+
+# Seconds after which a refresh reloads everything, so that objects
+# deleted from the API are dropped from the mirror.
+FULL_REFRESH_INTERVAL = 24 * 3600
+
+# Resources listed directly; members are listed per pool
+RESOURCES = ('loadbalancers', 'listeners', 'pools', 'healthmonitors',
+             'l7policies', 'amphorae')
+
+# Indexed columns, besides resource and id
+COLUMNS = ('name', 'project_id', 'provisioning_status', 'operating_status',
+           'vip_address', 'address', 'parent_id', 'updated_at')
+
+# Filter names stored under another column
+COLUMN_ALIASES = {
+    'status': 'provisioning_status',
+    'loadbalancer_id': 'parent_id',
+    'listener_id': 'parent_id',
+    'pool_id': 'parent_id',
+}
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS objects ('
+    ' resource TEXT NOT NULL, id TEXT NOT NULL, %s, data TEXT NOT NULL,'
+    ' PRIMARY KEY (resource, id))' % ', '.join(c + ' TEXT' for c in COLUMNS),
+    'CREATE INDEX IF NOT EXISTS objects_name ON objects (resource, name)',
+    'CREATE INDEX IF NOT EXISTS objects_project'
+    ' ON objects (resource, project_id)',
+    'CREATE INDEX IF NOT EXISTS objects_status'
+    ' ON objects (resource, provisioning_status, operating_status)',
+    'CREATE INDEX IF NOT EXISTS objects_parent'
+    ' ON objects (resource, parent_id)',
+    'CREATE INDEX IF NOT EXISTS objects_vip_address ON objects (vip_address)',
+    'CREATE INDEX IF NOT EXISTS objects_address ON objects (address)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+)
+
+
+class MirrorError(Exception):
+    """The mirror cannot answer"""
+
+
+def _parent_id(resource, obj):
+    if resource == 'amphorae':
+        return obj.get('loadbalancer_id')
+    if resource == 'l7policies':
+        return obj.get('listener_id')
+    parents = obj.get('pools' if resource == 'healthmonitors' else
+                      'loadbalancers') or []
+    return parents[0].get('id') if parents else None
+
+
+def _row(resource, obj, parent_id=None):
+    if resource == 'members':
+        # Members do not reference their pool
+        obj = dict(obj, pool_id=parent_id)
+    values = {
+        'provisioning_status': obj.get('provisioning_status',
+                                       obj.get('status')),
+        'parent_id': parent_id or _parent_id(resource, obj),
+    }
+    row = [resource, obj['id']]
+    row.extend(values[c] if c in values else obj.get(c) for c in COLUMNS)
+    row.append(json.dumps(records.to_builtin(obj)))
+    return row
+
+
+class Mirror(object):
+    """Octavia resources kept in a local SQLite database
+
+    :meth:`refresh` lists every resource, concurrently, and then only the
+    changes since the previous refresh with
+    :meth:`~octaviaclient.api.v2.octavia.OctaviaAPI.changes_since`. Members
+    are listed for the pools that changed: member changes update their
+    pool, and have a ``pool_id`` key added. Objects deleted from the API
+    are dropped by the full refresh made every ``max_age`` seconds. Queries
+    on the indexed columns never call the API.
+    """
+
+    def __init__(self, path, api=None, max_age=FULL_REFRESH_INTERVAL,
+                 max_workers=concurrency.DEFAULT_WORKERS):
+        """Open a mirror, creating its database if needed
+
+        :param string path:
+            The SQLite database file
+        :param api:
+            The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to refresh
+            from, only needed by :meth:`refresh`
+        :param float max_age:
+            Seconds after which a refresh reloads everything
+        :param int max_workers:
+            Number of listings made at the same time
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        self.api = api
+        self.path = path
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self._db = sqlite3.connect(path)
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+        if self._meta('version') not in (None, str(MIRROR_VERSION)):
+            self.clear()
+        self._set_meta('version', MIRROR_VERSION)
+
+    def close(self):
+        self._db.close()
+
+    def _meta(self, key):
+        row = self._db.execute('SELECT value FROM meta WHERE key = ?',
+                               (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                             (key, None if value is None else str(value)))
+
+    @property
+    def refreshed_at(self):
+        """Time of the last refresh, ``None`` if never refreshed"""
+        value = self._meta('refreshed_at')
+        return float(value) if value else None
+
+    def clear(self):
+        """Drop every object"""
+        with self._db:
+            self._db.execute('DELETE FROM objects')
+            self._db.execute('DELETE FROM meta')
+
+    def _fetch(self, resource, mark):
+        if mark:
+            return list(self.api.changes_since(resource, mark))
+        return list(self.api.iter_list(octavia.COLLECTION_URLS[resource],
+                                       resource))
+
+    def refresh(self, full=False):
+        """Bring the mirror up to date with the API
+
+        A resource that cannot be listed, e.g. amphorae without the admin
+        role, is logged and left as it was.
+
+        :param bool full:
+            Reload everything even if the mirror is recent
+        :return:
+            A ``dict`` of resource to number of objects fetched
+        """
+        now = time.time()
+        built_at = self._meta('built_at')
+        full = full or not built_at or now - float(built_at) > self.max_age
+        marks = dict((r, None if full else self._meta('mark:' + r))
+                     for r in RESOURCES)
+        fetched = dict((r, 0) for r in RESOURCES + ('members',))
+        changed_pools = set()
+
+        with self._db:
+            if full:
+                self._db.execute('DELETE FROM objects')
+            for resource, objects, error in concurrency.imap_unordered(
+                    lambda r: self._fetch(r, marks[r]), RESOURCES,
+                    self.max_workers):
+                if error:
+                    LOG.warning('Unable to mirror %s: %s', resource, error)
+                    continue
+                self._store(resource, objects)
+                fetched[resource] = len(objects)
+                if resource == 'pools':
+                    changed_pools = set(obj['id'] for obj in objects)
+                newest = max([marks[resource] or ''] +
+                             [octavia.changed_at(obj) for obj in objects])
+                self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                 ('mark:' + resource, newest or None))
+
+            pool_ids = changed_pools
+            if full:
+                pool_ids = [row[0] for row in self._db.execute(
+                    "SELECT id FROM objects WHERE resource = 'pools'")]
+            for pool_id, members, error in concurrency.imap_unordered(
+                    lambda p: list(self.api.member_iter(pool_id=p)),
+                    pool_ids, self.max_workers):
+                if error:
+                    LOG.warning('Unable to mirror the members of pool %s: '
+                                '%s', pool_id, error)
+                    continue
+                self._db.execute(
+                    "DELETE FROM objects WHERE resource = 'members' "
+                    "AND parent_id = ?", (pool_id,))
+                self._store('members', members, pool_id)
+                fetched['members'] += len(members)
+
+            if full:
+                self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                 ('built_at', str(now)))
+            self._db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                             ('refreshed_at', str(now)))
+        return fetched
+
+    def _store(self, resource, objects, parent_id=None):
+        deleted = [(resource, obj['id']) for obj in objects
+                   if obj.get('provisioning_status',
+                              obj.get('status')) == 'DELETED']
+        self._db.executemany(
+            'DELETE FROM objects WHERE resource = ? AND id = ?', deleted)
+        deleted = set(object_id for _, object_id in deleted)
+        self._db.executemany(
+            'INSERT OR REPLACE INTO objects VALUES (%s)' % ', '.join(
+                '?' * (len(COLUMNS) + 3)),
+            (_row(resource, obj, parent_id) for obj in objects
+             if obj['id'] not in deleted))
+
+    def query(self, resource, **filters):
+        """Find the objects of a resource
+
+        :param string resource:
+            The collection key, e.g. ``pools``
+        :param filters:
+            Values the objects must have. ``name``, ``project_id``,
+            statuses, ``vip_address``, ``address`` and the ID of the parent
+            object (``loadbalancer_id`` of listeners, pools and amphorae,
+            ``listener_id`` of L7 policies, ``pool_id`` of members) are
+            looked up in indexes.
+        :return:
+            A list of object ``dict``
+        """
+        if self.refreshed_at is None:
+            raise MirrorError('The mirror %s was never refreshed' % self.path)
+        sql = 'SELECT data FROM objects WHERE resource = ?'
+        params = [resource]
+        others = {}
+        for key, value in sorted(filters.items()):
+            column = COLUMN_ALIASES.get(key, key)
+            if column in COLUMNS:
+                sql += ' AND %s = ?' % column
+                params.append(value)
+            else:
+                others[key] = value
+        objects = (json.loads(row[0])
+                   for row in self._db.execute(sql, params))
+        return [obj for obj in objects
+                if all(obj.get(k) == v for k, v in others.items())]
+
+    def get(self, resource, name_or_id):
+        """Find the objects of a resource with a name or ID"""
+        if self.refreshed_at is None:
+            raise MirrorError('The mirror %s was never refreshed' % self.path)
+        return [json.loads(row[0]) for row in self._db.execute(
+            'SELECT data FROM objects WHERE resource = ? AND '
+            '(id = ? OR name = ?)', (resource, name_or_id, name_or_id))]
+
+    def count(self, resource):
+        """Count the objects of a resource"""
+        return self._db.execute(
+            'SELECT COUNT(*) FROM objects WHERE resource = ?',
+            (resource,)).fetchone()[0]
@@ -13,47 +13,389 @@
 
 """Octavia API Library"""
 
+import contextlib
+import functools
+import logging
+import threading
+import time
+
 from osc_lib.api import api
+from oslo_utils import timeutils
 
 from octaviaclient.api import constants as const
+from octaviaclient.api.v2 import decoder as json_decoder
+from octaviaclient.api.v2 import index
+from octaviaclient.api.v2 import plan as request_plan
+from octaviaclient.api.v2 import records
+from octaviaclient.api.v2 import tracing
+
+LOG = logging.getLogger(__name__)
+
+# Objects fetched per request by the paginated iterators, the default
+# pagination_max_limit of the Octavia API.
+PAGE_SIZE = 1000
+
+# Objects fetched per request by changes_since, which usually needs one
+# page only.
+CHANGES_PAGE_SIZE = 100
+
+# URL of the collection of each resource of the change feed
+COLLECTION_URLS = {
+    'loadbalancers': const.BASE_LOADBALANCER_URL,
+    'listeners': const.BASE_LISTENER_URL,
+    'pools': const.BASE_POOL_URL,
+    'members': const.BASE_MEMBER_URL,
+    'healthmonitors': const.BASE_HEALTH_MONITOR_URL,
+    'l7policies': const.BASE_L7POLICY_URL,
+    'amphorae': const.BASE_AMPHORA_URL,
+}
+
+# Listings are verbose JSON that compresses well, always ask for it
+# compressed. Responses are decompressed as they are read.
+ACCEPT_ENCODING = 'gzip, deflate'
 
 
 def correct_return_codes(func):
     _status_dict = {400: 'Bad Request', 401: 'Unauthorized',
                     403: 'Forbidden', 404: 'Not found',
                     409: 'Conflict', 413: 'Over Limit',
-                    501: 'Not Implemented'}
+                    501: 'Not Implemented', 503: 'Service Unavailable'}
 
-    def wrapper(*args, **kwargs):
+    def _fault_string(response):
         try:
-            response = func(*args, **kwargs)
-        except Exception as e:
-            if not hasattr(e, 'response'):
-                raise
-            raise OctaviaClientException(
-                code=e.response.status_code,
-                message=e.response.json().get(
-                    'faultstring',
-                    _status_dict.get(e.response.status_code, 'Unknown Error')),
-                request_id=e.request_id)
-        return response
+            message = response.json().get('faultstring')
+        except ValueError:
+            message = None
+        return message or _status_dict.get(response.status_code,
+                                           'Unknown Error')
+
+    def wrapper(*args, **kwargs):
+        policy = getattr(args[0], 'retry_policy', None) if args else None
+        # The deadline includes the first attempt
+        delays = policy.delays(policy.start()) if policy else iter(())
+        while True:
+            try:
+                response = func(*args, **kwargs)
+            except Exception as e:
+                if not hasattr(e, 'response'):
+                    raise
+                code = e.response.status_code
+                message = _fault_string(e.response)
+                delay = None
+                if policy and policy.is_retryable(code, message):
+                    delay = next(delays, None)
+                if delay is None:
+                    raise OctaviaClientException(
+                        code=code,
+                        message=message,
+                        request_id=e.request_id)
+                LOG.debug('%s failed with HTTP %s (%s), retrying in %.1fs',
+                          func.__name__, code, message, delay)
+                time.sleep(delay)
+                continue
+            return response
     return wrapper
 
 
+def changed_at(obj):
+    """Get the time an object last changed, as an ISO 8601 string"""
+    return obj.get('updated_at') or obj.get('created_at') or ''
+
+
+def _wire_size(response, size):
+    """Get the number of body bytes received for a response"""
+    if not response.headers.get('Content-Encoding'):
+        return size
+    try:
+        # Bytes read from the connection, before decompression
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        pass
+    try:
+        return int(response.headers['Content-Length'])
+    except (KeyError, TypeError, ValueError):
+        return size
+
+
 class OctaviaAPI(api.BaseAPI):
     """Octavia API"""
 
     _endpoint_suffix = '/v2.0'
 
-    def __init__(self, endpoint=None, **kwargs):
+    def __init__(self, endpoint=None, hooks=None, retry_policy=None,
+                 response_cache=None, decoder=None, compact_records=False,
+                 **kwargs):
         super(OctaviaAPI, self).__init__(endpoint=endpoint, **kwargs)
         self.endpoint = self.endpoint.rstrip('/')
         self._build_url()
+        self._plan = None
+        self._local = threading.local()
+        self.hooks = list(hooks or [])
+        self.retry_policy = retry_policy
+        self.response_cache = response_cache
+        self.decoder = decoder or json_decoder.loads
+        # Listed objects are returned as read-only records when set
+        self.compact_records = compact_records
+        self.loadbalancer_index = index.LoadBalancerIndex(self)
 
     def _build_url(self):
         if not self.endpoint.endswith(self._endpoint_suffix):
             self.endpoint += self._endpoint_suffix
 
+    def _request(self, method, url, session=None, **kwargs):
+        if self._plan is not None:
+            self._plan.record(method, url, params=kwargs.get('params'))
+            if method not in request_plan.READ_METHODS:
+                return self._plan.response(method, kwargs.get('json'))
+        if not self.hooks:
+            return self._send(method, url, session=session, **kwargs)
+
+        response = None
+        # Streamed bodies are not read yet, their reader notifies the hooks
+        streamed = kwargs.get('stream', False)
+        watch = timeutils.StopWatch()
+        watch.start()
+        try:
+            response = self._send(method, url, session=session, **kwargs)
+            return response
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            streamed = False
+            raise
+        finally:
+            if not streamed:
+                self._notify(method, url, response, watch.elapsed())
+
+    def _send(self, method, url, session=None, **kwargs):
+        kwargs['headers'] = dict(kwargs.get('headers') or {})
+        kwargs['headers'].setdefault('Accept-Encoding', ACCEPT_ENCODING)
+        cache = self.response_cache
+        # Streamed bodies are read once by the caller, they cannot be reused
+        if cache is None or kwargs.get('stream'):
+            return super(OctaviaAPI, self)._request(method, url,
+                                                    session=session,
+                                                    **kwargs)
+        if method != 'GET':
+            response = super(OctaviaAPI, self)._request(method, url,
+                                                        session=session,
+                                                        **kwargs)
+            if method not in request_plan.READ_METHODS:
+                cache.clear()
+            return response
+
+        key = cache.key(self.endpoint + '/' + url.lstrip('/'),
+                        kwargs.get('params'))
+        cached, fresh = cache.get(key)
+        if fresh:
+            return cached
+        if cached is not None:
+            kwargs['headers'].update(cache.validators(cached))
+        response = super(OctaviaAPI, self)._request(method, url,
+                                                    session=session,
+                                                    **kwargs)
+        if response.status_code == 304 and cached is not None:
+            return cached
+        cache.store(key, response)
+        return response
+
+    def _notify(self, method, url, response, latency, size=None):
+        template = request_plan.url_template(url)[0]
+        status = wire_size = request_id = None
+        if response is not None:
+            status = response.status_code
+            if size is None:
+                size = len(response.content or b'')
+            wire_size = _wire_size(response, size)
+            request_id = response.headers.get('x-openstack-request-id')
+        record = tracing.RequestRecord(method, url, template, status, size,
+                                       latency, request_id,
+                                       getattr(self._local, 'tag', None),
+                                       wire_size)
+        for hook in self.hooks:
+            hook(record)
+
+    def create(self, url, session=None, method=None, **params):
+        response = super(OctaviaAPI, self).create(url, session=session,
+                                                  method=method, **params)
+        self.loadbalancer_index.record(url, response)
+        return response
+
+    def delete(self, url, session=None, **params):
+        response = super(OctaviaAPI, self).delete(url, session=session,
+                                                  **params)
+        object_ids = request_plan.object_ids(url)
+        if object_ids and self._plan is None:
+            self.loadbalancer_index.discard(object_ids[-1])
+        return response
+
+    def find_loadbalancer_id(self, object_id):
+        """Find the load balancer owning an object
+
+        :param string object_id:
+            ID of a load balancer, listener, pool, member, health monitor,
+            L7 policy or L7 rule
+        :return:
+            The ID of the owning load balancer, or ``None`` if unknown
+        """
+        return self.loadbalancer_index.get(object_id)
+
+    def iter_list(self, path, resource, page_size=PAGE_SIZE, marker_key='id',
+                  **params):
+        """Iterate over a collection one page at a time
+
+        Only one page is held in memory, so very large collections can be
+        walked with bounded memory.
+
+        :param string path:
+            The API-specific portion of the collection URL
+        :param string resource:
+            The collection key of the response, e.g. ``amphorae``
+        :param int page_size:
+            Number of objects requested per page
+        :param string marker_key:
+            The key identifying objects, given as the marker of the next
+            page
+        :param params:
+            Parameters to filter on
+        :return:
+            A generator of object ``dict``
+        """
+        params = dict(params, limit=page_size)
+        while True:
+            page = {}
+            last = None
+            for obj in self._iter_page(path, resource, page, **params):
+                last = obj
+                yield obj
+            links = page.get(resource + '_links') or []
+            if last is None or not any(link.get('rel') == 'next'
+                                       for link in links):
+                return
+            params['marker'] = last[marker_key]
+
+    def changes_since(self, resource, since, pool_id=None,
+                      page_size=CHANGES_PAGE_SIZE, **params):
+        """Iterate over the objects of a collection changed since a time
+
+        Objects are listed newest change first, sorted by the server, and
+        the listing stops at the first older one, so that a few changes
+        cost a single small page. Objects never updated have no
+        ``updated_at`` and are sorted last: a second listing by
+        ``created_at`` finds those created since.
+
+        :param string resource:
+            The collection key, one of :data:`COLLECTION_URLS`
+        :param string since:
+            ISO 8601 time, as in ``updated_at``; objects changed at that
+            very time are included
+        :param string pool_id:
+            ID of the pool, to list its members
+        :param int page_size:
+            Number of objects requested per page
+        :param params:
+            Parameters to filter on
+        :return:
+            A generator of object ``dict``, each object once
+        """
+        path = COLLECTION_URLS[resource].format(pool_id=pool_id)
+        seen = set()
+        for key in ('updated_at', 'created_at'):
+            for obj in self.iter_list(path, resource, page_size=page_size,
+                                      sort=key + ':desc', **params):
+                if not obj.get(key) or obj[key] < since:
+                    break
+                if obj['id'] not in seen:
+                    seen.add(obj['id'])
+                    yield obj
+
+    def _iter_page(self, path, resource, others, **params):
+        # Objects are decoded as the page is received
+        watch = timeutils.StopWatch()
+        watch.start()
+        response = self._request('GET', path, params=params, stream=True)
+        record_type = None
+        if self.compact_records:
+            record_type = records.RECORD_TYPES.get(resource)
+        received = [0]
+
+        def chunks():
+            for chunk in response.iter_content(json_decoder.CHUNK_SIZE):
+                received[0] += len(chunk)
+                yield chunk
+        try:
+            for obj in json_decoder.iter_items(chunks(), resource, others):
+                yield record_type(obj) if record_type else obj
+        finally:
+            # Reported once the body was read, with its download time
+            if self.hooks:
+                self._notify('GET', path, response, watch.elapsed(),
+                             size=received[0])
+            response.close()
+
+    def list(self, path, session=None, body=None, detailed=False,
+             headers=None, **params):
+        """Return a list of resources, decoded with :attr:`decoder`"""
+        if body or detailed:
+            return super(OctaviaAPI, self).list(
+                path, session=session, body=body, detailed=detailed,
+                headers=headers, **params)
+        response = self._request('GET', path, session=session,
+                                 params=params, headers=headers)
+        try:
+            data = self.decoder(response.content)
+        except ValueError:
+            return response
+        if self.compact_records and isinstance(data, dict):
+            for resource in records.RECORD_TYPES:
+                if isinstance(data.get(resource), list):
+                    data[resource] = records.convert(resource,
+                                                     data[resource])
+        return data
+
+    def add_hook(self, hook):
+        """Register a callable invoked after every request
+
+        :param callable hook:
+            Called with a :class:`~octaviaclient.api.v2.tracing.RequestRecord`
+        """
+        self.hooks.append(hook)
+
+    @contextlib.contextmanager
+    def tagged(self, tag):
+        """Tag the records of the requests made in this block
+
+        :param string tag:
+            The tag, e.g. ``name-resolution``
+        """
+        previous = getattr(self._local, 'tag', None)
+        self._local.tag = tag
+        try:
+            yield
+        finally:
+            self._local.tag = previous
+
+    @contextlib.contextmanager
+    def planning(self, plan=None):
+        """Record requests into a plan instead of sending mutations
+
+        Reads are still sent so names can be resolved. Mutations are only
+        recorded and answered with their own request body.
+
+        :param plan:
+            The :class:`~octaviaclient.api.v2.plan.RequestPlan` to record
+            into, a new one is created if omitted
+        :return:
+            A context manager yielding the plan
+        """
+        plan = plan or request_plan.RequestPlan(
+            resolver=functools.partial(self.loadbalancer_index.get,
+                                       load=False))
+        self._plan = plan
+        try:
+            yield plan
+        finally:
+            self._plan = None
+
     def load_balancer_list(self, **params):
         """List all load balancers
 
@@ -67,6 +409,17 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def load_balancer_iter(self, **params):
+        """Iterate over all load balancers, one page at a time
+
+        :param params:
+            Parameters to filter on
+        :return:
+            A generator of load balancer ``dict``
+        """
+        return self.iter_list(const.BASE_LOADBALANCER_URL, 'loadbalancers',
+                              **params)
+
     def load_balancer_show(self, lb_id):
         """Show a load balancer
 
@@ -165,6 +518,16 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def listener_iter(self, **kwargs):
+        """Iterate over all listeners, one page at a time
+
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of listener ``dict``
+        """
+        return self.iter_list(const.BASE_LISTENER_URL, 'listeners', **kwargs)
+
     def listener_show(self, listener_id):
         """Show a listener
 
@@ -247,6 +610,16 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def pool_iter(self, **kwargs):
+        """Iterate over all pools, one page at a time
+
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of pool ``dict``
+        """
+        return self.iter_list(const.BASE_POOL_URL, 'pools', **kwargs)
+
     @correct_return_codes
     def pool_create(self, **kwargs):
         """Create a pool
@@ -318,6 +691,19 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def member_iter(self, pool_id, **kwargs):
+        """Iterate over the members of a pool, one page at a time
+
+        :param pool_id:
+            ID of the pool
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of member ``dict``
+        """
+        url = const.BASE_MEMBER_URL.format(pool_id=pool_id)
+        return self.iter_list(url, 'members', **kwargs)
+
     def member_show(self, pool_id, member_id):
         """Showing a member details of a pool
 
@@ -415,6 +801,16 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def l7policy_iter(self, **kwargs):
+        """Iterate over all l7policies, one page at a time
+
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of l7policy ``dict``
+        """
+        return self.iter_list(const.BASE_L7POLICY_URL, 'l7policies', **kwargs)
+
     @correct_return_codes
     def l7policy_create(self, **kwargs):
         """Create a l7policy
@@ -564,6 +960,17 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def health_monitor_iter(self, **kwargs):
+        """Iterate over all health monitors, one page at a time
+
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of health monitor ``dict``
+        """
+        return self.iter_list(const.BASE_HEALTH_MONITOR_URL, 'healthmonitors',
+                              **kwargs)
+
     @correct_return_codes
     def health_monitor_create(self, **kwargs):
         """Create a health monitor
@@ -636,6 +1043,17 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def quota_iter(self, **params):
+        """Iterate over all quotas, one page at a time
+
+        :param params:
+            Parameters to filter on
+        :return:
+            A generator of quota ``dict``
+        """
+        return self.iter_list(const.BASE_QUOTA_URL, 'quotas',
+                              marker_key='project_id', **params)
+
     def quota_show(self, project_id):
         """Show a quota
 
@@ -715,6 +1133,16 @@ class OctaviaAPI(api.BaseAPI):
 
         return response
 
+    def amphora_iter(self, **kwargs):
+        """Iterate over all amphorae, one page at a time
+
+        :param kwargs:
+            Parameters to filter on
+        :return:
+            A generator of amphora ``dict``
+        """
+        return self.iter_list(const.BASE_AMPHORA_URL, 'amphorae', **kwargs)
+
 
 class OctaviaClientException(Exception):
     """The base exception class for all exceptions this library raises."""
@@ -0,0 +1,240 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Request planning for dry runs and change window estimates"""
+
+import collections
+import json
+
+import requests
+from six.moves.urllib import parse
+
+READ_METHODS = ('GET', 'HEAD')
+
+# Path segments that name a collection, and the ones that name a fixed
+# sub-resource or action rather than an object ID.
+COLLECTIONS = frozenset((
+    'loadbalancers', 'listeners', 'pools', 'members', 'healthmonitors',
+    'l7policies', 'rules', 'quotas', 'amphorae',
+))
+SUB_RESOURCES = frozenset((
+    'stats', 'status', 'failover', 'defaults', 'members', 'rules',
+))
+
+# Defaults used by RequestPlan.estimate(), in seconds.
+DEFAULT_READ_LATENCY = 0.2
+DEFAULT_WRITE_LATENCY = 0.5
+DEFAULT_SETTLE_TIME = 5.0
+
+
+PlannedRequest = collections.namedtuple(
+    'PlannedRequest', ('method', 'url', 'template', 'loadbalancer_id'))
+
+
+def _path(url):
+    # find() builds '//lbaas/...' which urlsplit would read as a netloc
+    return parse.urlsplit('/' + url.lstrip('/')).path
+
+
+def url_template(url):
+    """Converts a request URL into its template and load balancer ID
+
+    :param string url:
+        The API-specific portion of the URL path, optionally with a query
+    :return:
+        A tuple of the URL template (object IDs replaced by ``{id}``) and
+        the load balancer ID found in the path, or ``None``
+    """
+    segments = [s for s in _path(url).split('/') if s]
+    lb_id = None
+    template = []
+    for i, segment in enumerate(segments):
+        previous = segments[i - 1] if i else None
+        if previous in COLLECTIONS and segment not in SUB_RESOURCES:
+            if previous == 'loadbalancers':
+                lb_id = segment
+            segment = '{id}'
+        template.append(segment)
+    return '/' + '/'.join(template), lb_id
+
+
+def object_ids(url):
+    """Object IDs found in a request URL path, outermost first"""
+    segments = [s for s in _path(url).split('/') if s]
+    return [segment for i, segment in enumerate(segments)
+            if i and segments[i - 1] in COLLECTIONS and
+            segment not in SUB_RESOURCES]
+
+
+def is_list_request(method, template):
+    """Whether a request reads a whole collection rather than one object"""
+    last = template.rsplit('/', 1)[-1]
+    return method in READ_METHODS and last in COLLECTIONS
+
+
+class RequestPlan(object):
+    """The HTTP calls a command would make, grouped for execution
+
+    Reads are executed while planning (names must still be resolved) and
+    are recorded so they can be counted. Mutations are only recorded.
+    Octavia allows one in-flight mutation per load balancer, each of which
+    takes the load balancer through ``PENDING_UPDATE``, so mutations on the
+    same load balancer are serialised and mutations on different load
+    balancers can run side by side. Wave ``n`` holds the ``n``-th mutation
+    of every load balancer.
+    """
+
+    def __init__(self, resolver=None,
+                 read_latency=DEFAULT_READ_LATENCY,
+                 write_latency=DEFAULT_WRITE_LATENCY,
+                 settle_time=DEFAULT_SETTLE_TIME):
+        """Create a request plan
+
+        :param callable resolver:
+            Optional callable mapping an object ID to the ID of the load
+            balancer that owns it
+        :param float read_latency:
+            Expected latency of a single read, in seconds
+        :param float write_latency:
+            Expected latency of a single mutation, in seconds
+        :param float settle_time:
+            Expected time for a load balancer to go back to ``ACTIVE``
+            after a mutation, in seconds
+        """
+        self.resolver = resolver
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.settle_time = settle_time
+        self.requests = []
+
+    def record(self, method, url, params=None):
+        """Record a request
+
+        :param string method:
+            The HTTP method name
+        :param string url:
+            The API-specific portion of the URL path
+        :param params:
+            A dict of query string parameters
+        :return:
+            The recorded :class:`PlannedRequest`
+        """
+        if params:
+            url = '%s?%s' % (url, parse.urlencode(sorted(params.items())))
+        template, lb_id = url_template(url)
+        if lb_id is None and method not in READ_METHODS:
+            lb_id = self._resolve(url)
+        request = PlannedRequest(method, url, template, lb_id)
+        self.requests.append(request)
+        return request
+
+    def _resolve(self, url):
+        if self.resolver is None:
+            return None
+        # Walk from the innermost object outwards until one is known.
+        for object_id in reversed(object_ids(url)):
+            lb_id = self.resolver(object_id)
+            if lb_id:
+                return lb_id
+        return None
+
+    @staticmethod
+    def response(method, body=None):
+        """Build the response returned for a mutation that was not sent
+
+        The request body is echoed back so callers can render it.
+        """
+        response = requests.Response()
+        response.status_code = 204 if method == 'DELETE' else 202
+        if body is not None:
+            response._content = json.dumps(body).encode('utf-8')
+            response.headers['Content-Type'] = 'application/json'
+        else:
+            response._content = b''
+        return response
+
+    @property
+    def reads(self):
+        return [r for r in self.requests if r.method in READ_METHODS]
+
+    @property
+    def writes(self):
+        return [r for r in self.requests if r.method not in READ_METHODS]
+
+    def counts(self):
+        """Count requests by kind
+
+        :return:
+            A ``dict`` keyed by ``list``, ``GET`` and the mutation methods
+        """
+        counts = collections.OrderedDict(
+            (k, 0) for k in ('list', 'GET', 'POST', 'PUT', 'DELETE'))
+        for request in self.requests:
+            if is_list_request(request.method, request.template):
+                counts['list'] += 1
+            else:
+                counts[request.method] = counts.get(request.method, 0) + 1
+        return counts
+
+    def waves(self):
+        """Group the mutations into dependency waves
+
+        Mutations whose load balancer is unknown are keyed by their own
+        object URL.
+
+        :return:
+            A list of waves, each a list of :class:`PlannedRequest`
+        """
+        waves = []
+        depth = collections.defaultdict(int)
+        for request in self.writes:
+            key = request.loadbalancer_id or _path(request.url)
+            if depth[key] == len(waves):
+                waves.append([])
+            waves[depth[key]].append(request)
+            depth[key] += 1
+        return waves
+
+    def serialisation_points(self):
+        """Number of mutations that must wait for a load balancer to settle
+
+        Every mutation after the first on a load balancer waits for the
+        previous one to take it out of ``PENDING_UPDATE``.
+        """
+        waves = self.waves()
+        return sum(len(w) for w in waves[1:])
+
+    def estimate(self):
+        """Estimate the wall clock time the plan takes, in seconds"""
+        return (len(self.reads) * self.read_latency +
+                len(self.waves()) * (self.write_latency + self.settle_time))
+
+    def format(self):
+        """Render the plan as lines of text"""
+        lines = []
+        for request in self.reads:
+            lines.append('read: %s %s' % (request.method, request.url))
+        for i, wave in enumerate(self.waves(), 1):
+            lines.append('wave %d:' % i)
+            for request in wave:
+                owner = request.loadbalancer_id or '-'
+                lines.append('  %s %s (loadbalancer: %s)' % (
+                    request.method, request.url, owner))
+        counts = self.counts()
+        lines.append('requests: %s' % ', '.join(
+            '%d %s' % (v, k) for k, v in counts.items()))
+        lines.append('waves: %d, serialisation points on '
+                     'provisioning_status: %d' % (
+                         len(self.waves()), self.serialisation_points()))
+        lines.append('estimated duration: %.1fs' % self.estimate())
+        return lines
@@ -0,0 +1,205 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Compact read-only records for large listings"""
+
+try:
+    from collections import abc
+except ImportError:  # Python 2
+    import collections as abc
+
+# Fields taking few distinct values, shared between records instead of
+# stored once per record.
+SHARED_FIELDS = frozenset((
+    'action',
+    'compare_type',
+    'lb_algorithm',
+    'operating_status',
+    'project_id',
+    'protocol',
+    'provider',
+    'provisioning_status',
+    'role',
+    'status',
+    'type',
+))
+
+# Fields listing related objects as ``{'id': ...}`` dicts
+REFERENCE_FIELDS = frozenset((
+    'l7policies',
+    'listeners',
+    'loadbalancers',
+    'members',
+    'pools',
+    'rules',
+))
+
+_MISSING = object()
+_shared = {}
+
+
+def _share(value):
+    try:
+        return _shared.setdefault(value, value)
+    except TypeError:
+        return value
+
+
+def _references(value):
+    if not all(isinstance(ref, dict) and list(ref) == ['id']
+               for ref in value):
+        return value
+    return [Reference(ref) for ref in value]
+
+
+class Record(abc.Mapping):
+    """A read-only mapping storing its known keys in slots
+
+    Records behave like the ``dict`` they are built from, so they can be
+    given to ``osc_lib.utils.get_dict_properties`` and the formatters, but
+    take a fraction of the memory. Keys unknown to the record type, e.g.
+    added by a newer API, are kept in a ``dict`` of their own.
+    """
+
+    __slots__ = ('_extra',)
+    _fields = ()
+
+    def __init__(self, data):
+        for field in self._fields:
+            value = data.get(field, _MISSING)
+            if field in SHARED_FIELDS:
+                value = _share(value)
+            elif field in REFERENCE_FIELDS and isinstance(value, list):
+                value = _references(value)
+            object.__setattr__(self, field, value)
+        extra = dict((k, v) for k, v in data.items()
+                     if k not in self._field_set)
+        object.__setattr__(self, '_extra', extra or None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is read-only' % type(self).__name__)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for field in self._fields:
+            if getattr(self, field) is not _MISSING:
+                yield field
+        for key in self._extra or ():
+            yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.to_dict())
+
+    def to_dict(self):
+        """Get a ``dict`` copy of the record, references included"""
+        return to_builtin(self)
+
+
+def to_builtin(value):
+    """Convert the records in a value to ``dict``
+
+    Records are not ``dict``, so ``json`` cannot serialise them. Lists and
+    mappings are copied, recursively; other values are returned as they are.
+    """
+    if isinstance(value, abc.Mapping):
+        return dict((key, to_builtin(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    return value
+
+
+def _record_type(name, fields):
+    return type(name, (Record,), {'__slots__': fields, '_fields': fields,
+                                  '_field_set': frozenset(fields)})
+
+
+Reference = _record_type('Reference', ('id',))
+
+_COMMON = ('id', 'project_id', 'provisioning_status', 'operating_status',
+           'admin_state_up', 'created_at', 'updated_at')
+
+LoadBalancer = _record_type('LoadBalancer', _COMMON + (
+    'name', 'description', 'provider', 'flavor_id', 'vip_address',
+    'vip_port_id', 'vip_subnet_id', 'vip_network_id', 'vip_qos_policy_id',
+    'listeners', 'pools'))
+
+Listener = _record_type('Listener', _COMMON + (
+    'name', 'description', 'protocol', 'protocol_port', 'connection_limit',
+    'default_pool_id', 'default_tls_container_ref', 'sni_container_refs',
+    'insert_headers', 'l7policies', 'loadbalancers', 'timeout_client_data',
+    'timeout_member_connect', 'timeout_member_data', 'timeout_tcp_inspect'))
+
+Pool = _record_type('Pool', _COMMON + (
+    'name', 'description', 'protocol', 'lb_algorithm', 'session_persistence',
+    'healthmonitor_id', 'listeners', 'loadbalancers', 'members'))
+
+Member = _record_type('Member', _COMMON + (
+    'name', 'address', 'protocol_port', 'weight', 'subnet_id',
+    'monitor_address', 'monitor_port', 'backup'))
+
+HealthMonitor = _record_type('HealthMonitor', _COMMON + (
+    'name', 'type', 'delay', 'timeout', 'max_retries', 'max_retries_down',
+    'http_method', 'url_path', 'expected_codes', 'pools'))
+
+L7Policy = _record_type('L7Policy', _COMMON + (
+    'name', 'description', 'listener_id', 'action', 'position',
+    'redirect_pool_id', 'redirect_url', 'redirect_prefix', 'rules'))
+
+L7Rule = _record_type('L7Rule', _COMMON + (
+    'type', 'compare_type', 'key', 'value', 'invert'))
+
+Amphora = _record_type('Amphora', (
+    'id', 'loadbalancer_id', 'compute_id', 'lb_network_ip', 'vrrp_ip',
+    'ha_ip', 'vrrp_port_id', 'ha_port_id', 'cert_expiration', 'cert_busy',
+    'role', 'status', 'vrrp_interface', 'vrrp_id', 'vrrp_priority',
+    'cached_zone', 'image_id', 'created_at', 'updated_at'))
+
+# Record type of each collection key of the API
+RECORD_TYPES = {
+    'loadbalancers': LoadBalancer,
+    'listeners': Listener,
+    'pools': Pool,
+    'members': Member,
+    'healthmonitors': HealthMonitor,
+    'l7policies': L7Policy,
+    'rules': L7Rule,
+    'amphorae': Amphora,
+}
+
+
+def convert(resource, objects):
+    """Convert the objects of a collection to records
+
+    :param string resource:
+        The collection key, e.g. ``pools``
+    :param objects:
+        An iterable of object ``dict``
+    :return:
+        A list of records, or of the objects if the collection has no
+        record type
+    """
+    record_type = RECORD_TYPES.get(resource)
+    if record_type is None:
+        return list(objects)
+    return [record_type(obj) for obj in objects]
@@ -0,0 +1,90 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Retry policy for transient Octavia API errors"""
+
+import random
+
+from oslo_utils import timeutils
+
+
+class RetryPolicy(object):
+    """Jittered exponential backoff bounded by a deadline
+
+    Octavia rejects a mutation with ``409 Conflict`` while the load
+    balancer it touches is immutable (``PENDING_*``), and the API answers
+    ``503`` while it is overloaded or restarting. Both clear up on their
+    own, so they are retried; every other error is raised straight away.
+    """
+
+    def __init__(self, deadline=300, initial_delay=1.0, max_delay=30.0,
+                 multiplier=2.0):
+        """Create a retry policy
+
+        :param float deadline:
+            Seconds after the first attempt past which no retry is made
+        :param float initial_delay:
+            Upper bound of the first backoff, in seconds
+        :param float max_delay:
+            Upper bound of any single backoff, in seconds
+        :param float multiplier:
+            Growth factor of the backoff bound between attempts
+        """
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    @staticmethod
+    def is_retryable(status_code, message=None):
+        """Whether an error response should be retried
+
+        :param int status_code:
+            The HTTP status code of the response
+        :param string message:
+            The fault string of the response
+        """
+        if status_code == 503:
+            return True
+        return status_code == 409 and 'immutable' in (message or '').lower()
+
+    def start(self):
+        """Start the deadline, before the first attempt
+
+        :return:
+            A running ``oslo_utils.timeutils.StopWatch``
+        """
+        watch = timeutils.StopWatch(duration=self.deadline)
+        watch.start()
+        return watch
+
+    def delays(self, watch=None):
+        """Generate backoff delays until the deadline is reached
+
+        Each delay is drawn uniformly between zero and the current bound
+        ("full jitter") so that many clients backing off from the same load
+        balancer do not retry in lockstep.
+
+        :param watch:
+            The watch returned by :meth:`start` before the first attempt.
+            Without it the deadline starts at the first delay.
+        """
+        if watch is None:
+            watch = self.start()
+        bound = self.initial_delay
+        while True:
+            delay = random.uniform(0, min(bound, self.max_delay))
+            if delay > watch.leftover():
+                return
+            yield delay
+            bound *= self.multiplier
@@ -0,0 +1,171 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Per load balancer operation queue"""
+
+import collections
+from concurrent import futures
+import logging
+
+from octaviaclient.api.v2 import waiter
+
+LOG = logging.getLogger(__name__)
+
+# Keyword arguments and request body keys that identify the object a
+# mutation touches, cheapest to resolve first.
+OWNER_KEYS = (
+    'lb_id', 'loadbalancer_id', 'listener_id', 'pool_id',
+    'health_monitor_id', 'l7policy_id',
+)
+
+OperationResult = collections.namedtuple(
+    'OperationResult', ('loadbalancer_id', 'func', 'result', 'error'))
+
+
+class SkippedError(Exception):
+    """An operation was not run because an earlier one on its LB failed"""
+
+
+class LoadBalancerQueue(object):
+    """Runs mutations one at a time per load balancer
+
+    Octavia allows one in-flight mutation per load balancer. Operations
+    are keyed by the load balancer they belong to: operations on the same
+    load balancer run in submission order, waiting for it to go back to
+    ``ACTIVE`` between two of them, while different load balancers are
+    worked on concurrently.
+    """
+
+    def __init__(self, api, max_workers=8, timeout=waiter.DEFAULT_TIMEOUT,
+                 interval=waiter.DEFAULT_INTERVAL, stop_on_error=True):
+        """Create a queue
+
+        :param api:
+            The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+        :param int max_workers:
+            Number of load balancers worked on at the same time
+        :param float timeout:
+            Seconds to wait for a load balancer to go back to ``ACTIVE``
+        :param float interval:
+            Seconds between two status polls
+        :param bool stop_on_error:
+            Skip the remaining operations of a load balancer once one of
+            its operations failed
+        """
+        self.api = api
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.interval = interval
+        self.stop_on_error = stop_on_error
+        self._queues = collections.OrderedDict()
+        self._order = []
+        self._owners = {}
+
+    def submit(self, func, *args, **kwargs):
+        """Queue an OctaviaAPI mutation
+
+        The owning load balancer is derived from the ID keyword arguments
+        of the call (``lb_id``, ``listener_id``, ``pool_id``,
+        ``health_monitor_id``, ``l7policy_id``) or, for creates, from the
+        same keys in the ``json`` request body. Pass IDs as keywords.
+
+        :param callable func:
+            An :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` method
+        :return:
+            The ID of the load balancer the operation was queued on
+        """
+        lb_id = self.find_loadbalancer_id(kwargs)
+        self._queues.setdefault(lb_id, []).append((func, args, kwargs))
+        self._order.append((lb_id, len(self._queues[lb_id]) - 1))
+        return lb_id
+
+    def find_loadbalancer_id(self, kwargs):
+        """Find the root load balancer of a call's keyword arguments"""
+        owners = dict(kwargs)
+        body = kwargs.get('json') or {}
+        for value in body.values():
+            if isinstance(value, dict):
+                owners.update((k, v) for k, v in value.items()
+                              if k in OWNER_KEYS and k not in owners)
+        for key in OWNER_KEYS:
+            if owners.get(key):
+                return self._resolve(key, owners[key])
+        raise ValueError('Unable to find the load balancer of %s' % kwargs)
+
+    def _resolve(self, key, object_id):
+        if key in ('lb_id', 'loadbalancer_id'):
+            return object_id
+        # The index is only used once filled by someone else: filling it
+        # lists every collection, far more than the few show calls of a
+        # walk. Unknown objects are walked to once.
+        lb_id = self.api.loadbalancer_index.get(object_id, load=False)
+        if lb_id:
+            return lb_id
+        if object_id not in self._owners:
+            self._owners[object_id] = self._walk(key, object_id)
+        return self._owners[object_id]
+
+    def _walk(self, key, object_id):
+        if key == 'listener_id':
+            listener = self.api.listener_show(object_id)
+            return listener['loadbalancers'][0]['id']
+        if key == 'pool_id':
+            pool = self.api.pool_show(object_id)
+            if pool.get('loadbalancers'):
+                return pool['loadbalancers'][0]['id']
+            return self._resolve('listener_id', pool['listeners'][0]['id'])
+        if key == 'health_monitor_id':
+            monitor = self.api.health_monitor_show(object_id)
+            return self._resolve('pool_id', monitor['pools'][0]['id'])
+        policy = self.api.l7policy_show(object_id)
+        return self._resolve('listener_id', policy['listener_id'])
+
+    def run(self):
+        """Run every queued operation
+
+        :return:
+            A list of :class:`OperationResult`, in submission order
+        """
+        results = {}
+        with futures.ThreadPoolExecutor(self.max_workers) as executor:
+            jobs = [executor.submit(self._run_loadbalancer, lb_id, ops)
+                    for lb_id, ops in self._queues.items()]
+            for job in futures.as_completed(jobs):
+                results.update(job.result())
+        self._queues.clear()
+        order, self._order = self._order, []
+        return [results[key] for key in order]
+
+    def _run_loadbalancer(self, lb_id, operations):
+        results = {}
+        failed = False
+        for i, (func, args, kwargs) in enumerate(operations):
+            if failed and self.stop_on_error:
+                error = SkippedError('Skipped after an earlier failure on '
+                                     'load balancer %s' % lb_id)
+                results[(lb_id, i)] = OperationResult(lb_id, func, None,
+                                                      error)
+                continue
+            try:
+                result = func(*args, **kwargs)
+                waiter.wait_for_active(self.api, lb_id, self.timeout,
+                                       self.interval)
+            except Exception as e:
+                LOG.debug('Operation %s on load balancer %s failed: %s',
+                          getattr(func, '__name__', func), lb_id, e)
+                failed = True
+                results[(lb_id, i)] = OperationResult(lb_id, func, None, e)
+            else:
+                results[(lb_id, i)] = OperationResult(lb_id, func, result,
+                                                      None)
+        return results
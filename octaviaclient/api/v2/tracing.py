@@ -0,0 +1,112 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Request tracing and timing hooks for the Octavia API"""
+
+import collections
+import json
+import threading
+
+# ``bytes`` is the size of the decoded body, ``wire_bytes`` the size
+# received, which is smaller for compressed responses.
+RequestRecord = collections.namedtuple(
+    'RequestRecord', ('method', 'url', 'template', 'status', 'bytes',
+                      'latency', 'request_id', 'tag', 'wire_bytes'))
+
+
+class TimingCollector(object):
+    """Collects request records and summarises them by URL template
+
+    A hook for :meth:`OctaviaAPI.add_hook`.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self):
+        """Aggregate the records
+
+        :return:
+            A list of ``(tag, method, template, count, total, max, bytes,
+            wire_bytes)`` tuples, slowest total first
+        """
+        groups = collections.OrderedDict()
+        for r in self.records:
+            key = (r.tag or '-', r.method, r.template)
+            count, total, slowest, size, wire = groups.get(
+                key, (0, 0.0, 0.0, 0, 0))
+            groups[key] = (count + 1, total + r.latency,
+                           max(slowest, r.latency), size + (r.bytes or 0),
+                           wire + (r.wire_bytes or 0))
+        rows = [k + v for k, v in groups.items()]
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+    def format(self, session=None, endpoint=None):
+        """Render the summary as lines of text
+
+        :param session:
+            Optional keystoneauth session; when it collects timings, the
+            time spent talking to other services (Keystone, Neutron, ...)
+            is reported separately
+        :param string endpoint:
+            The Octavia endpoint, used to tell its requests apart in the
+            session timings
+        """
+        lines = ['%-16s %-6s %-40s %6s %9s %9s %10s %10s' % (
+            'Tag', 'Method', 'URL', 'Count', 'Total', 'Max', 'Bytes',
+            'Wire')]
+        for tag, method, template, count, total, slowest, size, wire in (
+                self.summary()):
+            lines.append('%-16s %-6s %-40s %6d %8.3fs %8.3fs %10d %10d' % (
+                tag, method, template, count, total, slowest, size, wire))
+        octavia_total = sum(r.latency for r in self.records)
+        size = sum(r.bytes or 0 for r in self.records)
+        wire = sum(r.wire_bytes or 0 for r in self.records)
+        if wire and wire < size:
+            lines.append('compression: %d bytes received for %d bytes, '
+                         'ratio %.1f' % (wire, size, float(size) / wire))
+        lines.append('octavia: %d requests, %.3fs' % (
+            len(self.records), octavia_total))
+
+        timings = getattr(session, 'get_timings', lambda: [])()
+        if timings and endpoint:
+            others = [t for t in timings if not t.url.startswith(endpoint)]
+            lines.append('other services: %d requests, %.3fs' % (
+                len(others),
+                sum(t.elapsed.total_seconds() for t in others)))
+        return lines
+
+
+class TraceFileWriter(object):
+    """Writes one JSON object per request to a file
+
+    A hook for :meth:`OctaviaAPI.add_hook`.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record._asdict(), sort_keys=True)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
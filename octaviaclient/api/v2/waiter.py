@@ -0,0 +1,69 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Waiting for load balancers to settle"""
+
+import time
+
+from osc_lib import exceptions
+from oslo_utils import timeutils
+
+DEFAULT_TIMEOUT = 600
+DEFAULT_INTERVAL = 2
+
+
+class WaitError(Exception):
+    """A load balancer did not reach a usable state"""
+
+
+class WaitTimeout(WaitError):
+    """A load balancer stayed in a PENDING_* state for too long"""
+
+
+class ProvisioningError(WaitError):
+    """A load balancer went to provisioning_status ERROR"""
+
+
+def wait_for_active(api, lb_id, timeout=DEFAULT_TIMEOUT,
+                    interval=DEFAULT_INTERVAL):
+    """Wait for a load balancer to go back to ACTIVE
+
+    :param api:
+        The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to poll with
+    :param string lb_id:
+        ID of the load balancer
+    :param float timeout:
+        Seconds to wait before giving up
+    :param float interval:
+        Seconds between two polls
+    :return:
+        The load balancer, or ``None`` if it no longer exists
+    """
+    watch = timeutils.StopWatch(duration=timeout)
+    watch.start()
+    while True:
+        try:
+            lb = api.load_balancer_show(lb_id)
+        except exceptions.NotFound:
+            return None
+        status = lb.get('provisioning_status')
+        if status in ('ACTIVE', 'DELETED'):
+            return lb
+        if status == 'ERROR':
+            raise ProvisioningError(
+                'Load balancer %s went to provisioning_status ERROR' % lb_id)
+        if watch.expired():
+            raise WaitTimeout(
+                'Load balancer %s still %s after %ss' % (lb_id, status,
+                                                         timeout))
+        time.sleep(min(interval, watch.leftover()))
@@ -12,9 +12,13 @@
 
 """OpenStackClient plugin for Load Balancer service."""
 
+import atexit
 import logging
+import sys
 
+from octaviaclient.api.v2 import cache
 from octaviaclient.api.v2 import octavia
+from octaviaclient.api.v2 import tracing
 from osc_lib import utils
 
 LOG = logging.getLogger(__name__)
@@ -27,6 +31,9 @@ LOAD_BALANCER_API_VERSIONS = {
     '2.0': 'octaviaclient.api.v2.octavia.OctaviaAPI',
 }
 
+# Number of GET responses kept for conditional requests, 0 to disable
+RESPONSE_CACHE_SIZE = 256
+
 
 def make_client(instance):
     """Returns a load balancer service client"""
@@ -35,14 +42,39 @@ def make_client(instance):
         region_name=instance.region_name,
         interface=instance.interface,
     )
+    config = instance.get_configuration()
+    response_cache = None
+    cache_size = int(config.get('loadbalancer_response_cache_size',
+                                RESPONSE_CACHE_SIZE))
+    if cache_size:
+        ttl = float(config.get('loadbalancer_response_cache_ttl', 0))
+        response_cache = cache.ResponseCache(cache_size, ttl)
     client = octavia.OctaviaAPI(
         session=instance.session,
         service_type='load-balancer',
         endpoint=endpoint,
+        response_cache=response_cache,
     )
+
+    if instance.timing:
+        collector = tracing.TimingCollector()
+        client.add_hook(collector)
+        atexit.register(_write_timing, collector, client)
+
+    trace_file = config.get('loadbalancer_trace_file')
+    if trace_file:
+        writer = tracing.TraceFileWriter(trace_file)
+        client.add_hook(writer)
+        atexit.register(writer.close)
+
     return client
 
 
+def _write_timing(collector, client):
+    for line in collector.format(client.session, client.endpoint):
+        sys.stderr.write(line + '\n')
+
+
 def build_option_parser(parser):
     """Hook to add global options
 
@@ -62,4 +94,11 @@ def build_option_parser(parser):
         help='OSC Plugin API version, default=' +
              DEFAULT_LOADBALANCER_API_VERSION +
              ' (Env: OS_LOADBALANCER_API_VERSION)')
+    parser.add_argument(
+        '--os-loadbalancer-trace-file',
+        metavar='<trace-file>',
+        default=utils.env('OS_LOADBALANCER_TRACE_FILE'),
+        help='Append a JSON line per load balancer API request (method, '
+             'URL template, status, bytes, latency, request ID) to this '
+             'file (Env: OS_LOADBALANCER_TRACE_FILE)')
     return parser
@@ -13,12 +13,17 @@
 
 """Amphora action implementation"""
 
+import collections
 
 from cliff import lister
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
 
+from octaviaclient.api.v2 import amphora_index
+from octaviaclient.api.v2 import concurrency
 from octaviaclient.osc.v2 import constants as const
+from octaviaclient.osc.v2 import export
 from octaviaclient.osc.v2 import utils as v2_utils
 
 
@@ -61,15 +66,71 @@ class ListAmphora(lister.Lister):
             type=lambda s: s.upper(),  # case insensitive
             help="Filter by amphora provisioning status."
         )
+        parser.add_argument(
+            '--cached',
+            action='store_true',
+            default=False,
+            help="Answer from a local amphora index kept in the user cache "
+                 "directory, refreshed with the changes since its last use.",
+        )
+        v2_utils.add_changes_since_argument(parser)
+        export.add_export_argument(parser)
 
         return parser
 
+    @staticmethod
+    def _list_cached(api, parsed_args):
+        index = amphora_index.AmphoraIndex(
+            api, path=v2_utils.cache_path('amphorae', api.endpoint))
+        index.refresh()
+
+        lb_id = None
+        if parsed_args.loadbalancer:
+            lb_ids = index.find_loadbalancer_ids(parsed_args.loadbalancer)
+            if len(lb_ids) != 1:
+                msg = ("{0} loadbalancers found with name or ID of {1}. "
+                       "Please try again with UUID".format(
+                           len(lb_ids), parsed_args.loadbalancer))
+                raise exceptions.CommandError(msg)
+            lb_id = lb_ids[0]
+
+        if parsed_args.compute_id:
+            amp = index.by_compute_id(parsed_args.compute_id)
+            amphorae = [amp] if amp else []
+        elif lb_id:
+            amphorae = index.by_loadbalancer(lb_id)
+        else:
+            amphorae = index.amphorae.values()
+
+        filters = {
+            'loadbalancer_id': lb_id,
+            'role': parsed_args.role,
+            'status': parsed_args.status,
+        }
+        return {'amphorae': [
+            amp for amp in amphorae
+            if all(v is None or amp.get(k) == v for k, v in filters.items())
+        ]}
+
     def take_action(self, parsed_args):
         columns = const.AMPHORA_COLUMNS
-        attrs = v2_utils.get_amphora_attrs(self.app.client_manager,
-                                           parsed_args)
+        api = self.app.client_manager.load_balancer
+        if parsed_args.cached:
+            amphorae = self._list_cached(api, parsed_args)['amphorae']
+        else:
+            attrs = v2_utils.get_amphora_attrs(self.app.client_manager,
+                                               parsed_args)
+            if parsed_args.changes_since:
+                amphorae = v2_utils.list_changes(
+                    api, 'amphorae', parsed_args.changes_since, **attrs)
+            elif parsed_args.export:
+                amphorae = api.amphora_iter(**attrs)
+            else:
+                amphorae = api.amphora_list(**attrs)['amphorae']
 
-        data = self.app.client_manager.load_balancer.amphora_list(**attrs)
+        if parsed_args.export:
+            return export.export(parsed_args.export, amphorae,
+                                 const.AMPHORA_ROWS)
 
         formatters = {
             'amphorae': v2_utils.format_list,
@@ -81,10 +142,100 @@ class ListAmphora(lister.Lister):
                 amp,
                 columns,
                 formatters=formatters,
-                ) for amp in data['amphorae']),
+                ) for amp in amphorae),
         )
 
 
+class SummaryAmphora(lister.Lister):
+    """Summarize the amphora fleet and flag unhealthy load balancers"""
+
+    def get_parser(self, prog_name):
+        parser = super(SummaryAmphora, self).get_parser(prog_name)
+
+        parser.add_argument(
+            '--page-size',
+            metavar='<count>',
+            type=int,
+            default=None,
+            help="Number of amphorae fetched per request.",
+        )
+
+        return parser
+
+    @staticmethod
+    def _aggregate(amphorae):
+        counts = collections.OrderedDict(
+            (category, collections.Counter())
+            for category in ('status', 'role', 'image'))
+        # Per load balancer: roles seen and number of ERROR amphorae
+        loadbalancers = collections.defaultdict(lambda: [set(), 0])
+        total = 0
+        for amp in amphorae:
+            total += 1
+            status = amp.get('status')
+            counts['status'][status] += 1
+            if status == 'DELETED':
+                continue
+            counts['role'][amp.get('role')] += 1
+            counts['image'][amp.get('image_id')] += 1
+            lb_id = amp.get('loadbalancer_id')
+            if lb_id:
+                loadbalancers[lb_id][0].add(amp.get('role'))
+                if status == 'ERROR':
+                    loadbalancers[lb_id][1] += 1
+        return total, counts, loadbalancers
+
+    @staticmethod
+    def _problems(lbs, amphorae):
+        for lb in lbs:
+            roles, errors = amphorae.get(lb['id'], (set(), 0))
+            problems = []
+            if not roles:
+                if (lb.get('provider') in (None, 'amphora', 'octavia') and
+                        lb.get('provisioning_status') == 'ACTIVE'):
+                    problems.append('no amphora')
+            elif roles & {'MASTER', 'BACKUP'}:
+                problems.extend('missing %s' % role
+                                for role in ('MASTER', 'BACKUP')
+                                if role not in roles)
+            if errors:
+                problems.append('%d ERROR amphora(e)' % errors)
+            if problems:
+                yield lb, ', '.join(problems)
+
+    def take_action(self, parsed_args):
+        columns = const.AMPHORA_SUMMARY_COLUMNS
+        api = self.app.client_manager.load_balancer
+        page_size = {}
+        if parsed_args.page_size:
+            page_size['page_size'] = parsed_args.page_size
+
+        # Amphorae are aggregated as their pages arrive while the load
+        # balancers are fetched alongside.
+        results = concurrency.gather({
+            'amphorae': lambda: self._aggregate(api.amphora_iter(
+                **page_size)),
+            'loadbalancers': lambda: [
+                dict((k, lb.get(k)) for k in ('id', 'name', 'provider',
+                                              'provisioning_status'))
+                for lb in api.load_balancer_iter(**page_size)],
+        })
+        total, counts, amphorae = results['amphorae']
+
+        rows = [('total', 'amphorae', total)]
+        for category, counter in counts.items():
+            rows.extend((category, key, count)
+                        for key, count in sorted(counter.items(),
+                                                 key=lambda i: str(i[0])))
+        rows.extend(('loadbalancer', lb['id'], problem)
+                    for lb, problem in self._problems(
+                        results['loadbalancers'], amphorae))
+
+        return (columns,
+                (utils.get_dict_properties(dict(zip(columns, row)), columns)
+                 for row in rows))
+
+
 class ShowAmphora(command.ShowOne):
     """Show the details of a single amphora"""
 
@@ -41,6 +41,31 @@ LOAD_BALANCER_COLUMNS = (
     'provisioning_status',
     'provider')
 
+LOAD_BALANCER_REGION_COLUMNS = ('region',) + LOAD_BALANCER_COLUMNS
+
+LOAD_BALANCER_FIND_COLUMNS = (
+    'address',
+    'kind',
+    'loadbalancer_id',
+    'loadbalancer_name',
+    'pool_id',
+    'pool_name',
+    'member_id',
+    'protocol_port',
+)
+
+MIRROR_REFRESH_COLUMNS = (
+    'resource',
+    'fetched',
+    'mirrored',
+)
+
+LOAD_BALANCER_BULK_FAILOVER_COLUMNS = (
+    'loadbalancer_id',
+    'status',
+    'error',
+)
+
 LOAD_BALANCER_STATS_ROWS = (
     'active_connections',
     'bytes_in',
@@ -156,6 +181,27 @@ L7POLICY_COLUMNS = (
     'position',
     'admin_state_up')
 
+L7POLICY_SYNC_COLUMNS = (
+    'l7policy',
+    'operation',
+    'detail',
+)
+
+L7POLICY_EVALUATE_COLUMNS = (
+    'host',
+    'path',
+    'l7policy',
+    'action',
+    'target',
+)
+
+L7POLICY_EVALUATE_SUMMARY_COLUMNS = (
+    'l7policy',
+    'action',
+    'target',
+    'requests',
+)
+
 L7RULE_ROWS = (
     'created_at',
     'compare_type',
@@ -209,6 +255,12 @@ MONITOR_COLUMNS = (
     'admin_state_up',
 )
 
+MONITOR_AUDIT_COLUMNS = (
+    'pool_id',
+    'healthmonitor_id',
+    'issue',
+)
+
 QUOTA_ROWS = (
     'load_balancer',
     'listener',
@@ -226,6 +278,22 @@ QUOTA_COLUMNS = (
     'member',
 )
 
+QUOTA_USAGE_COLUMNS = (
+    'project_id',
+    'load_balancer',
+    'listener',
+    'pool',
+    'health_monitor',
+    'member',
+    'headroom',
+)
+
+QUOTA_BULK_COLUMNS = (
+    'project',
+    'project_id',
+    'result',
+)
+
 AMPHORA_ROWS = (
     'id',
     'loadbalancer_id',
@@ -253,3 +321,9 @@ AMPHORA_COLUMNS = (
     'lb_network_ip',
     'ha_ip',
 )
+
+AMPHORA_SUMMARY_COLUMNS = (
+    'category',
+    'key',
+    'value',
+)
@@ -0,0 +1,172 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Columnar export of listings to Parquet files"""
+
+import json
+
+from osc_lib import exceptions
+import six
+
+from octaviaclient.api.v2 import records
+
+try:
+    from collections import abc
+except ImportError:  # Python 2
+    import collections as abc
+
+try:
+    import pyarrow
+    from pyarrow import parquet
+except ImportError:
+    pyarrow = None
+
+# Rows written at once; only one batch is held in memory
+BATCH_SIZE = 10000
+
+# Columns with few distinct values, dictionary encoded
+DICTIONARY_COLUMNS = frozenset((
+    'lb_algorithm',
+    'operating_status',
+    'protocol',
+    'provider',
+    'provisioning_status',
+    'role',
+    'status',
+))
+
+BOOLEAN_COLUMNS = frozenset((
+    'admin_state_up',
+    'backup',
+    'cert_busy',
+))
+
+INTEGER_COLUMNS = frozenset((
+    'monitor_port',
+    'protocol_port',
+    'vrrp_id',
+    'vrrp_priority',
+    'weight',
+))
+
+EXPORT_COLUMNS = ('path', 'rows')
+
+
+def _text(value):
+    if value is None or isinstance(value, six.string_types):
+        return value
+    if isinstance(value, (list, tuple)):
+        # Lists of related objects, as shown by the list commands. They
+        # may be records rather than dicts.
+        return '\n'.join(item['id'] if isinstance(item, abc.Mapping) else
+                         six.text_type(item) for item in value)
+    if isinstance(value, abc.Mapping):
+        return json.dumps(records.to_builtin(value), sort_keys=True)
+    return six.text_type(value)
+
+
+def _converter(column):
+    if column in BOOLEAN_COLUMNS:
+        return lambda v: None if v is None else bool(v)
+    if column in INTEGER_COLUMNS:
+        return lambda v: None if v is None else int(v)
+    return _text
+
+
+def iter_batches(objects, columns, batch_size=BATCH_SIZE):
+    """Group objects into batches of column values
+
+    :param objects:
+        An iterable of object ``dict``, consumed one batch at a time
+    :param columns:
+        The columns to export, missing keys are exported as null
+    :param int batch_size:
+        Maximum number of rows of a batch
+    :return:
+        A generator of ``dict`` of column name to list of values
+    """
+    converters = [(column, _converter(column)) for column in columns]
+    batch = dict((column, []) for column in columns)
+    size = 0
+    for obj in objects:
+        for column, convert in converters:
+            batch[column].append(convert(obj.get(column)))
+        size += 1
+        if size == batch_size:
+            yield batch
+            batch = dict((column, []) for column in columns)
+            size = 0
+    if size:
+        yield batch
+
+
+def arrow_schema(columns):
+    """Build the fixed schema of an export"""
+    fields = []
+    for column in columns:
+        if column in DICTIONARY_COLUMNS:
+            column_type = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+        elif column in BOOLEAN_COLUMNS:
+            column_type = pyarrow.bool_()
+        elif column in INTEGER_COLUMNS:
+            column_type = pyarrow.int64()
+        else:
+            column_type = pyarrow.string()
+        fields.append(pyarrow.field(column, column_type))
+    return pyarrow.schema(fields)
+
+
+def write_parquet(path, objects, columns, batch_size=BATCH_SIZE):
+    """Write objects to a Parquet file, one batch at a time
+
+    :param string path:
+        The file to write
+    :param objects:
+        An iterable of object ``dict``, e.g. from a paginated iterator
+    :param columns:
+        The columns to export
+    :return:
+        The number of rows written
+    """
+    if pyarrow is None:
+        raise exceptions.CommandError(
+            'Exporting requires the pyarrow Python package')
+    schema = arrow_schema(columns)
+    rows = 0
+    writer = parquet.ParquetWriter(
+        path, schema, use_dictionary=sorted(DICTIONARY_COLUMNS & set(columns)))
+    try:
+        for batch in iter_batches(objects, columns, batch_size):
+            arrays = [pyarrow.array(batch[field.name], type=field.type)
+                      for field in schema]
+            writer.write_table(pyarrow.Table.from_arrays(arrays,
+                                                         schema=schema))
+            rows += len(arrays[0])
+    finally:
+        writer.close()
+    return rows
+
+
+def add_export_argument(parser):
+    """Add the --export option of the list commands"""
+    parser.add_argument(
+        '--export',
+        metavar='<file>',
+        help="Write every matching object to this Parquet file, one page "
+             "at a time, instead of listing them. Requires pyarrow."
+    )
+
+
+def export(path, objects, columns):
+    """Export objects and build the output of a list command"""
+    return EXPORT_COLUMNS, [(path, write_parquet(path, objects, columns))]
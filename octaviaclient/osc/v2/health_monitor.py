@@ -14,11 +14,11 @@
 
 """Health Monitor action implementation"""
 
-
 from cliff import lister
 from osc_lib.command import command
 from osc_lib import utils
 
+from octaviaclient.api.v2 import concurrency
 from octaviaclient.osc.v2 import constants as const
 from octaviaclient.osc.v2 import utils as v2_utils
 
@@ -179,6 +179,110 @@ class ListHealthMonitor(lister.Lister):
                  for s in data['healthmonitors']))
 
 
+class AuditHealthMonitor(lister.Lister):
+    """Report pools whose health monitoring looks wrong"""
+
+    def get_parser(self, prog_name):
+        parser = super(AuditHealthMonitor, self).get_parser(prog_name)
+
+        parser.add_argument(
+            '--project',
+            metavar='<project>',
+            help="Only audit the pools of this project (name or ID)."
+        )
+        parser.add_argument(
+            '--max-timeout-ratio',
+            metavar='<ratio>',
+            type=float,
+            default=1.0,
+            help="Report monitors whose timeout is at least this fraction "
+                 "of their delay (default: 1.0)."
+        )
+        parser.add_argument(
+            '--down-threshold',
+            metavar='<percent>',
+            type=float,
+            default=50,
+            help="Report pools with more than this percentage of their "
+                 "enabled members down (default: 50)."
+        )
+        parser.add_argument(
+            '--max-workers',
+            metavar='<count>',
+            type=int,
+            default=concurrency.DEFAULT_WORKERS,
+            help="Number of member lists fetched at the same time "
+                 "(default: %d)." % concurrency.DEFAULT_WORKERS
+        )
+
+        return parser
+
+    @staticmethod
+    def _check_monitor(monitor, max_ratio):
+        if not monitor:
+            return 'no health monitor'
+        delay, timeout = monitor.get('delay'), monitor.get('timeout')
+        if delay and timeout and float(timeout) / delay >= max_ratio:
+            return 'timeout {0} is {1:.0%} of delay {2}'.format(
+                timeout, float(timeout) / delay, delay)
+        return None
+
+    @staticmethod
+    def _check_members(members, threshold):
+        enabled = [m for m in members if m.get('admin_state_up', True)]
+        down = [m for m in enabled
+                if m.get('operating_status') in ('ERROR', 'OFFLINE')]
+        if enabled and 100.0 * len(down) / len(enabled) > threshold:
+            return '{0} of {1} enabled members down'.format(len(down),
+                                                            len(enabled))
+        return None
+
+    def take_action(self, parsed_args):
+        columns = const.MONITOR_AUDIT_COLUMNS
+        api = self.app.client_manager.load_balancer
+        attrs = {}
+        if parsed_args.project:
+            attrs['project_id'] = v2_utils.get_resource_id(
+                self.app.client_manager.identity, 'project',
+                parsed_args.project)
+
+        # Both collections are walked page by page, they can be larger
+        # than the page size limit of the API
+        data = concurrency.gather({
+            'pools': lambda: list(api.pool_iter(**attrs)),
+            'monitors': lambda: list(api.health_monitor_iter(**attrs)),
+        })
+        monitors = dict((hm['id'], hm) for hm in data['monitors'])
+        pools = data['pools']
+
+        issues = []
+        for pool in pools:
+            monitor = monitors.get(pool.get('healthmonitor_id'))
+            issue = self._check_monitor(monitor, parsed_args.max_timeout_ratio)
+            if issue:
+                issues.append((pool['id'], monitor and monitor['id'], issue))
+
+        # Only pools with members need their member statuses
+        for pool, result, error in concurrency.imap_unordered(
+                lambda pool: list(api.member_iter(pool['id'])),
+                [pool for pool in pools if pool.get('members')],
+                parsed_args.max_workers):
+            if error:
+                issue = 'unable to list members: {0}'.format(error)
+            else:
+                issue = self._check_members(result,
+                                            parsed_args.down_threshold)
+            if issue:
+                issues.append((pool['id'], pool.get('healthmonitor_id'),
+                               issue))
+
+        issues.sort(key=lambda issue: (issue[0], issue[2]))
+        return (columns,
+                (utils.get_dict_properties(dict(zip(columns, issue)),
+                                           columns)
+                 for issue in issues))
+
+
 class ShowHealthMonitor(command.ShowOne):
     """Show the details of a single health monitor"""
 
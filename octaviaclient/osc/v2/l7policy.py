@@ -14,10 +14,21 @@
 
 """L7policy action implementation"""
 
+import collections
+import io
+import json
+import os
+
 from cliff import lister
 from osc_lib.command import command
+from osc_lib import exceptions
 from osc_lib import utils
+import yaml
 
+from octaviaclient.api.v2 import concurrency
+from octaviaclient.api.v2 import l7evaluator
+from octaviaclient.api.v2 import l7sync
+from octaviaclient.api.v2 import waiter
 from octaviaclient.osc.v2 import constants as const
 from octaviaclient.osc.v2 import utils as v2_utils
 from octaviaclient.osc.v2 import validate
@@ -130,6 +141,234 @@ class DeleteL7Policy(command.Command):
             l7policy_id=l7policy_id)
 
 
+class SyncL7Policy(lister.Lister):
+    """Make the l7policies of a listener match an ordered list"""
+
+    def get_parser(self, prog_name):
+        parser = super(SyncL7Policy, self).get_parser(prog_name)
+
+        parser.add_argument(
+            'listener',
+            metavar='<listener>',
+            help="Listener to update the l7policies of (name or ID)."
+        )
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            help="YAML file with the desired l7policies, in order. Policies "
+                 "are matched by id or name; those with a rules list also "
+                 "get their rules updated."
+        )
+        parser.add_argument(
+            '--wait-timeout',
+            metavar='<seconds>',
+            type=int,
+            default=waiter.DEFAULT_TIMEOUT,
+            help="Seconds to wait for the load balancer to go back to "
+                 "ACTIVE after each change (default: %d)." %
+                 waiter.DEFAULT_TIMEOUT
+        )
+        v2_utils.add_dry_run_argument(parser)
+
+        return parser
+
+    @staticmethod
+    def _read(path):
+        try:
+            with io.open(path, encoding='utf-8') as f:
+                desired = yaml.safe_load(f) or []
+        except (IOError, OSError, yaml.YAMLError) as e:
+            raise exceptions.CommandError(
+                'Unable to read %s: %s' % (path, e))
+        if not isinstance(desired, list) or not all(
+                isinstance(policy, dict) for policy in desired):
+            raise exceptions.CommandError(
+                '%s must hold a list of l7policies' % path)
+        return desired
+
+    def take_action(self, parsed_args):
+        columns = const.L7POLICY_SYNC_COLUMNS
+        api = self.app.client_manager.load_balancer
+        desired = self._read(parsed_args.file)
+
+        listener_id = v2_utils.get_resource_id(
+            api.listener_list, 'listeners', parsed_args.listener)
+        listener = api.listener_show(listener_id)
+        lb_id = listener['loadbalancers'][0]['id']
+
+        pools = None
+        for policy in desired:
+            if policy.get('redirect_pool'):
+                if pools is None:
+                    pools = api.pool_list(loadbalancer_id=lb_id)['pools']
+                matches = [p['id'] for p in pools
+                           if policy['redirect_pool'] in (p['id'],
+                                                          p.get('name'))]
+                if len(matches) != 1:
+                    raise exceptions.CommandError(
+                        'Unable to locate {0} in pools'.format(
+                            policy['redirect_pool']))
+                policy['redirect_pool_id'] = matches[0]
+            policy.pop('redirect_pool', None)
+
+        current = api.l7policy_list(listener_id=listener_id)['l7policies']
+        # Full rules are only needed for the policies whose rules are given
+        names = set(p.get('name') for p in desired if 'rules' in p)
+        ids = set(p.get('id') for p in desired if 'rules' in p)
+        rules = concurrency.gather(dict(
+            (policy['id'], lambda policy_id=policy['id']: api.l7rule_list(
+                policy_id)['rules'])
+            for policy in current
+            if policy['id'] in ids or policy.get('name') in names))
+        for policy in current:
+            policy['rules'] = rules.get(policy['id'], policy.get('rules'))
+
+        try:
+            operations = l7sync.plan(listener_id, current, desired)
+        except l7sync.SyncError as e:
+            raise exceptions.CommandError(str(e))
+
+        with v2_utils.plan_requests(self.app, parsed_args):
+            l7sync.apply(api, lb_id, operations,
+                         wait=not parsed_args.dry_run,
+                         timeout=parsed_args.wait_timeout)
+
+        return (columns,
+                ((op.l7policy, op.method, op.detail) for op in operations))
+
+
+def _read_requests(path):
+    """Read sample requests, one per line
+
+    Lines are either JSON objects with ``host``, ``path``, ``headers`` and
+    ``cookies`` keys, or a host followed by an optional path. The file is
+    opened straight away and read as the requests are consumed.
+    """
+    try:
+        f = io.open(path, encoding='utf-8')
+    except (IOError, OSError) as e:
+        raise exceptions.CommandError('Unable to read %s: %s' % (path, e))
+    return _parse_requests(f, path)
+
+
+def _parse_requests(f, path):
+    with f:
+        try:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('{'):
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        raise exceptions.CommandError(
+                            'Invalid request on line %d of %s: %s' % (
+                                number, path, e))
+                    if not isinstance(request, dict):
+                        raise exceptions.CommandError(
+                            'Invalid request on line %d of %s' % (
+                                number, path))
+                    yield request
+                else:
+                    fields = line.split()
+                    yield {'host': fields[0],
+                           'path': fields[1] if len(fields) > 1 else '/'}
+        except (IOError, OSError, ValueError) as e:
+            # Read errors and undecodable text
+            raise exceptions.CommandError(
+                'Unable to read %s: %s' % (path, e))
+
+
+class EvaluateL7Policy(lister.Lister):
+    """Show where sample requests are routed by a listener's l7policies"""
+
+    def get_parser(self, prog_name):
+        parser = super(EvaluateL7Policy, self).get_parser(prog_name)
+
+        parser.add_argument(
+            'listener',
+            metavar='<listener>',
+            help="Listener to evaluate the l7policies of (name or ID)."
+        )
+        parser.add_argument(
+            'requests',
+            metavar='<requests-file>',
+            help="File with one request per line: either a JSON object "
+                 "with host, path, headers and cookies keys, or a host "
+                 "followed by a path."
+        )
+        parser.add_argument(
+            '--table',
+            metavar='<file>',
+            help="Read the l7policies and rules from this file if it "
+                 "exists, otherwise fetch them and save them to it."
+        )
+        parser.add_argument(
+            '--summary',
+            action='store_true',
+            default=False,
+            help="Count the requests per route instead of listing each one."
+        )
+
+        return parser
+
+    def _load(self, parsed_args):
+        path = parsed_args.table
+        if path and os.path.exists(path):
+            try:
+                with io.open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (IOError, OSError, ValueError) as e:
+                raise exceptions.CommandError(
+                    'Unable to read %s: %s' % (path, e))
+            if not isinstance(data, dict) or not all(
+                    key in data for key in ('l7policies', 'default_pool_id')):
+                raise exceptions.CommandError(
+                    '%s is not an l7policy table' % path)
+            return data
+        api = self.app.client_manager.load_balancer
+        listener_id = v2_utils.get_resource_id(
+            api.listener_list, 'listeners', parsed_args.listener)
+        data = l7evaluator.L7Evaluator.fetch(api, listener_id)
+        if path:
+            try:
+                with open(path, 'w') as f:
+                    json.dump(data, f)
+            except (IOError, OSError) as e:
+                raise exceptions.CommandError(
+                    'Unable to write %s: %s' % (path, e))
+        return data
+
+    def take_action(self, parsed_args):
+        data = self._load(parsed_args)
+        try:
+            evaluator = l7evaluator.L7Evaluator(data['l7policies'],
+                                                data['default_pool_id'])
+        except l7evaluator.EvaluationError as e:
+            raise exceptions.CommandError(str(e))
+        requests = _read_requests(parsed_args.requests)
+
+        if parsed_args.summary:
+            columns = const.L7POLICY_EVALUATE_SUMMARY_COLUMNS
+            counts = collections.Counter(
+                evaluator.route(request) for request in requests)
+            return (columns,
+                    ((route.l7policy_name or route.l7policy_id,
+                      route.action, route.target, count)
+                     for route, count in counts.most_common()))
+
+        columns = const.L7POLICY_EVALUATE_COLUMNS
+
+        def rows():
+            for request in requests:
+                route = evaluator.route(request)
+                yield (request.get('host'), request.get('path'),
+                       route.l7policy_name or route.l7policy_id,
+                       route.action, route.target)
+        return (columns, rows())
+
+
 class ListL7Policy(lister.Lister):
     """List l7policies"""
 
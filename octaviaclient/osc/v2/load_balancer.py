@@ -13,12 +13,21 @@
 
 """Load Balancer action implementation"""
 
+import contextlib
+
 from cliff import lister
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
 
+from octaviaclient.api.v2 import address_index
+from octaviaclient.api.v2 import concurrency
+from octaviaclient.api.v2 import failover
+from octaviaclient.api.v2 import fanout
+from octaviaclient.api.v2 import mirror
+from octaviaclient.api.v2 import waiter
 from octaviaclient.osc.v2 import constants as const
+from octaviaclient.osc.v2 import export
 from octaviaclient.osc.v2 import utils as v2_utils
 
 
@@ -142,16 +151,18 @@ class DeleteLoadBalancer(command.Command):
             help="Cascade the delete to all child elements of the load "
                  "balancer."
         )
+        v2_utils.add_dry_run_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
-        attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
-                                                parsed_args)
-        lb_id = attrs.pop('loadbalancer_id')
+        with v2_utils.plan_requests(self.app, parsed_args):
+            attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
+                                                    parsed_args)
+            lb_id = attrs.pop('loadbalancer_id')
 
-        self.app.client_manager.load_balancer.load_balancer_delete(
-            lb_id=lb_id, **attrs)
+            self.app.client_manager.load_balancer.load_balancer_delete(
+                lb_id=lb_id, **attrs)
 
 
 class FailoverLoadBalancer(command.Command):
@@ -165,14 +176,127 @@ class FailoverLoadBalancer(command.Command):
             metavar='<load_balancer>',
             help="Name or UUID of the load balancer."
         )
+        v2_utils.add_dry_run_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
-        attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
-                                                parsed_args)
-        self.app.client_manager.load_balancer.load_balancer_failover(
-            lb_id=attrs.pop('loadbalancer_id'))
+        with v2_utils.plan_requests(self.app, parsed_args):
+            attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
+                                                    parsed_args)
+            self.app.client_manager.load_balancer.load_balancer_failover(
+                lb_id=attrs.pop('loadbalancer_id'))
+
+
+class BulkFailoverLoadBalancer(lister.Lister):
+    """Trigger the failover of many load balancers"""
+
+    def get_parser(self, prog_name):
+        parser = super(BulkFailoverLoadBalancer, self).get_parser(prog_name)
+
+        selection_group = parser.add_argument_group(
+            "Selection",
+            description="Load balancers matching all the given criteria are "
+                        "failed over."
+        )
+        selection_group.add_argument(
+            '--project',
+            metavar='<project>',
+            help="Select load balancers of this project (name or ID)."
+        )
+        selection_group.add_argument(
+            '--image',
+            metavar='<image-id>',
+            help="Select load balancers with an amphora built from this "
+                 "image."
+        )
+        selection_group.add_argument(
+            '--compute-host',
+            metavar='<host>',
+            help="Select load balancers with an amphora on this compute "
+                 "host."
+        )
+        status_choices = {'ACTIVE', 'ERROR'}
+        selection_group.add_argument(
+            '--provisioning-status',
+            metavar='{' + ','.join(sorted(status_choices)) + '}',
+            choices=status_choices,
+            type=lambda s: s.upper(),  # case insensitive
+            help="Select load balancers in this provisioning status."
+        )
+
+        parser.add_argument(
+            '--max-workers',
+            metavar='<count>',
+            type=int,
+            default=4,
+            help="Number of load balancers failing over at the same time "
+                 "(default: 4)."
+        )
+        parser.add_argument(
+            '--rate',
+            metavar='<per-minute>',
+            type=float,
+            help="Maximum number of failovers started per minute."
+        )
+        parser.add_argument(
+            '--max-error-rate',
+            metavar='<percent>',
+            type=float,
+            default=10,
+            help="Stop starting failovers once more than this percentage of "
+                 "the finished ones failed (default: 10)."
+        )
+        parser.add_argument(
+            '--timeout',
+            metavar='<seconds>',
+            type=int,
+            default=waiter.DEFAULT_TIMEOUT,
+            help="Seconds to wait for each load balancer to go back to "
+                 "ACTIVE (default: %d)." % waiter.DEFAULT_TIMEOUT
+        )
+        v2_utils.add_dry_run_argument(parser)
+
+        return parser
+
+    def take_action(self, parsed_args):
+        columns = const.LOAD_BALANCER_BULK_FAILOVER_COLUMNS
+        client_manager = self.app.client_manager
+        api = client_manager.load_balancer
+
+        project_id = None
+        if parsed_args.project:
+            project_id = v2_utils.get_resource_id(
+                client_manager.identity, 'project', parsed_args.project)
+        compute_ids = None
+        if parsed_args.compute_host:
+            compute_ids = [server.id for server in
+                           client_manager.compute.servers.list(
+                               search_opts={'host': parsed_args.compute_host,
+                                            'all_tenants': True})]
+
+        lb_ids = failover.select_loadbalancers(
+            api, project_id=project_id,
+            provisioning_status=parsed_args.provisioning_status,
+            image_id=parsed_args.image, compute_ids=compute_ids)
+
+        # A dry run neither waits nor throttles, nothing is failed over
+        rate = None
+        if parsed_args.rate and not parsed_args.dry_run:
+            rate = parsed_args.rate / 60.0
+        orchestrator = failover.FailoverOrchestrator(
+            api, max_workers=parsed_args.max_workers, rate=rate,
+            max_error_rate=parsed_args.max_error_rate / 100.0,
+            timeout=parsed_args.timeout,
+            wait=not parsed_args.dry_run)
+        with v2_utils.plan_requests(self.app, parsed_args):
+            results = orchestrator.run(lb_ids)
+
+        return (columns,
+                (utils.get_dict_properties(
+                    dict(result._asdict(), error=result.error and
+                         str(result.error)), columns)
+                 for result in results))
 
 
 class ListLoadBalancer(lister.Lister):
@@ -204,6 +328,24 @@ class ListLoadBalancer(lister.Lister):
             metavar='<project-id>',
             help="List load balancers according to their project (name or ID)."
         )
+        parser.add_argument(
+            '--all-regions',
+            action='store_true',
+            default=False,
+            help="List the load balancers of every region of the service "
+                 "catalog, as each region responds."
+        )
+        parser.add_argument(
+            '--region',
+            metavar='<region>',
+            dest='regions',
+            action='append',
+            help="Only list the load balancers of this region with "
+                 "--all-regions (repeat option to set multiple regions)."
+        )
+        v2_utils.add_changes_since_argument(parser)
+        v2_utils.add_from_mirror_argument(parser)
+        export.add_export_argument(parser)
 
         return parser
 
@@ -212,14 +354,59 @@ class ListLoadBalancer(lister.Lister):
         attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
                                                 parsed_args)
 
-        data = self.app.client_manager.load_balancer.load_balancer_list(
-            **attrs)
+        if parsed_args.regions and not parsed_args.all_regions:
+            raise exceptions.CommandError(
+                '--region can only be used with --all-regions')
+        if parsed_args.all_regions:
+            client_manager = self.app.client_manager
+            api = client_manager.load_balancer
+            client = fanout.FanoutClient.from_catalog(
+                client_manager.session, interface=client_manager.interface,
+                regions=parsed_args.regions, hooks=api.hooks,
+                retry_policy=api.retry_policy)
+            if not len(client):
+                raise exceptions.CommandError(
+                    'No load-balancer endpoint found in the service catalog')
+            return (const.LOAD_BALANCER_REGION_COLUMNS,
+                    self._list_all_regions(client, attrs))
+
+        api = self.app.client_manager.load_balancer
+        if parsed_args.from_mirror:
+            lbs = v2_utils.query_mirror(api, 'loadbalancers', **attrs)
+        elif parsed_args.changes_since:
+            lbs = v2_utils.list_changes(api, 'loadbalancers',
+                                        parsed_args.changes_since, **attrs)
+        elif parsed_args.export:
+            lbs = api.load_balancer_iter(**attrs)
+        else:
+            lbs = api.load_balancer_list(**attrs)['loadbalancers']
+
+        if parsed_args.export:
+            return export.export(parsed_args.export, lbs,
+                                 const.LOAD_BALANCER_ROWS)
 
         return (columns,
                 (utils.get_dict_properties(
                     s, columns,
                     formatters={},
-                ) for s in data['loadbalancers']))
+                ) for s in lbs))
+
+    def _list_all_regions(self, client, attrs):
+        failed = []
+        # Each region is listed whole, every page, by its own worker
+        for region, lbs, error in client.imap(
+                lambda api: list(api.load_balancer_iter(**attrs))):
+            if error:
+                self.log.warning('Unable to list the load balancers of '
+                                 'region %s: %s', region, error)
+                failed.append(region)
+                continue
+            for lb in lbs:
+                yield (region,) + utils.get_dict_properties(
+                    lb, const.LOAD_BALANCER_COLUMNS)
+        if len(failed) == len(client):
+            raise exceptions.CommandError(
+                'Unable to list the load balancers of any region')
 
 
 class ShowLoadBalancer(command.ShowOne):
@@ -233,18 +420,24 @@ class ShowLoadBalancer(command.ShowOne):
             metavar='<load_balancer>',
             help="Name or UUID of the load balancer."
         )
+        v2_utils.add_from_mirror_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
         rows = const.LOAD_BALANCER_ROWS
-        attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
-                                                parsed_args)
-        lb_id = attrs.pop('loadbalancer_id')
-
-        data = self.app.client_manager.load_balancer.load_balancer_show(
-            lb_id=lb_id
-        )
+        if parsed_args.from_mirror:
+            data = v2_utils.find_in_mirror(
+                self.app.client_manager.load_balancer, 'loadbalancers',
+                parsed_args.loadbalancer)
+        else:
+            attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
+                                                    parsed_args)
+            lb_id = attrs.pop('loadbalancer_id')
+
+            data = self.app.client_manager.load_balancer.load_balancer_show(
+                lb_id=lb_id
+            )
 
         formatters = {
             'listeners': v2_utils.format_list,
@@ -296,17 +489,122 @@ class SetLoadBalancer(command.Command):
             default=None,
             help="Disable load balancer."
         )
+        v2_utils.add_dry_run_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
-        attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
-                                                parsed_args)
-        lb_id = attrs.pop('loadbalancer_id')
-        body = {'loadbalancer': attrs}
+        with v2_utils.plan_requests(self.app, parsed_args):
+            attrs = v2_utils.get_loadbalancer_attrs(self.app.client_manager,
+                                                    parsed_args)
+            lb_id = attrs.pop('loadbalancer_id')
+            body = {'loadbalancer': attrs}
+
+            self.app.client_manager.load_balancer.load_balancer_set(
+                lb_id, json=body)
+
+
+class FindLoadBalancer(lister.Lister):
+    """Find the load balancers and pools behind IP addresses"""
+
+    def get_parser(self, prog_name):
+        parser = super(FindLoadBalancer, self).get_parser(prog_name)
+
+        parser.add_argument(
+            '--member-address',
+            metavar='<ip-address>',
+            dest='member_addresses',
+            action='append',
+            default=[],
+            help="Find the pools and load balancers with a member at this "
+                 "address (repeat option to find multiple addresses)."
+        )
+        parser.add_argument(
+            '--vip-address',
+            metavar='<ip-address>',
+            dest='vip_addresses',
+            action='append',
+            default=[],
+            help="Find the load balancers with this VIP address (repeat "
+                 "option to find multiple addresses)."
+        )
+        parser.add_argument(
+            '--max-workers',
+            metavar='<count>',
+            type=int,
+            default=concurrency.DEFAULT_WORKERS,
+            help="Number of pools whose members are listed at the same "
+                 "time (default: %d)." % concurrency.DEFAULT_WORKERS
+        )
+        v2_utils.add_from_mirror_argument(parser)
+
+        return parser
+
+    def take_action(self, parsed_args):
+        columns = const.LOAD_BALANCER_FIND_COLUMNS
+        api = self.app.client_manager.load_balancer
+        member_addresses = parsed_args.member_addresses
+        if not member_addresses and not parsed_args.vip_addresses:
+            raise exceptions.CommandError(
+                'Specify --member-address or --vip-address')
+
+        if parsed_args.from_mirror:
+            with v2_utils.reading_mirror(api) as local:
+                index = address_index.AddressIndex.from_mirror(
+                    local, member_addresses)
+        else:
+            index = address_index.AddressIndex.from_api(
+                api, member_addresses, max_workers=parsed_args.max_workers)
+            for pool_id, error in sorted(index.errors.items()):
+                self.log.warning('Unable to list the members of pool %s: '
+                                 '%s', pool_id, error)
+
+        matches = []
+        for address in parsed_args.vip_addresses:
+            matches.extend(index.find_vips(address))
+        for address in member_addresses:
+            matches.extend(index.find_members(address))
+
+        return (columns, (tuple(match) for match in matches))
+
+
+class RefreshLoadBalancerMirror(lister.Lister):
+    """Refresh the local mirror of the load balancer resources"""
+
+    def get_parser(self, prog_name):
+        parser = super(RefreshLoadBalancerMirror, self).get_parser(prog_name)
+
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            default=False,
+            help="Reload every object instead of the changes since the "
+                 "previous refresh."
+        )
+        parser.add_argument(
+            '--max-workers',
+            metavar='<count>',
+            type=int,
+            default=concurrency.DEFAULT_WORKERS,
+            help="Number of listings made at the same time (default: %d)." %
+                 concurrency.DEFAULT_WORKERS
+        )
+
+        return parser
+
+    def take_action(self, parsed_args):
+        columns = const.MIRROR_REFRESH_COLUMNS
+        api = self.app.client_manager.load_balancer
 
-        self.app.client_manager.load_balancer.load_balancer_set(
-            lb_id, json=body)
+        with contextlib.closing(v2_utils.open_mirror(
+                api, max_workers=parsed_args.max_workers)) as local:
+            fetched = local.refresh(full=parsed_args.full)
+            counts = dict((resource, local.count(resource))
+                          for resource in fetched)
+
+        return (columns,
+                ((resource, fetched[resource], counts[resource])
+                 for resource in mirror.RESOURCES + ('members',)))
 
 
 class ShowLoadBalancerStats(command.ShowOne):
@@ -13,15 +13,47 @@
 
 """Member action implementation"""
 
+import time
 
 from cliff import lister
 from osc_lib.command import command
 from osc_lib import utils
 
 from octaviaclient.osc.v2 import constants as const
+from octaviaclient.osc.v2 import export
 from octaviaclient.osc.v2 import utils as v2_utils
 
 
+WATCH_INTERVAL = 5
+
+# Member attributes reported by ``member list --watch``
+WATCHED_STATUSES = ('operating_status', 'provisioning_status')
+
+
+def _diff_members(previous, current):
+    """Compare two polls of a pool's members
+
+    :param previous:
+        A ``dict`` of member ID to member, from the previous poll
+    :param current:
+        A ``dict`` of member ID to member, from the current poll
+    :return:
+        A generator of ``(member, change)`` tuples
+    """
+    for member_id, member in current.items():
+        old = previous.get(member_id)
+        if old is None:
+            yield member, 'added'
+            continue
+        for key in WATCHED_STATUSES:
+            if old.get(key) != member.get(key):
+                yield member, '{0} {1} -> {2}'.format(key, old.get(key),
+                                                      member.get(key))
+    for member_id, member in previous.items():
+        if member_id not in current:
+            yield member, 'removed'
+
+
 class ListMember(lister.Lister):
     """List members in a pool"""
 
@@ -33,23 +65,101 @@ class ListMember(lister.Lister):
             metavar='<pool>',
             help="Pool name or ID to list the members of."
         )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=False,
+            help="Poll the members and print the status changes since the "
+                 "previous poll, then list the members that changed."
+        )
+        parser.add_argument(
+            '--interval',
+            metavar='<seconds>',
+            type=float,
+            default=WATCH_INTERVAL,
+            help="Seconds between two polls with --watch (default: %d)." %
+                 WATCH_INTERVAL
+        )
+        parser.add_argument(
+            '--count',
+            metavar='<polls>',
+            type=int,
+            help="Stop watching after this many polls (default: until "
+                 "interrupted)."
+        )
+        v2_utils.add_changes_since_argument(parser)
+        v2_utils.add_from_mirror_argument(parser)
+        export.add_export_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
         columns = const.MEMBER_COLUMNS
-
-        attrs = v2_utils.get_member_attrs(self.app.client_manager, parsed_args)
-        pool_id = attrs.pop('pool_id')
-
-        data = self.app.client_manager.load_balancer.member_list(
-            pool_id=pool_id)
+        api = self.app.client_manager.load_balancer
+
+        if parsed_args.from_mirror:
+            pool_id = v2_utils.find_in_mirror(api, 'pools',
+                                              parsed_args.pool)['id']
+        else:
+            attrs = v2_utils.get_member_attrs(self.app.client_manager,
+                                              parsed_args)
+            pool_id = attrs.pop('pool_id')
+
+        if parsed_args.from_mirror:
+            members = v2_utils.query_mirror(api, 'members', pool_id=pool_id)
+        elif parsed_args.changes_since:
+            members = v2_utils.list_changes(
+                api, 'members', parsed_args.changes_since, pool_id=pool_id)
+        elif parsed_args.export:
+            members = api.member_iter(pool_id=pool_id)
+        elif parsed_args.watch:
+            members = self._watch(pool_id, parsed_args)
+        else:
+            members = api.member_list(pool_id=pool_id)['members']
+
+        if parsed_args.export:
+            return export.export(parsed_args.export, members,
+                                 const.MEMBER_ROWS)
 
         return (columns,
                 (utils.get_dict_properties(
                     s, columns,
                     formatters={},
-                ) for s in data['members']))
+                ) for s in members))
+
+    def _watch(self, pool_id, parsed_args):
+        api = self.app.client_manager.load_balancer
+        line = '{0} {1} {2} {3}:{4} {5}\n'
+        previous = None
+        changed = {}
+        polls = 0
+        try:
+            while True:
+                # Every page, so that page boundaries do not show as changes
+                current = dict((m['id'], m)
+                               for m in api.member_iter(pool_id=pool_id))
+                polls += 1
+                if previous is None:
+                    self.app.stdout.write(
+                        'Watching {0} members of pool {1}\n'.format(
+                            len(current), pool_id))
+                else:
+                    now = time.strftime('%H:%M:%S')
+                    for member, change in _diff_members(previous, current):
+                        changed[member['id']] = current.get(member['id'],
+                                                            member)
+                        self.app.stdout.write(line.format(
+                            now, member['id'], member.get('name') or '-',
+                            member.get('address'),
+                            member.get('protocol_port'), change))
+                    self.app.stdout.flush()
+                previous = current
+                if parsed_args.count and polls >= parsed_args.count:
+                    break
+                time.sleep(parsed_args.interval)
+        except KeyboardInterrupt:
+            pass
+        return list(changed.values())
 
 
 class ShowMember(command.ShowOne):
@@ -19,6 +19,7 @@ from osc_lib.command import command
 from osc_lib import utils
 
 from octaviaclient.osc.v2 import constants as const
+from octaviaclient.osc.v2 import export
 from octaviaclient.osc.v2 import utils as v2_utils
 
 PROTOCOL_CHOICES = ['TCP', 'HTTP', 'HTTPS', 'TERMINATED_HTTPS', 'PROXY']
@@ -137,20 +138,40 @@ class ListPool(lister.Lister):
             metavar='<loadbalancer>',
             help="Filter by load balancer (name or ID).",
         )
+        v2_utils.add_changes_since_argument(parser)
+        v2_utils.add_from_mirror_argument(parser)
+        export.add_export_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
         columns = const.POOL_COLUMNS
-        attrs = v2_utils.get_pool_attrs(self.app.client_manager, parsed_args)
-        data = self.app.client_manager.load_balancer.pool_list(**attrs)
+        api = self.app.client_manager.load_balancer
+        if parsed_args.from_mirror:
+            filters = {}
+            if parsed_args.loadbalancer:
+                filters['loadbalancer_id'] = v2_utils.find_in_mirror(
+                    api, 'loadbalancers', parsed_args.loadbalancer)['id']
+            pools = v2_utils.query_mirror(api, 'pools', **filters)
+        else:
+            attrs = v2_utils.get_pool_attrs(self.app.client_manager,
+                                            parsed_args)
+            if parsed_args.changes_since:
+                pools = v2_utils.list_changes(
+                    api, 'pools', parsed_args.changes_since, **attrs)
+            elif parsed_args.export:
+                pools = api.pool_iter(**attrs)
+            else:
+                pools = api.pool_list(**attrs)['pools']
+        if parsed_args.export:
+            return export.export(parsed_args.export, pools, const.POOL_ROWS)
         formatters = {'loadbalancers': v2_utils.format_list,
                       'members': v2_utils.format_list,
                       'listeners': v2_utils.format_list}
 
         return (columns,
                 (utils.get_dict_properties(
-                    s, columns, formatters=formatters) for s in data['pools']))
+                    s, columns, formatters=formatters) for s in pools))
 
 
 class ShowPool(command.ShowOne):
@@ -164,18 +185,25 @@ class ShowPool(command.ShowOne):
             metavar='<pool>',
             help='Name or UUID of the pool.'
         )
+        v2_utils.add_from_mirror_argument(parser)
 
         return parser
 
     def take_action(self, parsed_args):
         rows = const.POOL_ROWS
 
-        attrs = v2_utils.get_pool_attrs(self.app.client_manager, parsed_args)
-        pool_id = attrs.pop('pool_id')
-
-        data = self.app.client_manager.load_balancer.pool_show(
-            pool_id=pool_id,
-        )
+        if parsed_args.from_mirror:
+            data = v2_utils.find_in_mirror(
+                self.app.client_manager.load_balancer, 'pools',
+                parsed_args.pool)
+        else:
+            attrs = v2_utils.get_pool_attrs(self.app.client_manager,
+                                            parsed_args)
+            pool_id = attrs.pop('pool_id')
+
+            data = self.app.client_manager.load_balancer.pool_show(
+                pool_id=pool_id,
+            )
         formatters = {'loadbalancers': v2_utils.format_list,
                       'members': v2_utils.format_list,
                       'listeners': v2_utils.format_list,
@@ -13,15 +13,31 @@
 
 """Quota action implementation"""
 
+import abc
+import collections
+import csv
+import functools
+import io
 
 from cliff import lister
 from osc_lib.command import command
 from osc_lib import exceptions
 from osc_lib import utils
+import yaml
 
+from octaviaclient.api.v2 import concurrency
 from octaviaclient.osc.v2 import constants as const
 from octaviaclient.osc.v2 import utils as v2_utils
 
+QUOTA_RESOURCES = ('load_balancer', 'listener', 'pool', 'health_monitor',
+                   'member')
+
+# Column names accepted in bulk files, as spelled by the quota set options
+QUOTA_ALIASES = {
+    'loadbalancer': 'load_balancer',
+    'healthmonitor': 'health_monitor',
+}
+
 
 class ListQuota(lister.Lister):
     """List quotas"""
@@ -39,8 +55,8 @@ class ListQuota(lister.Lister):
 
     def take_action(self, parsed_args):
         columns = const.QUOTA_COLUMNS
-        attrs = v2_utils.get_listener_attrs(self.app.client_manager,
-                                            parsed_args)
+        attrs = v2_utils.get_quota_attrs(self.app.client_manager,
+                                         parsed_args)
         data = self.app.client_manager.load_balancer.quota_list(**attrs)
         formatters = {'quotas': v2_utils.format_list}
         return (columns,
@@ -48,6 +64,100 @@ class ListQuota(lister.Lister):
                  for s in data['quotas']))
 
 
+class ListQuotaUsage(lister.Lister):
+    """List quota usage and headroom per project"""
+
+    def get_parser(self, prog_name):
+        parser = super(ListQuotaUsage, self).get_parser(prog_name)
+
+        parser.add_argument(
+            '--project',
+            metavar='<project-id>',
+            help="Only report this project (name or ID)."
+        )
+        parser.add_argument(
+            '--threshold',
+            metavar='<percent>',
+            type=int,
+            help="Only list projects with at most this percentage of a "
+                 "quota left."
+        )
+
+        return parser
+
+    @staticmethod
+    def _count(resource, iterate, attrs):
+        """Count the objects of each project, walking every page"""
+        usage = collections.defaultdict(collections.Counter)
+        for obj in iterate(**attrs):
+            project_usage = usage[obj.get('project_id')]
+            project_usage[resource] += 1
+            # Members belong to the project of their pool
+            if resource == 'pool':
+                project_usage['member'] += len(obj.get('members') or [])
+        return usage
+
+    @staticmethod
+    def _headroom(used, limits):
+        left = []
+        for resource in QUOTA_RESOURCES:
+            limit = limits.get(resource)
+            # -1 means unlimited
+            if limit is None or limit < 0:
+                continue
+            left.append(100 * (limit - used[resource]) // limit
+                        if limit else 0)
+        return min(left) if left else None
+
+    def take_action(self, parsed_args):
+        columns = const.QUOTA_USAGE_COLUMNS
+        attrs = v2_utils.get_quota_attrs(self.app.client_manager,
+                                         parsed_args)
+        api = self.app.client_manager.load_balancer
+
+        listings = {
+            'load_balancer': api.load_balancer_iter,
+            'listener': api.listener_iter,
+            'pool': api.pool_iter,
+            'health_monitor': api.health_monitor_iter,
+        }
+        calls = dict(
+            (resource, functools.partial(self._count, resource, iterate,
+                                         attrs))
+            for resource, iterate in listings.items())
+        calls['quotas'] = lambda: list(api.quota_iter(**attrs))
+        calls['defaults'] = api.quota_defaults_show
+        lists = concurrency.gather(calls)
+
+        defaults = lists['defaults']['quota']
+        usage = collections.defaultdict(collections.Counter)
+        for resource in listings:
+            for project_id, counts in lists[resource].items():
+                usage[project_id].update(counts)
+        quotas = dict((q['project_id'], q) for q in lists['quotas'])
+
+        rows = []
+        for project_id in set(quotas) | set(p for p in usage if p):
+            quota = quotas.get(project_id, {})
+            limits = dict((r, defaults.get(r) if quota.get(r) is None
+                           else quota[r]) for r in QUOTA_RESOURCES)
+            used = usage[project_id]
+            headroom = self._headroom(used, limits)
+            if (parsed_args.threshold is not None and
+                    (headroom is None or headroom > parsed_args.threshold)):
+                continue
+            row = dict((r, '%d/%s' % (
+                used[r], 'unlimited' if limits[r] == -1 else limits[r]))
+                for r in QUOTA_RESOURCES)
+            row.update(project_id=project_id, headroom=headroom)
+            rows.append(row)
+
+        rows.sort(key=lambda row: (row['headroom'] is None,
+                                   row['headroom'], row['project_id']))
+        return (columns,
+                (utils.get_dict_properties(row, columns) for row in rows))
+
+
 class ShowQuota(command.ShowOne):
     """Show the quota details for a project"""
 
@@ -183,3 +293,174 @@ class ResetQuota(command.Command):
 
         self.app.client_manager.load_balancer.quota_reset(
             project_id=project_id)
+
+
+def _read_quota_file(path):
+    """Read project quotas from a CSV or YAML file
+
+    CSV files have a ``project`` column and one column per quota. YAML (or
+    JSON) files hold either a mapping of project to quotas or a list of
+    mappings with a ``project`` key; a plain list of projects is accepted
+    too. Empty values are left unchanged.
+
+    :return:
+        A list of ``(project, quotas)`` tuples in file order
+    """
+    try:
+        with io.open(path, encoding='utf-8') as f:
+            content = f.read()
+    except (IOError, OSError) as e:
+        raise exceptions.CommandError(
+            'Unable to read %s: %s' % (path, e))
+
+    if path.lower().endswith('.csv'):
+        entries = list(csv.DictReader(content.splitlines()))
+    else:
+        try:
+            entries = yaml.safe_load(content) or []
+        except yaml.YAMLError as e:
+            raise exceptions.CommandError(
+                'Unable to parse %s: %s' % (path, e))
+        if isinstance(entries, dict):
+            entries = [dict(quotas or {}, project=project)
+                       for project, quotas in entries.items()]
+
+    items = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            entry = {'project': entry}
+        entry = dict((QUOTA_ALIASES.get(k, k), v) for k, v in entry.items()
+                     if k is not None)
+        project = entry.pop('project', None)
+        if not project:
+            raise exceptions.CommandError(
+                'Entry without a project in %s: %s' % (path, entry))
+        unknown = set(entry) - set(QUOTA_RESOURCES)
+        if unknown:
+            raise exceptions.CommandError(
+                'Unknown quota %s for project %s' % (
+                    ', '.join(sorted(unknown)), project))
+        try:
+            quotas = dict((k, int(v)) for k, v in entry.items()
+                          if v not in (None, ''))
+        except ValueError as e:
+            raise exceptions.CommandError(
+                'Invalid quota for project %s: %s' % (project, e))
+        items.append((str(project), quotas))
+    return items
+
+
+def _resolve_projects(identity_client, projects):
+    """Map project names and IDs to IDs with a single project listing
+
+    :return:
+        A ``dict`` of name or ID to project ID, or to an error message
+    """
+    by_id = {}
+    by_name = collections.defaultdict(list)
+    for project in identity_client.projects.list():
+        by_id[project.id] = project.id
+        by_name[project.name].append(project.id)
+
+    # Seed the cache used by get_resource_id with the unambiguous names
+    v2_utils.project_cache(identity_client).update(dict(
+        [(name, ids[0]) for name, ids in by_name.items() if len(ids) == 1] +
+        list(by_id.items())))
+
+    resolved = {}
+    for project in projects:
+        if project in by_id:
+            resolved[project] = by_id[project]
+        elif len(by_name.get(project, ())) == 1:
+            resolved[project] = by_name[project][0]
+        elif project in by_name:
+            resolved[project] = exceptions.CommandError(
+                'More than one project exists with the name %s' % project)
+        else:
+            resolved[project] = exceptions.CommandError(
+                'No project with a name or ID of %s exists' % project)
+    return resolved
+
+
+class _BulkQuotaCommand(lister.Lister):
+
+    def get_parser(self, prog_name):
+        parser = super(_BulkQuotaCommand, self).get_parser(prog_name)
+
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            help="CSV or YAML file of projects (name or ID) and quotas."
+        )
+        parser.add_argument(
+            '--max-workers',
+            metavar='<count>',
+            type=int,
+            default=concurrency.DEFAULT_WORKERS,
+            help="Number of projects updated at the same time "
+                 "(default: %d)." % concurrency.DEFAULT_WORKERS
+        )
+        v2_utils.add_dry_run_argument(parser)
+
+        return parser
+
+    @abc.abstractmethod
+    def _apply(self, api, project_id, quotas):
+        """Update the quotas of one project
+
+        :param api:
+            The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+        :param string project_id:
+            The ID of the project
+        :param dict quotas:
+            The quotas read from the file for the project
+        """
+
+    def take_action(self, parsed_args):
+        columns = const.QUOTA_BULK_COLUMNS
+        items = _read_quota_file(parsed_args.file)
+        project_ids = _resolve_projects(
+            self.app.client_manager.identity,
+            set(project for project, _ in items))
+        api = self.app.client_manager.load_balancer
+
+        def apply(i):
+            project, quotas = items[i]
+            project_id = project_ids[project]
+            if isinstance(project_id, Exception):
+                raise project_id
+            self._apply(api, project_id, quotas)
+
+        results = {}
+        with v2_utils.plan_requests(self.app, parsed_args):
+            for i, _, error in concurrency.imap_unordered(
+                    apply, range(len(items)), parsed_args.max_workers):
+                results[i] = str(error) if error else 'OK'
+
+        rows = []
+        for i, (project, _) in enumerate(items):
+            project_id = project_ids[project]
+            rows.append({
+                'project': project,
+                'project_id': (None if isinstance(project_id, Exception)
+                               else project_id),
+                'result': results[i],
+            })
+        return (columns,
+                (utils.get_dict_properties(row, columns) for row in rows))
+
+
+class BulkSetQuota(_BulkQuotaCommand):
+    """Update the quotas of many projects from a file"""
+
+    def _apply(self, api, project_id, quotas):
+        if not quotas:
+            raise exceptions.CommandError('No quota to set')
+        api.quota_set(project_id, json={'quota': quotas})
+
+
+class BulkResetQuota(_BulkQuotaCommand):
+    """Reset the quotas of many projects from a file to default quotas"""
+
+    def _apply(self, api, project_id, quotas):
+        api.quota_reset(project_id=project_id)
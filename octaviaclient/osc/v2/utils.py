@@ -12,10 +12,40 @@
 #   under the License.
 #
 
+import contextlib
+import hashlib
+import json
+import os
+import threading
+
+import appdirs
+from keystoneauth1 import exceptions as ks_exceptions
 from osc_lib import exceptions
+from oslo_utils import strutils
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+import six
 
 from openstackclient.identity import common as identity_common
 
+from octaviaclient.api.v2 import cache
+from octaviaclient.api.v2 import mirror
+from octaviaclient.api.v2 import octavia
+
+PROJECT_CACHE_TTL = 300
+
+NETWORK_CACHE_TTL = 300
+
+# Neutron collections resolved with filtered listings
+NETWORK_RESOURCES = ('ports', 'subnets', 'networks', 'policies')
+
+# Seconds the high-water marks of --changes-since last are kept
+CHANGES_MARK_TTL = 30 * 24 * 3600
+
+_project_caches = {}
+_network_caches = {}
+_caches_lock = threading.Lock()
+
 
 def _map_attrs(args, source_attr_map):
     res = {}
@@ -70,6 +100,128 @@ def get_resource_id(resource, resource_name, name):
     :return:
         The UUID of the found resource
     """
+    api = getattr(resource, '__self__', None)
+    if isinstance(api, octavia.OctaviaAPI):
+        with api.tagged('name-resolution'):
+            return _find_resource_id(resource, resource_name, name)
+    return _find_resource_id(resource, resource_name, name)
+
+
+def cache_path(name, namespace, extension='json'):
+    """Get the path of a cache file in the user cache directory
+
+    :param string name:
+        The kind of cache, e.g. ``projects``
+    :param string namespace:
+        What the cache is about, usually an endpoint URL
+    :param string extension:
+        The file name extension
+    """
+    digest = hashlib.sha1(namespace.encode('utf-8')).hexdigest()
+    return os.path.join(appdirs.user_cache_dir('python-octaviaclient'),
+                        '%s-%s.%s' % (name, digest[:16], extension))
+
+
+def _shared_cache(caches, name, variable, namespace, default_ttl):
+    with _caches_lock:
+        if namespace not in caches:
+            path = None
+            if strutils.bool_from_string(os.environ.get(variable)):
+                path = cache_path(name, namespace)
+            ttl = int(os.environ.get(variable + '_TTL', default_ttl))
+            caches[namespace] = cache.TTLCache(ttl, path)
+        return caches[namespace]
+
+
+def _auth_url(session):
+    auth_url = getattr(getattr(session, 'auth', None), 'auth_url', None)
+    return auth_url if isinstance(auth_url, six.string_types) else ''
+
+
+def _project_id(session):
+    try:
+        project_id = session.get_project_id()
+    except (AttributeError, ks_exceptions.ClientException):
+        return None
+    return project_id if isinstance(project_id, six.string_types) else None
+
+
+def project_cache(identity_client):
+    """Get the project name to ID cache of an identity service
+
+    Caches live as long as the process and are keyed by the identity
+    endpoint. Setting ``OS_LOADBALANCER_PROJECT_CACHE`` to true also keeps
+    them in the user cache directory, so they are shared between commands;
+    ``OS_LOADBALANCER_PROJECT_CACHE_TTL`` sets how many seconds entries
+    stay valid.
+
+    :param identity_client:
+        The identity client of the client manager
+    :return:
+        A :class:`~octaviaclient.api.v2.cache.TTLCache`
+    """
+    namespace = _auth_url(getattr(identity_client, 'session', None))
+    return _shared_cache(_project_caches, 'projects',
+                         'OS_LOADBALANCER_PROJECT_CACHE', namespace,
+                         PROJECT_CACHE_TTL)
+
+
+def network_cache(neutron_client):
+    """Get the port, subnet, network and QoS policy name to ID cache
+
+    Neutron names are per project, so caches are keyed by identity
+    endpoint, region and the project the token is scoped to. They are
+    configured like :func:`project_cache` with
+    ``OS_LOADBALANCER_NETWORK_CACHE`` and
+    ``OS_LOADBALANCER_NETWORK_CACHE_TTL``.
+
+    :param neutron_client:
+        The neutron client of the client manager
+    :return:
+        A :class:`~octaviaclient.api.v2.cache.TTLCache`
+    """
+    httpclient = getattr(neutron_client, 'httpclient', None)
+    session = getattr(httpclient, 'session', None)
+    namespace = _auth_url(session)
+    region = getattr(httpclient, 'region_name', None)
+    if isinstance(region, six.string_types):
+        namespace += '#' + region
+    project_id = _project_id(session)
+    if project_id:
+        namespace += '@' + project_id
+    return _shared_cache(_network_caches, 'networks',
+                         'OS_LOADBALANCER_NETWORK_CACHE', namespace,
+                         NETWORK_CACHE_TTL)
+
+
+def _find_network_id(resource, resource_name, name):
+    """Resolve a Neutron name or ID with filtered listings
+
+    Neutron collections are too large to be listed whole: IDs are looked
+    up first when the value looks like one, then names.
+    """
+    networks = network_cache(getattr(resource, '__self__', None))
+    key = '%s:%s' % (resource_name, name)
+    resource_id = networks.get(key)
+    if resource_id:
+        return resource_id
+
+    names = []
+    if uuidutils.is_uuid_like(name):
+        names = resource(id=name)[resource_name]
+    if not names:
+        names = resource(name=name)[resource_name]
+    if len(names) > 1:
+        msg = ("{0} {1} found with name or ID of {2}. Please try "
+               "again with UUID".format(len(names), resource_name, name))
+        raise exceptions.CommandError(msg)
+    resource_id = names[0].get('id')
+    networks.update({key: resource_id,
+                     '%s:%s' % (resource_name, resource_id): resource_id})
+    return resource_id
+
+
+def _find_resource_id(resource, resource_name, name):
     try:
         # Allow None as a value
         if resource_name in ('policies',):
@@ -79,13 +231,20 @@ def get_resource_id(resource, resource_name, name):
         # Projects can be non-uuid so we need to account for this
         if resource_name == 'project':
             if name != 'non-uuid':
-                project_id = identity_common.find_project(
-                    resource,
-                    name
-                ).id
+                projects = project_cache(resource)
+                project_id = projects.get(name)
+                if project_id is None:
+                    project_id = identity_common.find_project(
+                        resource,
+                        name
+                    ).id
+                    projects.update({name: project_id,
+                                     project_id: project_id})
                 return project_id
             else:
                 return 'non-uuid'
+        elif resource_name in NETWORK_RESOURCES:
+            return _find_network_id(resource, resource_name, name)
         elif resource_name == 'members':
             names = [re for re in resource(name['pool_id'])['members']
                      if re.get('id') == name['member_id']
@@ -430,6 +589,36 @@ def get_amphora_attrs(client_manager, parsed_args):
     return _map_attrs(vars(parsed_args), attr_map)
 
 
+def add_dry_run_argument(parser):
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        default=False,
+        help="Print the HTTP calls that would be made, grouped into "
+             "dependency waves, with an estimate of how long they take. "
+             "Nothing is changed."
+    )
+
+
+@contextlib.contextmanager
+def plan_requests(app, parsed_args):
+    """Plan the requests made in this block when --dry-run is given
+
+    :param app:
+        The cliff application, its stdout receives the plan
+    :param parsed_args:
+        The parsed arguments of the command
+    """
+    if not getattr(parsed_args, 'dry_run', False):
+        yield None
+        return
+
+    with app.client_manager.load_balancer.planning() as plan:
+        yield plan
+    for line in plan.format():
+        app.stdout.write(line + '\n')
+
+
 def format_list(data):
     return '\n'.join(i['id'] for i in data)
 
@@ -449,3 +638,122 @@ def _format_kv(data):
         formatted_kv[k] = v
 
     return formatted_kv
+
+
+def add_changes_since_argument(parser):
+    parser.add_argument(
+        '--changes-since',
+        metavar='<time>',
+        help="Only list the objects created or updated since this time "
+             "(ISO 8601, UTC if no offset), or since the previous "
+             "--changes-since listing with the same filters if 'last'."
+    )
+
+
+def list_changes(api, resource, since, **params):
+    """List the objects of a collection changed since a time
+
+    The newest change listed is saved as a high-water mark in the user
+    cache directory, keyed by collection and filters: ``since`` can then be
+    ``last`` to list the changes since the previous listing. The first
+    such listing lists every object.
+
+    :param api:
+        The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+    :param string resource:
+        The collection key, e.g. ``pools``
+    :param string since:
+        An ISO 8601 time, or ``last``
+    :param params:
+        Parameters to filter on, and ``pool_id`` for members
+    :return:
+        A list of object ``dict``
+    """
+    marks = cache.TTLCache(CHANGES_MARK_TTL,
+                           cache_path('changes', api.endpoint))
+    key = json.dumps([resource, params], sort_keys=True)
+    if since == 'last':
+        since = marks.get(key)
+    else:
+        try:
+            since = timeutils.normalize_time(
+                timeutils.parse_isotime(since)).strftime('%Y-%m-%dT%H:%M:%S')
+        except ValueError as e:
+            raise exceptions.CommandError(
+                'Invalid --changes-since time: %s' % e)
+
+    if since:
+        objects = list(api.changes_since(resource, since, **params))
+    else:
+        params = dict(params)
+        path = octavia.COLLECTION_URLS[resource].format(
+            pool_id=params.pop('pool_id', None))
+        objects = list(api.iter_list(path, resource, **params))
+
+    mark = max([since or ''] + [octavia.changed_at(obj) for obj in objects])
+    if mark:
+        marks.set(key, mark)
+    return objects
+
+
+def add_from_mirror_argument(parser):
+    parser.add_argument(
+        '--from-mirror',
+        action='store_true',
+        default=False,
+        help="Answer from the local mirror kept by 'loadbalancer mirror "
+             "refresh' instead of the API."
+    )
+
+
+def open_mirror(api, **kwargs):
+    """Open the local mirror of an Octavia endpoint
+
+    :param api:
+        The :class:`~octaviaclient.api.v2.octavia.OctaviaAPI` to use
+    :param kwargs:
+        Options of :class:`~octaviaclient.api.v2.mirror.Mirror`
+    :return:
+        A :class:`~octaviaclient.api.v2.mirror.Mirror` in the user cache
+        directory
+    """
+    return mirror.Mirror(cache_path('mirror', api.endpoint, 'sqlite'),
+                         api=api, **kwargs)
+
+
+@contextlib.contextmanager
+def reading_mirror(api):
+    """Open the local mirror of an Octavia endpoint to query it
+
+    A mirror that was never refreshed raises a ``CommandError``.
+    """
+    with contextlib.closing(open_mirror(api)) as local:
+        try:
+            yield local
+        except mirror.MirrorError as e:
+            raise exceptions.CommandError(
+                "%s, run 'openstack loadbalancer mirror refresh'" % e)
+
+
+def query_mirror(api, resource, **filters):
+    """Find objects in the local mirror, see :meth:`Mirror.query`"""
+    with reading_mirror(api) as local:
+        return local.query(resource, **filters)
+
+
+def find_in_mirror(api, resource, name_or_id):
+    """Find one object by name or ID in the local mirror
+
+    :return:
+        The object ``dict``
+    """
+    with reading_mirror(api) as local:
+        found = local.get(resource, name_or_id)
+    if not found:
+        raise exceptions.CommandError("Unable to locate {0} in {1}".format(
+            name_or_id, resource))
+    if len(found) > 1:
+        raise exceptions.CommandError(
+            "{0} {1} found with name or ID of {2}. Please try again with "
+            "UUID".format(len(found), resource, name_or_id))
+    return found[0]
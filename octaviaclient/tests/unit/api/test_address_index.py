@@ -0,0 +1,118 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Address index Tests"""
+
+import os
+
+import fixtures
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import address_index
+from octaviaclient.api.v2 import mirror
+
+LOADBALANCERS = [
+    {'id': 'lb1', 'name': 'web', 'vip_address': '10.0.0.1'},
+    {'id': 'lb2', 'name': 'db', 'vip_address': '10.0.0.2'},
+]
+
+POOLS = [
+    {'id': 'pool1', 'name': 'web-pool', 'loadbalancers': [{'id': 'lb1'}],
+     'members': [{'id': 'm1'}, {'id': 'm2'}]},
+    {'id': 'pool2', 'name': 'db-pool', 'loadbalancers': [{'id': 'lb2'}],
+     'members': [{'id': 'm3'}]},
+    {'id': 'pool3', 'name': 'empty', 'loadbalancers': [{'id': 'lb2'}],
+     'members': []},
+]
+
+MEMBERS = {
+    'pool1': [{'id': 'm1', 'address': '10.1.2.3', 'protocol_port': 80},
+              {'id': 'm2', 'address': '10.1.2.4', 'protocol_port': 80}],
+    'pool2': [{'id': 'm3', 'address': '10.1.2.3', 'protocol_port': 3306}],
+}
+
+
+class TestAddressIndex(utils.TestCase):
+
+    def setUp(self):
+        super(TestAddressIndex, self).setUp()
+        self.api = mock.Mock()
+        self.api.load_balancer_iter.side_effect = (
+            lambda: iter(LOADBALANCERS))
+        self.api.pool_iter.side_effect = lambda: iter(POOLS)
+        self.api.member_iter.side_effect = (
+            lambda pool_id, **params: iter(
+                m for m in MEMBERS[pool_id]
+                if params.get('address', m['address']) == m['address']))
+
+    def test_find_members(self):
+        index = address_index.AddressIndex.from_api(self.api)
+
+        self.assertEqual([
+            ('10.1.2.3', 'member', 'lb1', 'web', 'pool1', 'web-pool', 'm1',
+             80),
+            ('10.1.2.3', 'member', 'lb2', 'db', 'pool2', 'db-pool', 'm3',
+             3306),
+        ], sorted(index.find_members('10.1.2.3')))
+        self.assertEqual([], index.find_members('10.9.9.9'))
+        # Pools without members are not listed
+        self.assertEqual(2, self.api.member_iter.call_count)
+
+    def test_find_members_filtered(self):
+        index = address_index.AddressIndex.from_api(self.api, ['10.1.2.3'])
+
+        self.assertEqual(2, len(index.find_members('10.1.2.3')))
+        self.assertEqual([], index.find_members('10.1.2.4'))
+        self.api.member_iter.assert_called_with(mock.ANY,
+                                                address='10.1.2.3')
+
+    def test_find_vips(self):
+        index = address_index.AddressIndex.from_api(self.api, [])
+
+        self.assertEqual(
+            [('10.0.0.2', 'vip', 'lb2', 'db', None, None, None, None)],
+            index.find_vips('10.0.0.2'))
+        self.api.pool_iter.assert_not_called()
+        self.api.member_iter.assert_not_called()
+
+    def test_member_errors(self):
+        def member_iter(pool_id):
+            if pool_id == 'pool2':
+                raise Exception('Gone')
+            return iter(MEMBERS[pool_id])
+        self.api.member_iter.side_effect = member_iter
+
+        index = address_index.AddressIndex.from_api(self.api)
+
+        self.assertEqual(['pool2'], list(index.errors))
+        self.assertEqual(['pool1'], [m.pool_id for m in
+                                     index.find_members('10.1.2.3')])
+
+    def test_from_mirror(self):
+        collections = {'loadbalancers': LOADBALANCERS, 'pools': POOLS}
+        self.api.iter_list.side_effect = (
+            lambda path, resource: iter(collections.get(resource, [])))
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'mirror.sqlite')
+        local = mirror.Mirror(path, api=self.api)
+        self.addCleanup(local.close)
+        local.refresh()
+
+        index = address_index.AddressIndex.from_mirror(local, ['10.1.2.4'])
+
+        self.assertEqual(['m2'], [m.member_id for m in
+                                  index.find_members('10.1.2.4')])
+        self.assertEqual([], index.find_members('10.1.2.3'))
+        self.assertEqual(['lb1'], [m.loadbalancer_id for m in
+                                   index.find_vips('10.0.0.1')])
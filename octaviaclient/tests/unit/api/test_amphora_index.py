@@ -0,0 +1,130 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Amphora index Tests"""
+
+import os
+
+import fixtures
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import amphora_index
+from octaviaclient.api.v2 import records
+
+AMPHORAE = [
+    {'id': 'amp1', 'compute_id': 'vm1', 'loadbalancer_id': 'lb1',
+     'status': 'ALLOCATED', 'updated_at': '2018-01-01T00:00:02'},
+    {'id': 'amp2', 'compute_id': 'vm2', 'loadbalancer_id': 'lb1',
+     'status': 'ALLOCATED', 'updated_at': None,
+     'created_at': '2018-01-01T00:00:01'},
+    {'id': 'amp3', 'compute_id': 'vm3', 'loadbalancer_id': 'lb2',
+     'status': 'ALLOCATED', 'updated_at': '2018-01-01T00:00:03'},
+]
+
+LOADBALANCERS = [
+    {'id': 'lb1', 'name': 'web', 'provisioning_status': 'ACTIVE',
+     'updated_at': '2018-01-01T00:00:01', 'vip_address': '10.0.0.1'},
+    {'id': 'lb2', 'name': 'db', 'provisioning_status': 'ACTIVE',
+     'updated_at': '2018-01-01T00:00:02', 'vip_address': '10.0.0.2'},
+]
+
+
+class TestAmphoraIndex(utils.TestCase):
+
+    def setUp(self):
+        super(TestAmphoraIndex, self).setUp()
+        self.api = mock.Mock()
+        self.api.amphora_iter.side_effect = lambda **kw: iter(AMPHORAE)
+        self.api.load_balancer_iter.side_effect = (
+            lambda **kw: iter(LOADBALANCERS))
+        self.api.changes_since.side_effect = lambda resource, since: iter([])
+
+    def test_refresh(self):
+        index = amphora_index.AmphoraIndex(self.api)
+        index.refresh()
+
+        self.assertEqual(3, len(index))
+        self.api.amphora_iter.assert_called_once_with()
+        self.assertEqual('amp2', index.by_compute_id('vm2')['id'])
+        self.assertIsNone(index.by_compute_id('vm4'))
+        self.assertEqual(['amp1', 'amp2'], sorted(
+            amp['id'] for amp in index.by_loadbalancer('web')))
+        self.assertEqual(['amp3'], [
+            amp['id'] for amp in index.by_loadbalancer('lb2')])
+        self.assertEqual([], index.by_loadbalancer('unknown'))
+        self.assertEqual('2018-01-01T00:00:03', index.amphora_mark)
+        self.assertEqual({'id': 'lb1', 'name': 'web',
+                          'updated_at': '2018-01-01T00:00:01',
+                          'created_at': None}, index.loadbalancers['lb1'])
+
+    def test_refresh_incremental(self):
+        index = amphora_index.AmphoraIndex(self.api)
+        index.refresh()
+
+        changes = [
+            {'id': 'amp4', 'compute_id': 'vm4', 'loadbalancer_id': 'lb2',
+             'status': 'ALLOCATED', 'updated_at': '2018-01-01T00:00:05'},
+            {'id': 'amp3', 'compute_id': 'vm3', 'loadbalancer_id': 'lb2',
+             'status': 'DELETED', 'updated_at': '2018-01-01T00:00:04'},
+            AMPHORAE[0],
+            AMPHORAE[1],
+        ]
+        self.api.changes_since.side_effect = (
+            lambda resource, since: iter(changes if resource == 'amphorae'
+                                         else []))
+        index.refresh()
+
+        self.api.amphora_iter.assert_called_once_with()
+        self.api.changes_since.assert_any_call('amphorae',
+                                               '2018-01-01T00:00:03')
+        self.api.changes_since.assert_any_call('loadbalancers',
+                                               '2018-01-01T00:00:02')
+        self.assertEqual(['amp1', 'amp2', 'amp4'], sorted(index.amphorae))
+        self.assertIsNone(index.by_compute_id('vm3'))
+        self.assertEqual('amp4', index.by_compute_id('vm4')['id'])
+        self.assertEqual('2018-01-01T00:00:05', index.amphora_mark)
+
+    @mock.patch('time.time')
+    def test_refresh_full_after_max_age(self, mock_time):
+        mock_time.return_value = 1000
+        index = amphora_index.AmphoraIndex(self.api, max_age=60)
+        index.refresh()
+        mock_time.return_value = 1061
+        index.amphorae['stale'] = {'id': 'stale'}
+        index.refresh()
+
+        self.assertNotIn('stale', index.amphorae)
+        self.api.amphora_iter.assert_called_with()
+
+    def test_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'amphorae.json')
+        amphora_index.AmphoraIndex(self.api, path=path).refresh()
+
+        index = amphora_index.AmphoraIndex(self.api, path=path)
+        self.assertEqual(3, len(index))
+        self.assertEqual('amp1', index.by_compute_id('vm1')['id'])
+        index.refresh()
+        self.api.changes_since.assert_any_call('amphorae',
+                                               '2018-01-01T00:00:03')
+
+    def test_file_records(self):
+        self.api.amphora_iter.side_effect = lambda **kw: iter(
+            records.convert('amphorae', AMPHORAE))
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'amphorae.json')
+        amphora_index.AmphoraIndex(self.api, path=path).refresh()
+
+        index = amphora_index.AmphoraIndex(self.api, path=path)
+        self.assertEqual(AMPHORAE[0], index.amphorae['amp1'])
@@ -0,0 +1,140 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Client side cache Tests"""
+
+import os
+
+import fixtures
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import cache
+
+
+class TestJSONFile(utils.TestCase):
+
+    def test_save_load(self):
+        directory = self.useFixture(fixtures.TempDir()).path
+        path = os.path.join(directory, 'sub', 'data.json')
+        self.assertIsNone(cache.load_json(path))
+
+        cache.save_json(path, {'a': [1, 2]})
+        self.assertEqual({'a': [1, 2]}, cache.load_json(path))
+        self.assertEqual(['data.json'], os.listdir(os.path.dirname(path)))
+
+    def test_errors_ignored(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'data.json')
+        with open(path, 'w') as f:
+            f.write('not json')
+        self.assertIsNone(cache.load_json(path))
+        # The parent directory is a file
+        cache.save_json(os.path.join(path, 'data.json'), {})
+
+
+class TestTTLCache(utils.TestCase):
+
+    def test_get_set(self):
+        ttl_cache = cache.TTLCache()
+        self.assertIsNone(ttl_cache.get('a'))
+        self.assertEqual('x', ttl_cache.get('a', 'x'))
+        ttl_cache.set('a', 1)
+        ttl_cache.update({'b': 2, 'c': 3})
+        self.assertEqual(1, ttl_cache.get('a'))
+        self.assertIn('b', ttl_cache)
+        self.assertEqual(3, len(ttl_cache))
+        ttl_cache.clear()
+        self.assertEqual(0, len(ttl_cache))
+
+    @mock.patch('time.time')
+    def test_expiry(self, mock_time):
+        mock_time.return_value = 1000
+        ttl_cache = cache.TTLCache(ttl=10)
+        ttl_cache.set('a', 1)
+        mock_time.return_value = 1009
+        self.assertEqual(1, ttl_cache.get('a'))
+        mock_time.return_value = 1010
+        self.assertIsNone(ttl_cache.get('a'))
+        self.assertNotIn('a', ttl_cache)
+        self.assertEqual(0, len(ttl_cache))
+
+    def test_file(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'sub', 'cache.json')
+        cache.TTLCache(path=path).update({'a': 'id-a', 'b': 'id-b'})
+        self.assertTrue(os.path.exists(path))
+
+        self.assertEqual('id-a', cache.TTLCache(path=path).get('a'))
+        self.assertIsNone(cache.TTLCache(ttl=-1, path=path).get('c'))
+
+    def test_file_expired(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'cache.json')
+        cache.TTLCache(ttl=-1, path=path).set('a', 'id-a')
+        self.assertIsNone(cache.TTLCache(path=path).get('a'))
+
+    def test_file_invalid(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'cache.json')
+        with open(path, 'w') as f:
+            f.write('not json')
+        ttl_cache = cache.TTLCache(path=path)
+        self.assertEqual(0, len(ttl_cache))
+        ttl_cache.set('a', 1)
+        self.assertEqual(1, cache.TTLCache(path=path).get('a'))
+
+
+class TestResponseCache(utils.TestCase):
+
+    @staticmethod
+    def _response(status_code=200, **headers):
+        return mock.Mock(status_code=status_code, headers=headers)
+
+    def test_validators(self):
+        response_cache = cache.ResponseCache()
+        response = self._response(ETag='"v1"', **{'Last-Modified': 'then'})
+        self.assertEqual({'If-None-Match': '"v1"',
+                          'If-Modified-Since': 'then'},
+                         response_cache.validators(response))
+
+        response_cache.store('a', response)
+        self.assertEqual((response, False), response_cache.get('a'))
+        # Responses without validators are not kept without a TTL
+        response_cache.store('b', self._response())
+        response_cache.store('c', self._response(404, ETag='"v1"'))
+        self.assertEqual((None, False), response_cache.get('b'))
+        self.assertEqual(1, len(response_cache))
+
+    @mock.patch('time.time')
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        response_cache = cache.ResponseCache(ttl=5)
+        response = self._response()
+        response_cache.store('a', response)
+        mock_time.return_value = 1004
+        self.assertEqual((response, True), response_cache.get('a'))
+        mock_time.return_value = 1005
+        self.assertEqual((response, False), response_cache.get('a'))
+
+    def test_lru(self):
+        response_cache = cache.ResponseCache(max_entries=2, ttl=60)
+        for key in ('a', 'b'):
+            response_cache.store(key, self._response())
+        response_cache.get('a')
+        response_cache.store('c', self._response())
+        self.assertIsNone(response_cache.get('b')[0])
+        self.assertIsNotNone(response_cache.get('a')[0])
+        self.assertIsNotNone(response_cache.get('c')[0])
+        response_cache.clear()
+        self.assertEqual(0, len(response_cache))
@@ -0,0 +1,54 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Concurrency helper Tests"""
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import concurrency
+
+
+class TestGather(utils.TestCase):
+
+    def test_gather(self):
+        results = concurrency.gather({'a': lambda: 1, 'b': lambda: 2})
+        self.assertEqual({'a': 1, 'b': 2}, results)
+
+    def test_gather_error(self):
+        def fail():
+            raise ValueError('boom')
+
+        self.assertRaises(ValueError, concurrency.gather,
+                          {'a': lambda: 1, 'b': fail})
+
+
+class TestImapUnordered(utils.TestCase):
+
+    def test_imap_unordered(self):
+        def double(item):
+            if item == 3:
+                raise ValueError('three')
+            return item * 2
+
+        results = sorted(concurrency.imap_unordered(double, range(6),
+                                                    max_workers=2),
+                         key=lambda r: r[0])
+
+        self.assertEqual([0, 1, 2, 3, 4, 5], [r[0] for r in results])
+        self.assertEqual([0, 2, 4, None, 8, 10], [r[1] for r in results])
+        self.assertIsInstance(results[3][2], ValueError)
+        self.assertEqual([None] * 5,
+                         [r[2] for r in results if r[0] != 3])
+
+    def test_imap_unordered_empty(self):
+        self.assertEqual([], list(concurrency.imap_unordered(len, [])))
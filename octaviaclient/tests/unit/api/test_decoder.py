@@ -0,0 +1,63 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""JSON decoder Tests"""
+
+import json
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import decoder
+
+DOCUMENT = {
+    'pools_links': [{'rel': 'next', 'href': 'next-page'}],
+    'pools': [{'id': 'p%d' % i, 'name': u'pool é %d' % i,
+               'members': [{'weight': 1.5}], 'tags': []}
+              for i in range(20)],
+    'count': 12345,
+}
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestDecoder(utils.TestCase):
+
+    def test_load_decoder(self):
+        self.assertIs(json.loads, decoder.load_decoder(('not_a_module',)))
+        self.assertEqual({'a': [1]}, decoder.loads(b'{"a": [1]}'))
+
+    def test_iter_items(self):
+        data = json.dumps(DOCUMENT, indent=1).encode('utf-8')
+        # Chunks cutting through strings, numbers and UTF-8 sequences
+        for size in (1, 3, 7, len(data)):
+            others = {}
+            items = list(decoder.iter_items(_chunks(data, size), 'pools',
+                                            others))
+            self.assertEqual(DOCUMENT['pools'], items)
+            self.assertEqual({'pools_links': DOCUMENT['pools_links'],
+                              'count': 12345}, others)
+
+    def test_iter_items_empty(self):
+        self.assertEqual([], list(decoder.iter_items([b'{}'], 'pools')))
+        self.assertEqual([], list(decoder.iter_items(
+            [b' { "pools" : [ ] } '], 'pools')))
+        self.assertEqual([], list(decoder.iter_items(
+            [b'{"pools": null}'], 'pools')))
+
+    def test_iter_items_invalid(self):
+        for data in (b'', b'[]', b'{"pools": [{"id": 1}', b'{"pools" [1]}',
+                     b'{"pools": [1 2]}'):
+            self.assertRaises(ValueError, list,
+                              decoder.iter_items(_chunks(data, 2), 'pools'))
@@ -0,0 +1,122 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Mass failover Tests"""
+
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import failover
+
+
+class TestSelectLoadBalancers(utils.TestCase):
+
+    def setUp(self):
+        super(TestSelectLoadBalancers, self).setUp()
+        self.api = mock.Mock()
+        self.api.load_balancer_iter.side_effect = lambda **kw: iter([
+            {'id': 'lb1'}, {'id': 'lb2'}, {'id': 'lb3'}])
+        self.api.amphora_iter.side_effect = lambda **kw: iter([
+            {'loadbalancer_id': 'lb1', 'image_id': 'old',
+             'compute_id': 'vm1'},
+            {'loadbalancer_id': 'lb2', 'image_id': 'new',
+             'compute_id': 'vm2'},
+            {'loadbalancer_id': 'lb3', 'image_id': 'old',
+             'compute_id': 'vm3'},
+        ])
+
+    def test_select_all(self):
+        self.assertEqual(['lb1', 'lb2', 'lb3'],
+                         failover.select_loadbalancers(self.api))
+        self.api.load_balancer_iter.assert_called_once_with()
+        self.api.amphora_iter.assert_not_called()
+
+    def test_select_filters(self):
+        self.assertEqual(['lb1', 'lb3'], failover.select_loadbalancers(
+            self.api, project_id='p1', provisioning_status='ACTIVE',
+            image_id='old'))
+        self.api.load_balancer_iter.assert_called_once_with(
+            project_id='p1', provisioning_status='ACTIVE')
+
+    def test_select_compute_ids(self):
+        self.assertEqual(['lb3'], failover.select_loadbalancers(
+            self.api, image_id='old', compute_ids=['vm2', 'vm3']))
+        self.assertEqual([], failover.select_loadbalancers(
+            self.api, compute_ids=[]))
+
+
+class TestRateLimiter(utils.TestCase):
+
+    @mock.patch('time.sleep')
+    def test_acquire(self, mock_sleep):
+        limiter = failover.RateLimiter(rate=2)
+        limiter._watch = mock.Mock()
+        limiter._watch.elapsed.side_effect = [0, 0, 0.5]
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+        limiter.acquire()
+        mock_sleep.assert_called_once_with(0.5)
+
+
+@mock.patch('octaviaclient.api.v2.waiter.wait_for_active')
+class TestFailoverOrchestrator(utils.TestCase):
+
+    def setUp(self):
+        super(TestFailoverOrchestrator, self).setUp()
+        self.api = mock.Mock()
+
+    def test_run(self, mock_wait):
+        orchestrator = failover.FailoverOrchestrator(self.api, timeout=5,
+                                                     interval=1)
+        results = orchestrator.run(['lb1', 'lb2', 'lb1'])
+
+        self.assertEqual([('lb1', failover.COMPLETED, None),
+                          ('lb2', failover.COMPLETED, None)], results)
+        self.api.load_balancer_failover.assert_has_calls(
+            [mock.call(lb_id='lb1'), mock.call(lb_id='lb2')],
+            any_order=True)
+        mock_wait.assert_has_calls([mock.call(self.api, 'lb1', 5, 1),
+                                    mock.call(self.api, 'lb2', 5, 1)],
+                                   any_order=True)
+
+    def test_run_no_wait(self, mock_wait):
+        orchestrator = failover.FailoverOrchestrator(self.api, wait=False)
+        orchestrator.run(['lb1'])
+        mock_wait.assert_not_called()
+
+    def test_run_error_rate(self, mock_wait):
+        mock_wait.side_effect = failover.waiter.ProvisioningError('ERROR')
+        callback = mock.Mock()
+        orchestrator = failover.FailoverOrchestrator(
+            self.api, max_workers=1, max_error_rate=0.5, min_samples=2)
+        lb_ids = ['lb%d' % i for i in range(5)]
+        results = orchestrator.run(lb_ids, callback=callback)
+
+        self.assertTrue(orchestrator.aborted)
+        self.assertEqual([failover.FAILED] * 2 + [failover.SKIPPED] * 3,
+                         [r.status for r in results])
+        self.assertEqual('Skipped: 2 of 2 failovers failed',
+                         results[-1].error)
+        self.assertEqual(2, self.api.load_balancer_failover.call_count)
+        self.assertEqual(5, callback.call_count)
+
+    def test_run_error_rate_below_threshold(self, mock_wait):
+        mock_wait.side_effect = [failover.waiter.WaitTimeout('slow'),
+                                 None, None, None]
+        orchestrator = failover.FailoverOrchestrator(
+            self.api, max_workers=1, max_error_rate=0.5, min_samples=2)
+        results = orchestrator.run(['lb1', 'lb2', 'lb3', 'lb4'])
+
+        self.assertFalse(orchestrator.aborted)
+        self.assertEqual([failover.FAILED] + [failover.COMPLETED] * 3,
+                         [r.status for r in results])
@@ -0,0 +1,82 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Fan-out client Tests"""
+
+from keystoneauth1 import access
+from keystoneauth1 import fixture as ks_fixture
+from keystoneauth1 import session
+import mock
+from requests_mock.contrib import fixture
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import fanout
+from octaviaclient.api.v2 import octavia
+
+REGION_URLS = {
+    'RegionOne': 'http://one.example.com/',
+    'RegionTwo': 'http://two.example.com/',
+}
+
+
+class TestFanout(utils.TestCase):
+
+    def setUp(self):
+        super(TestFanout, self).setUp()
+        self.requests_mock = self.useFixture(fixture.Fixture())
+        token = ks_fixture.V3Token()
+        service = token.add_service(fanout.SERVICE_TYPE)
+        for region, url in sorted(REGION_URLS.items()):
+            service.add_standard_endpoints(public=url, internal=url + 'int',
+                                           region=region)
+        self.session = session.Session(auth=mock.Mock())
+        self.session.auth.get_access.return_value = access.create(body=token)
+
+    def test_catalog_endpoints(self):
+        endpoints = fanout.catalog_endpoints(self.session, 'public')
+        self.assertEqual(['RegionOne', 'RegionTwo'], list(endpoints))
+        self.assertEqual(REGION_URLS['RegionOne'],
+                         endpoints['RegionOne'])
+
+    def test_from_catalog(self):
+        hook = mock.Mock()
+        client = fanout.FanoutClient.from_catalog(
+            self.session, 'public', regions=['RegionTwo', 'RegionThree'],
+            hooks=[hook])
+        self.assertEqual(1, len(client))
+        api = client.clients['RegionTwo']
+        self.assertIsInstance(api, octavia.OctaviaAPI)
+        self.assertEqual('http://two.example.com/v2.0', api.endpoint)
+        self.assertEqual([hook], api.hooks)
+
+    def test_call(self):
+        sess = session.Session()
+        client = fanout.FanoutClient(
+            (region, octavia.OctaviaAPI(session=sess, endpoint=url))
+            for region, url in REGION_URLS.items())
+        self.requests_mock.register_uri(
+            'GET', REGION_URLS['RegionOne'] + 'v2.0/lbaas/loadbalancers',
+            json={'loadbalancers': [{'id': 'lb1'}]})
+        self.requests_mock.register_uri(
+            'GET', REGION_URLS['RegionTwo'] + 'v2.0/lbaas/loadbalancers',
+            status_code=503)
+
+        results = dict((r.region, r) for r in
+                       client.call('load_balancer_list', name='web'))
+
+        self.assertEqual({'loadbalancers': [{'id': 'lb1'}]},
+                         results['RegionOne'].result)
+        self.assertIsNone(results['RegionOne'].error)
+        self.assertIsNotNone(results['RegionTwo'].error)
+        self.assertEqual('name=web', self.requests_mock.last_request.query)
@@ -0,0 +1,86 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Load balancer index Tests"""
+
+import mock
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import index
+
+
+class TestLoadBalancerIndex(utils.TestCase):
+
+    def setUp(self):
+        super(TestLoadBalancerIndex, self).setUp()
+        self.api = mock.Mock()
+        listings = {
+            'load_balancer_iter': [{'id': 'lb1'}, {'id': 'lb2'}],
+            'listener_iter': [{'id': 'li1', 'loadbalancers': [{'id': 'lb1'}]}],
+            'pool_iter': [
+                {'id': 'po1', 'loadbalancers': [{'id': 'lb1'}],
+                 'members': [{'id': 'me1'}, {'id': 'me2'}]},
+                {'id': 'po2', 'loadbalancers': [],
+                 'listeners': [{'id': 'li1'}], 'members': []}],
+            'l7policy_iter': [{'id': 'l7po1', 'listener_id': 'li1',
+                               'rules': [{'id': 'r1'}]}],
+            'health_monitor_iter': [{'id': 'hm1', 'pools': [{'id': 'po1'}]}],
+        }
+        for method, objects in listings.items():
+            getattr(self.api, method).side_effect = (
+                lambda objects=objects: iter(objects))
+        self.index = index.LoadBalancerIndex(self.api)
+
+    def test_get_loads_lazily(self):
+        self.assertIsNone(self.index.get('me1', load=False))
+        self.assertFalse(self.index.loaded)
+
+        self.assertEqual('lb1', self.index.get('me1'))
+        for object_id in ('lb1', 'li1', 'po1', 'po2', 'me2', 'l7po1', 'r1',
+                          'hm1'):
+            self.assertEqual('lb1', self.index.get(object_id))
+        self.assertEqual('lb2', self.index.get('lb2'))
+        self.assertNotIn('unknown', self.index)
+        self.api.pool_iter.assert_called_once_with()
+
+    def test_record_created_objects(self):
+        self.index.load()
+        self.index.record('/lbaas/pools/po1/members',
+                          {'member': {'id': 'me3'}})
+        self.index.record('/lbaas/l7policies/l7po1/rules',
+                          {'rule': {'id': 'r2'}})
+        self.index.record('/lbaas/listeners',
+                          {'listener': {'id': 'li2',
+                                        'loadbalancers': [{'id': 'lb2'}]}})
+        self.index.record('/lbaas/loadbalancers',
+                          {'loadbalancer': {'id': 'lb3'}})
+        self.assertEqual('lb1', self.index.get('me3'))
+        self.assertEqual('lb1', self.index.get('r2'))
+        self.assertEqual('lb2', self.index.get('li2'))
+        self.assertEqual('lb3', self.index.get('lb3'))
+
+    def test_record_ignored_until_loaded(self):
+        self.index.record('/lbaas/loadbalancers',
+                          {'loadbalancer': {'id': 'lb3'}})
+        self.assertEqual(0, len(self.index))
+
+    def test_discard(self):
+        self.index.load()
+        self.index.discard('me1')
+        self.assertIsNone(self.index.get('me1'))
+        self.assertEqual('lb1', self.index.get('me2'))
+
+        self.index.discard('lb1')
+        self.assertIsNone(self.index.get('po1'))
+        self.assertEqual('lb2', self.index.get('lb2'))
@@ -0,0 +1,106 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""L7 evaluator Tests"""
+
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import l7evaluator
+
+
+def _rule(rule_type, compare_type, value, key=None, invert=False,
+          admin_state_up=True):
+    return {'type': rule_type, 'compare_type': compare_type, 'value': value,
+            'key': key, 'invert': invert, 'admin_state_up': admin_state_up}
+
+
+POLICIES = [
+    {'id': 'p-static', 'name': 'static', 'position': 2,
+     'action': 'REDIRECT_TO_POOL', 'redirect_pool_id': 'static-pool',
+     'rules': [_rule('FILE_TYPE', 'REGEX', '^(css|js)$')]},
+    {'id': 'p-api', 'name': 'api', 'position': 1,
+     'action': 'REDIRECT_TO_POOL', 'redirect_pool_id': 'api-pool',
+     'rules': [_rule('PATH', 'STARTS_WITH', '/api'),
+               _rule('HOST_NAME', 'EQUAL_TO', 'www.example.com')]},
+    {'id': 'p-beta', 'name': 'beta', 'position': 3,
+     'action': 'REDIRECT_TO_URL', 'redirect_url': 'https://beta.example.com',
+     'rules': [_rule('COOKIE', 'EQUAL_TO', 'yes', key='beta')]},
+    {'id': 'p-bots', 'name': 'bots', 'position': 4, 'action': 'REJECT',
+     'rules': [_rule('HEADER', 'CONTAINS', 'bot', key='User-Agent'),
+               _rule('PATH', 'EQUAL_TO', '/robots.txt', invert=True)]},
+    {'id': 'p-disabled', 'name': 'disabled', 'position': 0,
+     'action': 'REJECT', 'admin_state_up': False,
+     'rules': [_rule('PATH', 'STARTS_WITH', '/')]},
+    {'id': 'p-norules', 'name': 'norules', 'position': 0,
+     'action': 'REJECT', 'rules': [
+         _rule('PATH', 'STARTS_WITH', '/', admin_state_up=False)]},
+]
+
+
+class TestL7Evaluator(utils.TestCase):
+
+    def setUp(self):
+        super(TestL7Evaluator, self).setUp()
+        self.evaluator = l7evaluator.L7Evaluator(POLICIES, 'default-pool')
+
+    def _route(self, **request):
+        route = self.evaluator.route(request)
+        return route.l7policy_name, route.target
+
+    def test_compiled(self):
+        self.assertEqual(4, len(self.evaluator))
+
+    def test_route(self):
+        self.assertEqual(('api', 'api-pool'), self._route(
+            host='WWW.example.com:8080', path='/api/v1?x=1'))
+        self.assertEqual(('static', 'static-pool'), self._route(
+            host='www.example.com', path='/assets/app.js'))
+        self.assertEqual(('static', 'static-pool'), self._route(
+            host='other.example.com', path='/api/app.css'))
+        self.assertEqual(('beta', 'https://beta.example.com'), self._route(
+            path='/', headers={'Cookie': 'a=1; beta=yes'}))
+        self.assertEqual(('beta', 'https://beta.example.com'), self._route(
+            path='/', cookies={'beta': 'yes'}))
+        self.assertEqual(('bots', None), self._route(
+            path='/', headers={'user-agent': 'somebot/1.0'}))
+        self.assertEqual((None, 'default-pool'), self._route(
+            path='/robots.txt', headers={'User-Agent': 'somebot/1.0'}))
+        self.assertEqual((None, 'default-pool'), self._route(
+            host='other.example.com', path='/api'))
+        self.assertEqual((None, 'default-pool'), self._route())
+
+    def test_unsupported(self):
+        self.assertRaises(l7evaluator.EvaluationError,
+                          l7evaluator.compile_rule,
+                          _rule('SSL_DN_FIELD', 'EQUAL_TO', 'x'))
+        self.assertRaises(l7evaluator.EvaluationError,
+                          l7evaluator.compile_rule,
+                          _rule('PATH', 'GLOB', '*'))
+
+    def test_fetch(self):
+        api = mock.Mock()
+        api.listener_show.return_value = {'default_pool_id': 'pool'}
+        api.l7policy_list.return_value = {'l7policies': [
+            {'id': 'p1', 'rules': [{'id': 'r1'}]}]}
+        rule = _rule('PATH', 'EQUAL_TO', '/')
+        api.l7rule_list.return_value = {'rules': [rule]}
+
+        data = l7evaluator.L7Evaluator.fetch(api, 'listener')
+
+        self.assertEqual({'default_pool_id': 'pool', 'l7policies': [
+            {'id': 'p1', 'rules': [rule]}]}, data)
+        api.l7policy_list.assert_called_once_with(listener_id='listener')
+        api.l7rule_list.assert_called_once_with('p1')
+        self.assertEqual(1, len(l7evaluator.L7Evaluator.from_api(
+            api, 'listener')))
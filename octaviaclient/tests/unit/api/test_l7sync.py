@@ -0,0 +1,158 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""L7 policy synchronisation Tests"""
+
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import l7sync
+
+
+def _policies(*names):
+    return [{'id': 'id-' + name, 'name': name, 'position': i + 1,
+             'action': 'REJECT', 'rules': []}
+            for i, name in enumerate(names)]
+
+
+def _simulate(current, operations):
+    """Apply operations to a list of names the way Octavia does"""
+    order = [p['name'] for p in sorted(current, key=lambda p: p['position'])]
+    for op in operations:
+        if op.method == 'l7policy_delete':
+            order.remove(op.kwargs['l7policy_id'][3:])
+        elif op.method == 'l7policy_create':
+            policy = op.kwargs['json']['l7policy']
+            order.insert(policy['position'] - 1, policy['name'])
+        elif op.method == 'l7policy_set':
+            position = op.kwargs['json']['l7policy'].get('position')
+            if position:
+                name = op.kwargs['l7policy_id'][3:]
+                order.remove(name)
+                order.insert(position - 1, name)
+    return order
+
+
+class TestLongestIncreasingSubsequence(utils.TestCase):
+
+    def test_lis(self):
+        self.assertEqual(set(), l7sync.longest_increasing_subsequence([]))
+        self.assertEqual({0, 1, 2},
+                         l7sync.longest_increasing_subsequence([0, 1, 2]))
+        self.assertEqual({1, 2, 3},
+                         l7sync.longest_increasing_subsequence([3, 0, 1, 2]))
+        self.assertEqual(3, len(l7sync.longest_increasing_subsequence(
+            [2, 0, 3, 1, 4])))
+
+
+class TestPlan(utils.TestCase):
+
+    def _check(self, current_names, desired_names):
+        current = _policies(*current_names)
+        desired = [{'name': name} for name in desired_names]
+        operations = l7sync.plan('listener', current, desired)
+        self.assertEqual(list(desired_names), _simulate(current, operations))
+        return operations
+
+    def test_plan_unchanged(self):
+        self.assertEqual([], self._check('abc', 'abc'))
+
+    def test_plan_single_move(self):
+        operations = self._check('dabc', 'abcd')
+        self.assertEqual(1, len(operations))
+        self.assertEqual(
+            ('l7policy_set', {'l7policy_id': 'id-d',
+                              'json': {'l7policy': {'position': 4}}}),
+            operations[0][:2])
+
+    def test_plan_reverse(self):
+        operations = self._check('abcde', 'edcba')
+        self.assertEqual(4, len(operations))
+
+    def test_plan_creates_and_deletes(self):
+        operations = self._check('abcde', 'xbeyca')
+        methods = [op.method for op in operations]
+        self.assertEqual(['l7policy_delete'], methods[:1])
+        self.assertEqual({'l7policy_id': 'id-d'}, operations[0].kwargs)
+        self.assertEqual(2, methods.count('l7policy_create'))
+        self.assertEqual(2, methods.count('l7policy_set'))
+
+    def test_plan_many(self):
+        current = ['p%03d' % i for i in range(200)]
+        desired = current[100:] + current[:100]
+        operations = self._check(current, desired)
+        self.assertEqual(100, len(operations))
+
+    def test_plan_attributes_and_rules(self):
+        current = _policies('a', 'b')
+        current[0]['rules'] = [
+            {'id': 'r1', 'type': 'PATH', 'compare_type': 'STARTS_WITH',
+             'value': '/api', 'key': None, 'invert': False,
+             'admin_state_up': True},
+            {'id': 'r2', 'type': 'HOST_NAME', 'compare_type': 'EQUAL_TO',
+             'value': 'old.example.com', 'key': None, 'invert': False,
+             'admin_state_up': True},
+        ]
+        desired = [
+            {'name': 'a', 'action': 'REDIRECT_TO_URL',
+             'redirect_url': 'http://example.com',
+             'rules': [{'type': 'PATH', 'compare_type': 'STARTS_WITH',
+                        'value': '/api'},
+                       {'type': 'HOST_NAME', 'compare_type': 'EQUAL_TO',
+                        'value': 'new.example.com'}]},
+            {'name': 'b', 'action': 'REJECT'},
+        ]
+        operations = l7sync.plan('listener', current, desired)
+
+        self.assertEqual([
+            ('l7policy_set', {'l7policy_id': 'id-a', 'json': {'l7policy': {
+                'action': 'REDIRECT_TO_URL',
+                'redirect_url': 'http://example.com'}}}),
+            ('l7rule_delete', {'l7rule_id': 'r2', 'l7policy_id': 'id-a'}),
+            ('l7rule_create', {'l7policy_id': 'id-a', 'json': {'rule': {
+                'type': 'HOST_NAME', 'compare_type': 'EQUAL_TO',
+                'value': 'new.example.com'}}}),
+        ], [op[:2] for op in operations])
+
+    def test_plan_create_with_rules(self):
+        rules = [{'type': 'PATH', 'compare_type': 'EQUAL_TO', 'value': '/'}]
+        operations = l7sync.plan('listener', [], [
+            {'name': 'a', 'action': 'REJECT', 'rules': rules}])
+        self.assertEqual({'l7policy': {
+            'name': 'a', 'action': 'REJECT', 'listener_id': 'listener',
+            'position': 1, 'rules': rules}}, operations[0].kwargs['json'])
+
+    def test_plan_errors(self):
+        current = _policies('a', 'a')
+        self.assertRaises(l7sync.SyncError, l7sync.plan, 'listener',
+                          current, [{'name': 'a'}])
+        self.assertRaises(l7sync.SyncError, l7sync.plan, 'listener',
+                          current, [{'id': 'unknown'}])
+        self.assertRaises(l7sync.SyncError, l7sync.plan, 'listener',
+                          current, [{'id': 'id-a'}, {'id': 'id-a'}])
+
+
+class TestApply(utils.TestCase):
+
+    @mock.patch('octaviaclient.api.v2.waiter.wait_for_active')
+    def test_apply(self, mock_wait):
+        api = mock.Mock()
+        operations = l7sync.plan('listener', _policies('a', 'b'),
+                                 [{'name': 'b'}])
+        l7sync.apply(api, 'lb', operations, timeout=5, interval=1)
+
+        api.l7policy_delete.assert_called_once_with(l7policy_id='id-a')
+        mock_wait.assert_called_once_with(api, 'lb', 5, 1)
+
+        l7sync.apply(api, 'lb', operations, wait=False)
+        self.assertEqual(1, mock_wait.call_count)
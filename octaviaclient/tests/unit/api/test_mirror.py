@@ -0,0 +1,178 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Mirror Tests"""
+
+import os
+
+import fixtures
+import mock
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import mirror
+from octaviaclient.api.v2 import records
+
+COLLECTIONS = {
+    'loadbalancers': [
+        {'id': 'lb1', 'name': 'web', 'project_id': 'p1',
+         'provisioning_status': 'ACTIVE', 'operating_status': 'ONLINE',
+         'vip_address': '10.0.0.1', 'updated_at': '2018-01-01T00:00:01'},
+        {'id': 'lb2', 'name': 'db', 'project_id': 'p2',
+         'provisioning_status': 'ACTIVE', 'operating_status': 'ONLINE',
+         'vip_address': '10.0.0.2', 'updated_at': '2018-01-01T00:00:02'},
+    ],
+    'listeners': [],
+    'pools': [
+        {'id': 'pool1', 'name': 'web-pool', 'project_id': 'p1',
+         'loadbalancers': [{'id': 'lb1'}], 'members': [{'id': 'm1'}],
+         'updated_at': '2018-01-01T00:00:01'},
+        {'id': 'pool2', 'name': 'db-pool', 'project_id': 'p2',
+         'loadbalancers': [{'id': 'lb2'}], 'members': [{'id': 'm2'}],
+         'updated_at': '2018-01-01T00:00:01'},
+    ],
+    'healthmonitors': [],
+    'l7policies': [],
+    'amphorae': [],
+}
+
+MEMBERS = {
+    'pool1': [{'id': 'm1', 'address': '10.1.2.3', 'protocol_port': 80}],
+    'pool2': [{'id': 'm2', 'address': '10.1.2.4', 'protocol_port': 3306}],
+}
+
+
+class TestMirror(utils.TestCase):
+
+    def setUp(self):
+        super(TestMirror, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'mirror', 'mirror.sqlite')
+        self.api = mock.Mock()
+        self.api.iter_list.side_effect = (
+            lambda path, resource: iter(COLLECTIONS[resource]))
+        self.api.member_iter.side_effect = (
+            lambda pool_id: iter(MEMBERS[pool_id]))
+        self.api.changes_since.side_effect = lambda resource, since: iter([])
+        self.mirror = mirror.Mirror(self.path, api=self.api)
+        self.addCleanup(self.mirror.close)
+
+    def test_refresh(self):
+        fetched = self.mirror.refresh()
+
+        self.assertEqual(2, fetched['loadbalancers'])
+        self.assertEqual(2, fetched['members'])
+        self.assertEqual(2, self.mirror.count('pools'))
+        self.assertEqual(0, self.mirror.count('listeners'))
+        self.api.changes_since.assert_not_called()
+
+    def test_query(self):
+        self.mirror.refresh()
+
+        self.assertEqual(['lb2'], [lb['id'] for lb in self.mirror.query(
+            'loadbalancers', vip_address='10.0.0.2')])
+        self.assertEqual(['pool1'], [pool['id'] for pool in self.mirror.query(
+            'pools', loadbalancer_id='lb1')])
+        self.assertEqual(['pool1'], [m['pool_id'] for m in self.mirror.query(
+            'members', address='10.1.2.3')])
+        self.assertEqual(['m1'], [m['id'] for m in self.mirror.query(
+            'members', pool_id='pool1', protocol_port=80)])
+        self.assertEqual([], self.mirror.query('members', protocol_port=443))
+
+    def test_get(self):
+        self.mirror.refresh()
+
+        self.assertEqual(COLLECTIONS['loadbalancers'][1],
+                         self.mirror.get('loadbalancers', 'db')[0])
+        self.assertEqual(['lb1'], [lb['id'] for lb in self.mirror.get(
+            'loadbalancers', 'lb1')])
+        self.assertEqual([], self.mirror.get('pools', 'lb1'))
+
+    def test_never_refreshed(self):
+        self.assertRaises(mirror.MirrorError, self.mirror.query, 'pools')
+        self.assertRaises(mirror.MirrorError, self.mirror.get, 'pools', 'x')
+
+    def test_refresh_changes(self):
+        self.mirror.refresh()
+        changed_pool = dict(COLLECTIONS['pools'][0],
+                            updated_at='2018-01-01T00:00:05')
+        changes = {
+            'loadbalancers': [dict(COLLECTIONS['loadbalancers'][1],
+                                   provisioning_status='DELETED')],
+            'pools': [changed_pool],
+        }
+        self.api.changes_since.side_effect = (
+            lambda resource, since: iter(changes.get(resource, [])))
+        self.api.member_iter.side_effect = lambda pool_id: iter(
+            [{'id': 'm3', 'address': '10.1.2.5'}])
+        self.api.iter_list.reset_mock()
+        self.api.member_iter.reset_mock()
+
+        fetched = self.mirror.refresh()
+
+        # Collections found empty have no mark and are listed again
+        self.assertNotIn('pools', [c[0][1] for c in
+                                   self.api.iter_list.call_args_list])
+        self.api.changes_since.assert_any_call('pools',
+                                               '2018-01-01T00:00:01')
+        self.api.changes_since.assert_any_call('loadbalancers',
+                                               '2018-01-01T00:00:02')
+        # Only the members of the changed pool are listed again
+        self.api.member_iter.assert_called_once_with(pool_id='pool1')
+        self.assertEqual(1, fetched['members'])
+        self.assertEqual(['lb1'], [lb['id'] for lb in self.mirror.query(
+            'loadbalancers')])
+        self.assertEqual(['m2', 'm3'], sorted(
+            m['id'] for m in self.mirror.query('members')))
+
+    def test_refresh_full_after_max_age(self):
+        self.mirror.refresh()
+        self.mirror.max_age = -1
+
+        self.mirror.refresh()
+
+        self.api.changes_since.assert_not_called()
+        self.assertEqual(4, self.api.member_iter.call_count)
+
+    def test_refresh_error(self):
+        def iter_list(path, resource):
+            if resource == 'amphorae':
+                raise Exception('Forbidden')
+            return iter(COLLECTIONS[resource])
+        self.api.iter_list.side_effect = iter_list
+
+        fetched = self.mirror.refresh()
+
+        self.assertEqual(0, fetched['amphorae'])
+        self.assertEqual(2, self.mirror.count('loadbalancers'))
+
+    def test_refresh_records(self):
+        self.api.iter_list.side_effect = lambda path, resource: iter(
+            records.convert(resource, COLLECTIONS[resource]))
+        self.api.member_iter.side_effect = lambda pool_id: iter(
+            records.convert('members', MEMBERS[pool_id]))
+
+        self.mirror.refresh()
+
+        self.assertEqual(COLLECTIONS['pools'][0],
+                         self.mirror.get('pools', 'pool1')[0])
+        self.assertEqual(['pool1'], [m['pool_id'] for m in self.mirror.query(
+            'members', address='10.1.2.3')])
+
+    def test_reopen(self):
+        self.mirror.refresh()
+        self.mirror.close()
+
+        reopened = mirror.Mirror(self.path)
+        self.addCleanup(reopened.close)
+        self.assertIsNotNone(reopened.refreshed_at)
+        self.assertEqual(2, reopened.count('members'))
@@ -13,13 +13,20 @@
 
 """Load Balancer v2 API Library Tests"""
 
+import json
+import zlib
+
 from keystoneauth1 import session
+import mock
 from oslo_utils import uuidutils
 from requests_mock.contrib import fixture
 
 from osc_lib.tests import utils
 
+from octaviaclient.api.v2 import cache
 from octaviaclient.api.v2 import octavia
+from octaviaclient.api.v2 import records
+from octaviaclient.api.v2 import retry
 
 FAKE_ACCOUNT = 'q12we34r'
 FAKE_AUTH = '11223344556677889900'
@@ -837,3 +844,410 @@ class TestLoadBalancer(TestOctaviaClient):
                                self._error_message,
                                self.api.quota_reset,
                                FAKE_PRJ)
+
+
+class TestPlanning(TestOctaviaClient):
+
+    def test_planning_records_without_sending_mutations(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers',
+            json=LIST_LB_RESP,
+            status_code=200,
+        )
+        with self.api.planning() as plan:
+            self.assertEqual(LIST_LB_RESP, self.api.load_balancer_list())
+            ret = self.api.load_balancer_set(FAKE_LB, json=SINGLE_LB_UPDATE)
+
+        self.assertEqual(SINGLE_LB_UPDATE, ret)
+        self.assertEqual(1, self.requests_mock.call_count)
+        self.assertEqual(['GET', 'PUT'], [r.method for r in plan.requests])
+        self.assertEqual(FAKE_LB, plan.writes[0].loadbalancer_id)
+        self.assertIsNone(self.api._plan)
+
+
+class TestHooks(TestOctaviaClient):
+
+    def setUp(self):
+        super(TestHooks, self).setUp()
+        self.hook = mock.Mock()
+        self.api.add_hook(self.hook)
+
+    def test_hook_records_request(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'pools/' + FAKE_PO,
+            json=SINGLE_PO_RESP,
+            status_code=200,
+            headers={'x-openstack-request-id': 'req-1'},
+        )
+        with self.api.tagged('name-resolution'):
+            self.api.pool_show(FAKE_PO)
+
+        record = self.hook.call_args[0][0]
+        self.assertEqual('GET', record.method)
+        self.assertEqual('/lbaas/pools/{id}', record.template)
+        self.assertEqual(200, record.status)
+        self.assertEqual('req-1', record.request_id)
+        self.assertEqual('name-resolution', record.tag)
+        self.assertGreater(record.bytes, 0)
+        self.assertEqual(record.bytes, record.wire_bytes)
+
+    def test_hook_records_compressed_size(self):
+        body = json.dumps({'pools': [{'name': 'pool'}] * 100}).encode('utf-8')
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'pools',
+            content=zlib.compress(body),
+            headers={'Content-Encoding': 'deflate'},
+        )
+        self.assertEqual(100, len(self.api.pool_list()['pools']))
+
+        request = self.requests_mock.last_request
+        self.assertEqual(octavia.ACCEPT_ENCODING,
+                         request.headers['Accept-Encoding'])
+        record = self.hook.call_args[0][0]
+        self.assertEqual(len(body), record.bytes)
+        self.assertEqual(len(zlib.compress(body)), record.wire_bytes)
+
+    def test_hook_records_streamed_page(self):
+        body = json.dumps({'pools': [{'id': 'p1'}, {'id': 'p2'}],
+                           'pools_links': []}).encode('utf-8')
+        self.requests_mock.register_uri(
+            'GET', FAKE_LBAAS_URL + 'pools', content=body)
+
+        pools = self.api.pool_iter()
+        self.assertEqual('p1', next(pools)['id'])
+        # The body is still being read
+        self.hook.assert_not_called()
+        self.assertEqual(['p2'], [pool['id'] for pool in pools])
+
+        self.hook.assert_called_once_with(mock.ANY)
+        record = self.hook.call_args[0][0]
+        self.assertEqual('/lbaas/pools', record.template)
+        self.assertEqual(200, record.status)
+        self.assertEqual(len(body), record.bytes)
+
+    def test_hook_records_error(self):
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_LBAAS_URL + 'pools/' + FAKE_PO,
+            text='{"faultstring": "Conflict"}',
+            status_code=409,
+        )
+        self.assertRaises(octavia.OctaviaClientException,
+                          self.api.pool_delete, FAKE_PO)
+        record = self.hook.call_args[0][0]
+        self.assertEqual(409, record.status)
+        self.assertIsNone(record.tag)
+
+
+@mock.patch('time.sleep')
+class TestRetry(TestOctaviaClient):
+
+    _immutable = ('{"faultstring": "Load Balancer %s is immutable and '
+                  'cannot be updated."}' % FAKE_LB)
+
+    def setUp(self):
+        super(TestRetry, self).setUp()
+        self.api.retry_policy = retry.RetryPolicy(deadline=60)
+
+    def test_retry_immutable_conflict(self, mock_sleep):
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB,
+            [{'text': self._immutable, 'status_code': 409},
+             {'text': 'Service Unavailable', 'status_code': 503},
+             {'json': SINGLE_LB_UPDATE, 'status_code': 200}],
+        )
+        ret = self.api.load_balancer_set(FAKE_LB, json=SINGLE_LB_UPDATE)
+        self.assertEqual(SINGLE_LB_UPDATE, ret)
+        self.assertEqual(3, self.requests_mock.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+
+    def test_no_retry_other_conflict(self, mock_sleep):
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB,
+            text='{"faultstring": "Duplicate listener"}',
+            status_code=409,
+        )
+        self.assertRaisesRegex(octavia.OctaviaClientException,
+                               'Duplicate listener',
+                               self.api.load_balancer_set,
+                               FAKE_LB, json=SINGLE_LB_UPDATE)
+        self.assertEqual(1, self.requests_mock.call_count)
+        mock_sleep.assert_not_called()
+
+    def test_retry_gives_up_at_deadline(self, mock_sleep):
+        self.api.retry_policy = retry.RetryPolicy(deadline=0)
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB,
+            text='<html>Service Unavailable</html>',
+            status_code=503,
+        )
+        self.assertRaisesRegex(octavia.OctaviaClientException,
+                               'Service Unavailable',
+                               self.api.load_balancer_set,
+                               FAKE_LB, json=SINGLE_LB_UPDATE)
+        mock_sleep.assert_not_called()
+
+    @mock.patch('oslo_utils.timeutils.now', return_value=0)
+    def test_retry_deadline_includes_first_attempt(self, mock_now,
+                                                   mock_sleep):
+        def slow(request, context):
+            # Each attempt alone outlasts the deadline
+            mock_now.return_value += 61
+            context.status_code = 503
+            return 'Service Unavailable'
+        self.requests_mock.register_uri(
+            'PUT', FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB, text=slow)
+        self.assertRaisesRegex(octavia.OctaviaClientException,
+                               'Service Unavailable',
+                               self.api.load_balancer_set,
+                               FAKE_LB, json=SINGLE_LB_UPDATE)
+        self.assertEqual(1, self.requests_mock.call_count)
+        mock_sleep.assert_not_called()
+
+
+class TestLoadBalancerIndex(TestOctaviaClient):
+
+    def setUp(self):
+        super(TestLoadBalancerIndex, self).setUp()
+        for path, key, body in (
+                ('loadbalancers', 'loadbalancers', [{'id': FAKE_LB}]),
+                ('listeners', 'listeners', []),
+                ('pools', 'pools', [{'id': FAKE_PO,
+                                     'loadbalancers': [{'id': FAKE_LB}],
+                                     'members': []}]),
+                ('l7policies', 'l7policies', []),
+                ('healthmonitors', 'healthmonitors', [])):
+            self.requests_mock.register_uri(
+                'GET', FAKE_LBAAS_URL + path, json={key: body},
+                status_code=200)
+
+    def test_find_loadbalancer_id_follows_mutations(self):
+        self.assertEqual(FAKE_LB, self.api.find_loadbalancer_id(FAKE_PO))
+
+        self.requests_mock.register_uri(
+            'POST',
+            FAKE_LBAAS_URL + 'pools/' + FAKE_PO + '/members',
+            json=SINGLE_ME_RESP,
+            status_code=200
+        )
+        self.api.member_create(FAKE_PO, json=SINGLE_ME_RESP)
+        self.assertEqual(FAKE_LB, self.api.find_loadbalancer_id(FAKE_ME))
+
+        self.requests_mock.register_uri(
+            'DELETE',
+            FAKE_LBAAS_URL + 'pools/' + FAKE_PO + '/members/' + FAKE_ME,
+            status_code=204
+        )
+        self.api.member_delete(FAKE_PO, FAKE_ME)
+        self.assertIsNone(self.api.find_loadbalancer_id(FAKE_ME))
+
+    def test_find_loadbalancer_id_pages(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'pools',
+            [{'json': {'pools': [{'id': 'po1',
+                                  'loadbalancers': [{'id': FAKE_LB}]}],
+                       'pools_links': [{'rel': 'next',
+                                        'href': 'next-page'}]}},
+             {'json': {'pools': [{'id': FAKE_PO,
+                                  'loadbalancers': [{'id': FAKE_LB}],
+                                  'members': [{'id': FAKE_ME}]}]}}],
+        )
+
+        self.assertEqual(FAKE_LB, self.api.find_loadbalancer_id(FAKE_ME))
+
+
+class TestPagination(TestOctaviaClient):
+
+    def test_iter_list(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_URL + 'octavia/amphorae',
+            [{'json': {'amphorae': [{'id': 'a1'}, {'id': 'a2'}],
+                       'amphorae_links': [{'rel': 'next',
+                                           'href': 'next-page'}]}},
+             {'json': {'amphorae': [{'id': 'a3'}],
+                       'amphorae_links': [{'rel': 'previous',
+                                           'href': 'prev-page'}]}}],
+        )
+        ret = self.api.amphora_iter(page_size=2, status='READY')
+
+        self.assertEqual(['a1', 'a2', 'a3'], [amp['id'] for amp in ret])
+        history = self.requests_mock.request_history
+        self.assertEqual(2, len(history))
+        self.assertEqual({'limit': ['2'], 'status': ['ready']},
+                         history[0].qs)
+        self.assertEqual({'limit': ['2'], 'marker': ['a2'],
+                          'status': ['ready']}, history[1].qs)
+
+    def test_iter_list_marker_key(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'quotas',
+            [{'json': {'quotas': [{'project_id': 'p1'}],
+                       'quotas_links': [{'rel': 'next',
+                                         'href': 'next-page'}]}},
+             {'json': {'quotas': [{'project_id': 'p2'}]}}],
+        )
+        ret = self.api.quota_iter(page_size=1)
+
+        self.assertEqual(['p1', 'p2'], [q['project_id'] for q in ret])
+        self.assertEqual(['p1'],
+                         self.requests_mock.request_history[1].qs['marker'])
+
+    def test_iter_list_unpaginated(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers',
+            json=LIST_LB_RESP,
+            status_code=200,
+        )
+        ret = list(self.api.load_balancer_iter())
+
+        self.assertEqual(LIST_LB_RESP['loadbalancers'], ret)
+        self.assertEqual(1, len(self.requests_mock.request_history))
+
+
+class TestResponseCache(TestOctaviaClient):
+
+    def setUp(self):
+        super(TestResponseCache, self).setUp()
+        self.api.response_cache = cache.ResponseCache(ttl=0)
+
+    def test_conditional_get(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB,
+            [{'json': SINGLE_LB_RESP, 'headers': {'ETag': '"v1"'}},
+             {'status_code': 304}],
+        )
+        lb = SINGLE_LB_RESP['loadbalancer']
+        self.assertEqual(lb, self.api.load_balancer_show(FAKE_LB))
+        self.assertEqual(lb, self.api.load_balancer_show(FAKE_LB))
+
+        history = self.requests_mock.request_history
+        self.assertEqual(2, len(history))
+        self.assertNotIn('If-None-Match', history[0].headers)
+        self.assertEqual('"v1"', history[1].headers['If-None-Match'])
+
+    def test_ttl_and_invalidation(self):
+        self.api.response_cache.ttl = 60
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers',
+            json=LIST_LB_RESP,
+        )
+        self.requests_mock.register_uri(
+            'PUT',
+            FAKE_LBAAS_URL + 'loadbalancers/' + FAKE_LB,
+            json=SINGLE_LB_UPDATE,
+        )
+        self.api.load_balancer_list()
+        self.api.load_balancer_list()
+        self.api.load_balancer_list(name='lb1')
+        self.assertEqual(2, len(self.requests_mock.request_history))
+
+        self.api.load_balancer_set(FAKE_LB, json=SINGLE_LB_UPDATE)
+        self.api.load_balancer_list()
+        self.assertEqual(4, len(self.requests_mock.request_history))
+
+
+class TestDecoder(TestOctaviaClient):
+
+    def test_list_decoder(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'pools',
+            json=LIST_PO_RESP,
+        )
+        self.api.decoder = mock.Mock(return_value=LIST_PO_RESP)
+        self.assertEqual(LIST_PO_RESP, self.api.pool_list())
+        self.api.decoder.assert_called_once_with(
+            json.dumps(LIST_PO_RESP).encode('utf-8'))
+
+    def test_iter_list_with_response_cache(self):
+        self.api.response_cache = cache.ResponseCache(ttl=60)
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers',
+            json=LIST_LB_RESP,
+        )
+        for _ in range(2):
+            self.assertEqual(LIST_LB_RESP['loadbalancers'],
+                             list(self.api.load_balancer_iter()))
+        self.assertEqual(0, len(self.api.response_cache))
+
+
+class TestCompactRecords(TestOctaviaClient):
+
+    def setUp(self):
+        super(TestCompactRecords, self).setUp()
+        self.api.compact_records = True
+
+    def test_list(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'pools',
+            json=LIST_PO_RESP,
+        )
+        ret = self.api.pool_list()
+        self.assertEqual(LIST_PO_RESP, ret)
+        self.assertIsInstance(ret['pools'][0], records.Pool)
+
+    def test_iter_list(self):
+        self.requests_mock.register_uri(
+            'GET',
+            FAKE_LBAAS_URL + 'loadbalancers',
+            json=LIST_LB_RESP,
+        )
+        ret = list(self.api.load_balancer_iter())
+        self.assertEqual(LIST_LB_RESP['loadbalancers'], ret)
+        self.assertIsInstance(ret[0], records.LoadBalancer)
+
+
+class TestChangesSince(TestOctaviaClient):
+
+    def test_changes_since(self):
+        url = FAKE_LBAAS_URL + 'pools'
+        by_updated = {'pools': [
+            {'id': 'p3', 'updated_at': '2018-01-01T00:00:03'},
+            {'id': 'p2', 'updated_at': '2018-01-01T00:00:02'},
+            {'id': 'p1', 'updated_at': '2018-01-01T00:00:01'},
+            {'id': 'p4', 'updated_at': None,
+             'created_at': '2018-01-01T00:00:04'},
+        ]}
+        by_created = {'pools': [
+            {'id': 'p4', 'updated_at': None,
+             'created_at': '2018-01-01T00:00:04'},
+            {'id': 'p2', 'updated_at': '2018-01-01T00:00:02',
+             'created_at': '2018-01-01T00:00:02'},
+            {'id': 'p3', 'updated_at': '2018-01-01T00:00:03',
+             'created_at': '2018-01-01T00:00:00'},
+        ]}
+        self.requests_mock.register_uri(
+            'GET', url + '?sort=updated_at:desc', json=by_updated)
+        self.requests_mock.register_uri(
+            'GET', url + '?sort=created_at:desc', json=by_created)
+
+        ret = list(self.api.changes_since('pools', '2018-01-01T00:00:02',
+                                          project_id='p'))
+
+        self.assertEqual(['p3', 'p2', 'p4'], [p['id'] for p in ret])
+        history = self.requests_mock.request_history
+        self.assertEqual(2, len(history))
+        self.assertEqual({'sort': ['updated_at:desc'],
+                          'limit': [str(octavia.CHANGES_PAGE_SIZE)],
+                          'project_id': ['p']}, history[0].qs)
+
+    def test_changes_since_members(self):
+        self.requests_mock.register_uri(
+            'GET', FAKE_LBAAS_URL + 'pools/' + FAKE_PO + '/members',
+            json={'members': []})
+        self.assertEqual([], list(self.api.changes_since(
+            'members', '2018-01-01T00:00:00', pool_id=FAKE_PO)))
@@ -0,0 +1,83 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Request planning Tests"""
+
+from oslo_utils import uuidutils
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import plan
+
+FAKE_LB = uuidutils.generate_uuid()
+FAKE_LB2 = uuidutils.generate_uuid()
+FAKE_PO = uuidutils.generate_uuid()
+FAKE_ME = uuidutils.generate_uuid()
+
+
+class TestUrlTemplate(utils.TestCase):
+
+    def test_url_template_loadbalancer(self):
+        template, lb_id = plan.url_template(
+            '/lbaas/loadbalancers/' + FAKE_LB + '/failover')
+        self.assertEqual('/lbaas/loadbalancers/{id}/failover', template)
+        self.assertEqual(FAKE_LB, lb_id)
+
+    def test_url_template_member(self):
+        template, lb_id = plan.url_template(
+            '//lbaas/pools/%s/members/%s?name=x' % (FAKE_PO, FAKE_ME))
+        self.assertEqual('/lbaas/pools/{id}/members/{id}', template)
+        self.assertIsNone(lb_id)
+
+    def test_url_template_collection(self):
+        template, lb_id = plan.url_template('/lbaas/quotas/defaults')
+        self.assertEqual('/lbaas/quotas/defaults', template)
+        self.assertTrue(plan.is_list_request('GET', '/lbaas/pools'))
+        self.assertFalse(plan.is_list_request('GET', '/lbaas/pools/{id}'))
+
+
+class TestRequestPlan(utils.TestCase):
+
+    def setUp(self):
+        super(TestRequestPlan, self).setUp()
+        self.plan = plan.RequestPlan(
+            resolver={FAKE_PO: FAKE_LB}.get,
+            read_latency=1, write_latency=1, settle_time=4)
+        self.plan.record('GET', '/lbaas/pools', params={'name': 'po1'})
+        self.plan.record('PUT', '/lbaas/loadbalancers/' + FAKE_LB)
+        self.plan.record('PUT', '/lbaas/loadbalancers/' + FAKE_LB2)
+        self.plan.record('POST', '/lbaas/pools/%s/members' % FAKE_PO)
+
+    def test_record_resolves_loadbalancer(self):
+        self.assertEqual('/lbaas/pools?name=po1', self.plan.requests[0].url)
+        self.assertEqual(FAKE_LB, self.plan.requests[3].loadbalancer_id)
+
+    def test_waves(self):
+        waves = self.plan.waves()
+        self.assertEqual(2, len(waves))
+        self.assertEqual([FAKE_LB, FAKE_LB2],
+                         [r.loadbalancer_id for r in waves[0]])
+        self.assertEqual('POST', waves[1][0].method)
+        self.assertEqual(1, self.plan.serialisation_points())
+
+    def test_counts_and_estimate(self):
+        self.assertEqual({'list': 1, 'GET': 0, 'POST': 1, 'PUT': 2,
+                          'DELETE': 0}, dict(self.plan.counts()))
+        self.assertEqual(11, self.plan.estimate())
+
+    def test_response_echoes_body(self):
+        response = plan.RequestPlan.response('PUT', {'pool': {'name': 'x'}})
+        self.assertEqual(202, response.status_code)
+        self.assertEqual({'pool': {'name': 'x'}}, response.json())
+        self.assertEqual(
+            204, plan.RequestPlan.response('DELETE').status_code)
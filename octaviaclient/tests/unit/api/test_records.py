@@ -0,0 +1,80 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Compact record Tests"""
+
+import json
+
+from osc_lib.tests import utils
+from osc_lib import utils as osc_utils
+
+from octaviaclient.api.v2 import records
+from octaviaclient.osc.v2 import utils as v2_utils
+
+POOL = {
+    'id': 'pool-id',
+    'name': 'web',
+    'provisioning_status': 'ACTIVE',
+    'protocol': 'HTTP',
+    'members': [{'id': 'm1'}, {'id': 'm2'}],
+    'session_persistence': None,
+    'tls_enabled': False,
+}
+
+
+class TestRecords(utils.TestCase):
+
+    def test_mapping(self):
+        pool = records.Pool(POOL)
+
+        self.assertEqual(POOL, pool)
+        self.assertEqual(POOL, pool.to_dict())
+        self.assertEqual(len(POOL), len(pool))
+        self.assertEqual(sorted(POOL), sorted(pool))
+        self.assertEqual('web', pool['name'])
+        self.assertFalse(pool['tls_enabled'])
+        self.assertIsNone(pool.get('session_persistence', 'x'))
+        self.assertNotIn('description', pool)
+        self.assertRaises(KeyError, lambda: pool['description'])
+        self.assertRaises(AttributeError, setattr, pool, 'name', 'x')
+        self.assertFalse(hasattr(pool, '__dict__'))
+
+    def test_shared_values(self):
+        first = records.Pool(json.loads(json.dumps(POOL)))
+        second = records.Pool(json.loads(json.dumps(POOL)))
+        self.assertIs(first['provisioning_status'],
+                      second['provisioning_status'])
+        self.assertIsNot(first['name'], second['name'])
+
+    def test_references(self):
+        pool = records.Pool(dict(POOL, loadbalancers=[{'id': 'lb',
+                                                       'name': 'x'}]))
+        self.assertIsInstance(pool['members'][0], records.Reference)
+        self.assertIsInstance(pool['loadbalancers'][0], dict)
+
+    def test_to_builtin(self):
+        pool = records.Pool(POOL)
+
+        self.assertIs(dict, type(pool.to_dict()['members'][0]))
+        self.assertEqual(POOL, json.loads(json.dumps(pool.to_dict())))
+        self.assertEqual({'pools': [POOL]},
+                         records.to_builtin({'pools': [pool]}))
+        self.assertEqual('web', records.to_builtin('web'))
+
+    def test_properties(self):
+        rows = records.convert('pools', [POOL])
+        columns = ('id', 'name', 'description')
+        self.assertEqual(('pool-id', 'web', ''),
+                         osc_utils.get_dict_properties(rows[0], columns))
+        self.assertEqual('m1\nm2', v2_utils.format_list(rows[0]['members']))
+        self.assertEqual([{'a': 1}], records.convert('unknown', [{'a': 1}]))
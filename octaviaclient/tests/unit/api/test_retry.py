@@ -0,0 +1,58 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Retry policy Tests"""
+
+import mock
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import retry
+
+
+class TestRetryPolicy(utils.TestCase):
+
+    def test_is_retryable(self):
+        policy = retry.RetryPolicy()
+        self.assertTrue(policy.is_retryable(503))
+        self.assertTrue(policy.is_retryable(
+            409, 'Load Balancer 123 is immutable and cannot be updated.'))
+        self.assertFalse(policy.is_retryable(409, 'Duplicate pool'))
+        self.assertFalse(policy.is_retryable(400, 'immutable'))
+
+    @mock.patch('random.uniform', side_effect=lambda low, high: high)
+    def test_delays_grow_until_max(self, mock_uniform):
+        policy = retry.RetryPolicy(deadline=1000, initial_delay=1,
+                                   max_delay=5)
+        delays = policy.delays()
+        self.assertEqual([1, 2, 4, 5, 5],
+                         [next(delays) for _ in range(5)])
+
+    @mock.patch('random.uniform', side_effect=lambda low, high: high)
+    def test_delays_stop_at_deadline(self, mock_uniform):
+        policy = retry.RetryPolicy(deadline=3, initial_delay=4,
+                                   max_delay=30)
+        self.assertEqual([], list(policy.delays()))
+
+    @mock.patch('random.uniform', side_effect=lambda low, high: high)
+    @mock.patch('oslo_utils.timeutils.now')
+    def test_delays_deadline_from_start(self, mock_now, mock_uniform):
+        mock_now.return_value = 100
+        policy = retry.RetryPolicy(deadline=10, initial_delay=4,
+                                   max_delay=30)
+        delays = policy.delays(policy.start())
+        # The first attempt took 7 seconds
+        mock_now.return_value = 107
+        self.assertEqual([], list(delays))
+        # Without a watch the deadline starts at the first delay
+        self.assertEqual([4, 8], list(policy.delays()))
@@ -0,0 +1,89 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Load balancer operation queue Tests"""
+
+import mock
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import scheduler
+
+
+@mock.patch('octaviaclient.api.v2.waiter.wait_for_active')
+class TestLoadBalancerQueue(utils.TestCase):
+
+    def setUp(self):
+        super(TestLoadBalancerQueue, self).setUp()
+        self.api = mock.Mock()
+        self.api.loadbalancer_index.get.return_value = None
+        self.api.pool_show.return_value = {
+            'id': 'pool1', 'loadbalancers': [{'id': 'lb1'}]}
+        self.api.l7policy_show.return_value = {
+            'id': 'policy1', 'listener_id': 'listener2'}
+        self.api.listener_show.return_value = {
+            'id': 'listener2', 'loadbalancers': [{'id': 'lb2'}]}
+        self.queue = scheduler.LoadBalancerQueue(self.api, max_workers=2)
+
+    def test_submit_resolves_owner(self, mock_wait):
+        self.assertEqual('lb1', self.queue.submit(
+            self.api.member_set, pool_id='pool1', member_id='m1', json={}))
+        self.assertEqual('lb2', self.queue.submit(
+            self.api.l7rule_create, l7policy_id='policy1', json={}))
+        self.assertEqual('lb3', self.queue.submit(
+            self.api.listener_create,
+            json={'listener': {'loadbalancer_id': 'lb3'}}))
+        self.assertEqual('lb1', self.queue.submit(
+            self.api.member_delete, pool_id='pool1', member_id='m2'))
+        self.api.pool_show.assert_called_once_with('pool1')
+
+    def test_submit_uses_index(self, mock_wait):
+        self.api.loadbalancer_index.get.return_value = 'lb9'
+        self.assertEqual('lb9', self.queue.submit(
+            self.api.pool_set, pool_id='pool1', json={}))
+        # An empty index is never filled to resolve an owner
+        self.api.loadbalancer_index.get.assert_called_with('pool1',
+                                                           load=False)
+        self.api.find_loadbalancer_id.assert_not_called()
+        self.api.pool_show.assert_not_called()
+
+    def test_submit_unknown_owner(self, mock_wait):
+        self.assertRaises(ValueError, self.queue.submit,
+                          self.api.quota_set, project_id='p1')
+
+    def test_run_serialises_per_loadbalancer(self, mock_wait):
+        calls = []
+        op = mock.Mock(side_effect=lambda **kw: calls.append(kw['name']))
+        self.queue.submit(op, lb_id='lb1', name='a')
+        self.queue.submit(op, lb_id='lb2', name='b')
+        self.queue.submit(op, lb_id='lb1', name='c')
+
+        results = self.queue.run()
+
+        self.assertEqual(['lb1', 'lb2', 'lb1'],
+                         [r.loadbalancer_id for r in results])
+        self.assertTrue(calls.index('a') < calls.index('c'))
+        self.assertEqual(3, mock_wait.call_count)
+        mock_wait.assert_any_call(self.api, 'lb2', self.queue.timeout,
+                                  self.queue.interval)
+
+    def test_run_skips_after_failure(self, mock_wait):
+        op = mock.Mock(side_effect=[RuntimeError('boom'), None])
+        self.queue.submit(op, lb_id='lb1')
+        self.queue.submit(op, lb_id='lb1')
+
+        first, second = self.queue.run()
+
+        self.assertIsInstance(first.error, RuntimeError)
+        self.assertIsInstance(second.error, scheduler.SkippedError)
+        self.assertEqual(1, op.call_count)
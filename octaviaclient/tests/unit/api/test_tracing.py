@@ -0,0 +1,82 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Request tracing Tests"""
+
+import datetime
+import json
+import os
+
+import fixtures
+import mock
+
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import tracing
+
+
+def _record(template, latency, tag=None, url=None, wire_bytes=10):
+    return tracing.RequestRecord('GET', url or template, template, 200, 10,
+                                 latency, 'req-1', tag, wire_bytes)
+
+
+class TestTimingCollector(utils.TestCase):
+
+    def setUp(self):
+        super(TestTimingCollector, self).setUp()
+        self.collector = tracing.TimingCollector()
+        self.collector(_record('/lbaas/pools', 0.5, 'name-resolution',
+                               wire_bytes=2))
+        self.collector(_record('/lbaas/pools', 1.5, 'name-resolution',
+                               wire_bytes=3))
+        self.collector(_record('/lbaas/loadbalancers/{id}', 3.0,
+                               url='/lbaas/loadbalancers/abc'))
+
+    def test_summary(self):
+        self.assertEqual(
+            [('-', 'GET', '/lbaas/loadbalancers/{id}', 1, 3.0, 3.0, 10, 10),
+             ('name-resolution', 'GET', '/lbaas/pools', 2, 2.0, 1.5, 20,
+              5)],
+            self.collector.summary())
+
+    def test_format_reports_other_services(self):
+        session = mock.Mock()
+        session.get_timings.return_value = [
+            mock.Mock(url='http://octavia/v2.0/lbaas/loadbalancers/abc',
+                      elapsed=datetime.timedelta(seconds=3)),
+            mock.Mock(url='http://keystone/v3/auth/tokens',
+                      elapsed=datetime.timedelta(seconds=2)),
+        ]
+        lines = self.collector.format(session, 'http://octavia/v2.0')
+        self.assertEqual('compression: 15 bytes received for 30 bytes, '
+                         'ratio 2.0', lines[-3])
+        self.assertEqual('octavia: 3 requests, 5.000s', lines[-2])
+        self.assertEqual('other services: 1 requests, 2.000s', lines[-1])
+
+
+class TestTraceFileWriter(utils.TestCase):
+
+    def test_writes_json_lines(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'trace.jsonl')
+        writer = tracing.TraceFileWriter(path)
+        writer(_record('/lbaas/pools', 0.5))
+        writer(_record('/lbaas/pools', 0.25))
+        writer.close()
+
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(2, len(lines))
+        self.assertEqual('/lbaas/pools', lines[0]['template'])
+        self.assertEqual('req-1', lines[1]['request_id'])
+        self.assertEqual(0.25, lines[1]['latency'])
@@ -0,0 +1,55 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Load balancer waiter Tests"""
+
+import mock
+
+from osc_lib import exceptions
+from osc_lib.tests import utils
+
+from octaviaclient.api.v2 import waiter
+
+
+@mock.patch('time.sleep')
+class TestWaitForActive(utils.TestCase):
+
+    def setUp(self):
+        super(TestWaitForActive, self).setUp()
+        self.api = mock.Mock()
+
+    def test_wait_for_active(self, mock_sleep):
+        self.api.load_balancer_show.side_effect = [
+            {'provisioning_status': 'PENDING_UPDATE'},
+            {'provisioning_status': 'ACTIVE'},
+        ]
+        lb = waiter.wait_for_active(self.api, 'lb1', interval=1)
+        self.assertEqual('ACTIVE', lb['provisioning_status'])
+        self.api.load_balancer_show.assert_called_with('lb1')
+        mock_sleep.assert_called_once_with(1)
+
+    def test_wait_for_active_error(self, mock_sleep):
+        self.api.load_balancer_show.return_value = {
+            'provisioning_status': 'ERROR'}
+        self.assertRaises(waiter.ProvisioningError,
+                          waiter.wait_for_active, self.api, 'lb1')
+
+    def test_wait_for_active_deleted(self, mock_sleep):
+        self.api.load_balancer_show.side_effect = exceptions.NotFound(404)
+        self.assertIsNone(waiter.wait_for_active(self.api, 'lb1'))
+
+    def test_wait_for_active_timeout(self, mock_sleep):
+        self.api.load_balancer_show.return_value = {
+            'provisioning_status': 'PENDING_UPDATE'}
+        self.assertRaises(waiter.WaitTimeout,
+                          waiter.wait_for_active, self.api, 'lb1', timeout=0)
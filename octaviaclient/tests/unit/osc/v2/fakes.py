@@ -16,6 +16,7 @@ import mock
 
 from osc_lib.tests import utils
 
+from octaviaclient.osc.v2 import utils as v2_utils
 from octaviaclient.tests import fakes
 from octaviaclient.tests.unit.osc.v2 import constants
 
@@ -32,6 +33,8 @@ class TestOctaviaClient(utils.TestCommand):
 
     def setUp(self):
         super(TestOctaviaClient, self).setUp()
+        self.addCleanup(v2_utils._project_caches.clear)
+        self.addCleanup(v2_utils._network_caches.clear)
         self.app.client_manager.load_balancer = FakeOctaviaClient(
             endpoint=fakes.AUTH_URL,
             token=fakes.AUTH_TOKEN,
@@ -14,6 +14,7 @@
 import copy
 import mock
 
+from osc_lib import exceptions
 import osc_lib.tests.utils as osc_test_utils
 
 from octaviaclient.osc.v2 import amphora
@@ -114,3 +115,126 @@ class TestAmphoraShow(TestAmphora):
         rows, data = self.cmd.take_action(parsed_args)
         self.assertEqual(self.rows, rows)
         self.api_mock.amphora_show.assert_called_with(amphora_id=self._amp.id)
+
+
+class TestAmphoraSummary(TestAmphora):
+
+    def setUp(self):
+        super(TestAmphoraSummary, self).setUp()
+        self.api_mock.amphora_iter.return_value = iter([
+            {'loadbalancer_id': 'lb1', 'status': 'ALLOCATED',
+             'role': 'MASTER', 'image_id': 'img1'},
+            {'loadbalancer_id': 'lb1', 'status': 'ALLOCATED',
+             'role': 'BACKUP', 'image_id': 'img1'},
+            {'loadbalancer_id': 'lb2', 'status': 'ERROR',
+             'role': 'MASTER', 'image_id': 'img2'},
+            {'loadbalancer_id': 'lb3', 'status': 'ALLOCATED',
+             'role': 'STANDALONE', 'image_id': 'img1'},
+            {'loadbalancer_id': None, 'status': 'READY',
+             'role': None, 'image_id': 'img2'},
+            {'loadbalancer_id': 'lb3', 'status': 'DELETED',
+             'role': 'STANDALONE', 'image_id': 'img0'},
+        ])
+        self.api_mock.load_balancer_iter.return_value = iter([
+            {'id': 'lb1', 'provider': 'amphora',
+             'provisioning_status': 'ACTIVE'},
+            {'id': 'lb2', 'provider': 'amphora',
+             'provisioning_status': 'ACTIVE'},
+            {'id': 'lb3', 'provider': 'amphora',
+             'provisioning_status': 'ACTIVE'},
+            {'id': 'lb4', 'provider': 'amphora',
+             'provisioning_status': 'ACTIVE'},
+            {'id': 'lb5', 'provider': 'ovn',
+             'provisioning_status': 'ACTIVE'},
+        ])
+        self.cmd = amphora.SummaryAmphora(self.app, None)
+
+    def test_amphora_summary(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.AMPHORA_SUMMARY_COLUMNS, columns)
+        self.assertEqual((
+            ('total', 'amphorae', 6),
+            ('status', 'ALLOCATED', 3),
+            ('status', 'DELETED', 1),
+            ('status', 'ERROR', 1),
+            ('status', 'READY', 1),
+            ('role', 'BACKUP', 1),
+            ('role', 'MASTER', 2),
+            ('role', None, 1),
+            ('role', 'STANDALONE', 1),
+            ('image', 'img1', 3),
+            ('image', 'img2', 2),
+            ('loadbalancer', 'lb2', 'missing BACKUP, 1 ERROR amphora(e)'),
+            ('loadbalancer', 'lb4', 'no amphora'),
+        ), tuple(data))
+        self.api_mock.amphora_iter.assert_called_with()
+        self.api_mock.amphora_list.assert_not_called()
+
+    def test_amphora_summary_page_size(self):
+        arglist = ['--page-size', '500']
+        verify_list = [('page_size', 500)]
+        parsed_args = self.check_parser(self.cmd, arglist, verify_list)
+        list(self.cmd.take_action(parsed_args)[1])
+
+        self.api_mock.amphora_iter.assert_called_with(page_size=500)
+        self.api_mock.load_balancer_iter.assert_called_with(page_size=500)
+
+
+@mock.patch('octaviaclient.api.v2.amphora_index.AmphoraIndex')
+class TestAmphoraListCached(TestAmphora):
+
+    def setUp(self):
+        super(TestAmphoraListCached, self).setUp()
+        self.api_mock.endpoint = 'http://example.com/load-balancer'
+        self.amphorae = {
+            'amp1': {'id': 'amp1', 'loadbalancer_id': 'lb1',
+                     'compute_id': 'vm1', 'role': 'MASTER',
+                     'status': 'ALLOCATED'},
+            'amp2': {'id': 'amp2', 'loadbalancer_id': 'lb1',
+                     'compute_id': 'vm2', 'role': 'BACKUP',
+                     'status': 'ALLOCATED'},
+        }
+        self.cmd = amphora.ListAmphora(self.app, None)
+
+    def _index(self, mock_index):
+        index = mock_index.return_value
+        index.amphorae = self.amphorae
+        index.by_compute_id.side_effect = lambda c: {
+            'vm1': self.amphorae['amp1']}.get(c)
+        index.by_loadbalancer.return_value = list(self.amphorae.values())
+        index.find_loadbalancer_ids.side_effect = lambda lb: {
+            'web': ['lb1'], 'dup': ['lb2', 'lb3']}.get(lb, [])
+        return index
+
+    def test_amphora_list_cached(self, mock_index):
+        index = self._index(mock_index)
+        arglist = ['--cached', '--loadbalancer', 'web', '--role', 'backup']
+        verify_list = [('cached', True), ('loadbalancer', 'web'),
+                       ('role', 'BACKUP')]
+        parsed_args = self.check_parser(self.cmd, arglist, verify_list)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['amp2'], [row[0] for row in data])
+        index.refresh.assert_called_once_with()
+        index.by_loadbalancer.assert_called_with('lb1')
+        self.api_mock.amphora_list.assert_not_called()
+        self.api_mock.load_balancer_list.assert_not_called()
+
+    def test_amphora_list_cached_compute_id(self, mock_index):
+        self._index(mock_index)
+        arglist = ['--cached', '--compute-id', 'vm1']
+        verify_list = [('cached', True), ('compute_id', 'vm1')]
+        parsed_args = self.check_parser(self.cmd, arglist, verify_list)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['amp1'], [row[0] for row in data])
+
+    def test_amphora_list_cached_ambiguous(self, mock_index):
+        self._index(mock_index)
+        arglist = ['--cached', '--loadbalancer', 'dup']
+        verify_list = [('cached', True), ('loadbalancer', 'dup')]
+        parsed_args = self.check_parser(self.cmd, arglist, verify_list)
+        self.assertRaises(exceptions.CommandError,
+                          self.cmd.take_action, parsed_args)
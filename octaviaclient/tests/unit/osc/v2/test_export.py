@@ -0,0 +1,98 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+import os
+
+import fixtures
+import mock
+from osc_lib import exceptions
+from osc_lib.tests import utils
+import testtools
+
+from octaviaclient.api.v2 import records
+from octaviaclient.osc.v2 import constants
+from octaviaclient.osc.v2 import export
+from octaviaclient.tests.unit.osc.v2 import constants as attr_consts
+
+
+def _pools(count):
+    for i in range(count):
+        yield dict(attr_consts.POOL_ATTRS, name='pool-%d' % i,
+                   provisioning_status='ACTIVE' if i % 3 else 'ERROR')
+
+
+class TestExport(utils.TestCase):
+
+    def test_iter_batches(self):
+        batches = list(export.iter_batches(
+            _pools(5), ('name', 'members', 'admin_state_up', 'protocol_port',
+                        'session_persistence'), batch_size=2))
+
+        self.assertEqual([2, 2, 1], [len(b['name']) for b in batches])
+        self.assertEqual(['pool-0', 'pool-1'], batches[0]['name'])
+        self.assertEqual(attr_consts.POOL_ATTRS['members'][0]['id'],
+                         batches[0]['members'][0])
+        self.assertEqual([True], batches[2]['admin_state_up'])
+        self.assertEqual([None], batches[2]['protocol_port'])
+
+        batch = next(export.iter_batches(
+            [{'protocol_port': '80', 'session_persistence': {
+                'type': 'HTTP_COOKIE', 'cookie_name': None}}],
+            ('protocol_port', 'session_persistence')))
+        self.assertEqual([80], batch['protocol_port'])
+        self.assertEqual(['{"cookie_name": null, "type": "HTTP_COOKIE"}'],
+                         batch['session_persistence'])
+
+    def test_iter_batches_records(self):
+        pools = records.convert('pools', [dict(
+            attr_consts.POOL_ATTRS, members=[{'id': 'm1'}, {'id': 'm2'}],
+            session_persistence={'type': 'SOURCE_IP'})])
+
+        batch = next(export.iter_batches(pools, ('members',
+                                                 'session_persistence')))
+
+        self.assertEqual(['m1\nm2'], batch['members'])
+        self.assertEqual(['{"type": "SOURCE_IP"}'],
+                         batch['session_persistence'])
+
+    def test_iter_batches_streams(self):
+        pools = _pools(10)
+        batches = export.iter_batches(pools, ('name',), batch_size=4)
+        next(batches)
+        # Only the first batch was read
+        self.assertEqual('pool-4', next(pools)['name'])
+
+    @mock.patch.object(export, 'pyarrow', None)
+    def test_write_parquet_requires_pyarrow(self):
+        self.assertRaises(exceptions.CommandError, export.write_parquet,
+                          'pools.parquet', _pools(1), ('name',))
+
+    @testtools.skipIf(export.pyarrow is None, 'pyarrow is not installed')
+    def test_write_parquet(self):
+        from pyarrow import parquet
+
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'pools.parquet')
+        columns, data = export.export(path, _pools(25), constants.POOL_ROWS)
+
+        self.assertEqual(export.EXPORT_COLUMNS, columns)
+        self.assertEqual([(path, 25)], data)
+        table = parquet.read_table(path)
+        self.assertEqual(list(constants.POOL_ROWS), table.column_names)
+        self.assertEqual(25, table.num_rows)
+        status = table.column('provisioning_status')
+        self.assertEqual('dictionary', str(status.type).split('<')[0])
+        self.assertEqual(['ERROR', 'ACTIVE', 'ACTIVE'],
+                         status.to_pylist()[:3])
+        self.assertEqual([True] * 25,
+                         table.column('admin_state_up').to_pylist())
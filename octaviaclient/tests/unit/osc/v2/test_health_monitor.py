@@ -14,8 +14,11 @@
 import copy
 import mock
 
+from keystoneauth1 import session
 from osc_lib import exceptions
+from requests_mock.contrib import fixture
 
+from octaviaclient.api.v2 import octavia
 from octaviaclient.osc.v2 import constants
 from octaviaclient.osc.v2 import health_monitor
 from octaviaclient.tests.unit.osc.v2 import constants as attr_consts
@@ -167,3 +170,96 @@ class TestHealthMonitorSet(TestHealthMonitor):
         self.cmd.take_action(parsed_args)
         self.api_mock.health_monitor_set.assert_called_with(
             self._hm.id, json={'healthmonitor': {'name': 'new_name'}})
+
+
+class TestHealthMonitorAudit(TestHealthMonitor):
+
+    def setUp(self):
+        super(TestHealthMonitorAudit, self).setUp()
+        self.pools = [
+            {'id': 'pool1', 'healthmonitor_id': None, 'members': []},
+            {'id': 'pool2', 'healthmonitor_id': 'hm2',
+             'members': [{'id': 'm1'}, {'id': 'm2'}, {'id': 'm3'}]},
+            {'id': 'pool3', 'healthmonitor_id': 'hm3',
+             'members': [{'id': 'm4'}]},
+            {'id': 'pool4', 'healthmonitor_id': 'hm4',
+             'members': [{'id': 'm5'}]},
+        ]
+        self.monitors = [
+            {'id': 'hm2', 'delay': 5, 'timeout': 5},
+            {'id': 'hm3', 'delay': 10, 'timeout': 3},
+            {'id': 'hm4', 'delay': 10, 'timeout': 3},
+        ]
+        self.api_mock.pool_iter.side_effect = lambda: iter(self.pools)
+        self.api_mock.health_monitor_iter.side_effect = (
+            lambda: iter(self.monitors))
+        members = {
+            'pool2': [
+                {'operating_status': 'ERROR', 'admin_state_up': True},
+                {'operating_status': 'ONLINE', 'admin_state_up': True},
+                {'operating_status': 'OFFLINE', 'admin_state_up': False}],
+            'pool3': [
+                {'operating_status': 'ONLINE', 'admin_state_up': True}],
+        }
+
+        def member_iter(pool_id):
+            if pool_id == 'pool4':
+                raise exceptions.NotFound(404, 'Pool gone')
+            return iter(members[pool_id])
+
+        self.api_mock.member_iter.side_effect = member_iter
+        self.cmd = health_monitor.AuditHealthMonitor(self.app, None)
+
+    def test_health_monitor_audit(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.MONITOR_AUDIT_COLUMNS, columns)
+        self.assertEqual((
+            ('pool1', None, 'no health monitor'),
+            ('pool2', 'hm2', 'timeout 5 is 100% of delay 5'),
+            ('pool4', 'hm4', 'unable to list members: Pool gone (HTTP 404)'),
+        ), tuple(data))
+        self.assertEqual(3, self.api_mock.member_iter.call_count)
+
+    def test_health_monitor_audit_thresholds(self):
+        arglist = ['--max-timeout-ratio', '0.3', '--down-threshold', '40']
+        verifylist = [('max_timeout_ratio', 0.3), ('down_threshold', 40)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([
+            ('pool2', 'hm2', '1 of 2 enabled members down'),
+            ('pool2', 'hm2', 'timeout 5 is 100% of delay 5'),
+            ('pool3', 'hm3', 'timeout 3 is 30% of delay 10'),
+        ], [row for row in data if row[0] != 'pool1' and row[0] != 'pool4'])
+
+    def test_health_monitor_audit_pages(self):
+        url = 'http://example.com/v2.0/lbaas/'
+        requests_mock = self.useFixture(fixture.Fixture())
+        requests_mock.register_uri('GET', url + 'pools', [
+            {'json': {'pools': self.pools[:2],
+                      'pools_links': [{'rel': 'next', 'href': 'next-page'}]}},
+            {'json': {'pools': self.pools[2:], 'pools_links': []}}])
+        requests_mock.register_uri('GET', url + 'healthmonitors', json={
+            'healthmonitors': self.monitors, 'healthmonitors_links': []})
+        for pool_id, members in (('pool2', []), ('pool3', []),
+                                 ('pool4', [{'operating_status': 'ERROR'}])):
+            requests_mock.register_uri(
+                'GET', url + 'pools/%s/members' % pool_id,
+                json={'members': members, 'members_links': []})
+        self.app.client_manager.load_balancer = octavia.OctaviaAPI(
+            session=session.Session(), endpoint='http://example.com')
+
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # The pools of the second page are audited too
+        self.assertEqual((
+            ('pool1', None, 'no health monitor'),
+            ('pool2', 'hm2', 'timeout 5 is 100% of delay 5'),
+            ('pool4', 'hm4', '1 of 1 enabled members down'),
+        ), tuple(data))
+        pool_requests = [r for r in requests_mock.request_history
+                         if r.path.endswith('/pools')]
+        self.assertEqual(['pool2'], pool_requests[1].qs['marker'])
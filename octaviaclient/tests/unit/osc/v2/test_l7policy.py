@@ -12,6 +12,10 @@
 #
 
 import copy
+import json
+import os
+
+import fixtures
 import mock
 
 from osc_lib import exceptions
@@ -171,3 +175,177 @@ class TestL7PolicySet(TestL7Policy):
         self.cmd.take_action(parsed_args)
         self.api_mock.l7policy_set.assert_called_with(
             self._l7po.id, json={'l7policy': {'name': 'new_name'}})
+
+
+class TestL7PolicySync(TestL7Policy):
+
+    def setUp(self):
+        super(TestL7PolicySync, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'policies.yaml')
+        self.api_mock.listener_list.return_value = {
+            'listeners': [{'id': 'listener_id', 'name': 'web'}]}
+        self.api_mock.listener_show.return_value = {
+            'id': 'listener_id', 'loadbalancers': [{'id': 'lb_id'}]}
+        self.api_mock.pool_list.return_value = {
+            'pools': [{'id': 'pool_id', 'name': 'api'}]}
+        self.api_mock.l7policy_list.return_value = {'l7policies': [
+            {'id': 'id-a', 'name': 'a', 'position': 1, 'action': 'REJECT',
+             'rules': [{'id': 'r1'}]},
+            {'id': 'id-b', 'name': 'b', 'position': 2, 'action': 'REJECT',
+             'rules': []},
+        ]}
+        self.api_mock.l7rule_list.return_value = {'rules': [
+            {'id': 'r1', 'type': 'PATH', 'compare_type': 'EQUAL_TO',
+             'value': '/', 'invert': False, 'admin_state_up': True}]}
+        self.cmd = l7policy.SyncL7Policy(self.app, None)
+
+    def _write(self, content):
+        with open(self.path, 'w') as f:
+            f.write(content)
+
+    @mock.patch('octaviaclient.api.v2.waiter.wait_for_active')
+    def test_l7policy_sync(self, mock_wait):
+        self._write('- name: b\n'
+                    '  action: REDIRECT_TO_POOL\n'
+                    '  redirect_pool: api\n'
+                    '- name: a\n'
+                    '  action: REJECT\n'
+                    '  rules: []\n')
+        arglist = ['web', self.path]
+        verifylist = [('listener', 'web'), ('file', self.path)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.L7POLICY_SYNC_COLUMNS, columns)
+        self.assertEqual((
+            ('b', 'l7policy_set', 'move to position 1, set action, '
+                                  'set redirect_pool_id'),
+            ('a', 'l7rule_delete', 'delete rule r1'),
+        ), tuple(data))
+        self.api_mock.l7policy_list.assert_called_with(
+            listener_id='listener_id')
+        self.api_mock.l7rule_list.assert_called_once_with('id-a')
+        self.api_mock.pool_list.assert_called_once_with(
+            loadbalancer_id='lb_id')
+        self.api_mock.l7policy_set.assert_called_once_with(
+            l7policy_id='id-b', json={'l7policy': {
+                'position': 1, 'action': 'REDIRECT_TO_POOL',
+                'redirect_pool_id': 'pool_id'}})
+        self.api_mock.l7rule_delete.assert_called_once_with(
+            l7rule_id='r1', l7policy_id='id-a')
+        self.assertEqual(2, mock_wait.call_count)
+
+    @mock.patch('octaviaclient.api.v2.waiter.wait_for_active')
+    def test_l7policy_sync_dry_run(self, mock_wait):
+        self.api_mock.planning = mock.MagicMock()
+        self._write('- name: b\n- name: a\n')
+        arglist = ['web', self.path, '--dry-run']
+        verifylist = [('dry_run', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+
+        self.api_mock.planning.assert_called_once_with()
+        mock_wait.assert_not_called()
+
+    def test_l7policy_sync_invalid_file(self):
+        self._write('name: a\n')
+        parsed_args = self.check_parser(self.cmd, ['web', self.path], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+    def test_l7policy_sync_unknown_pool(self):
+        self._write('- name: a\n  redirect_pool: unknown\n')
+        parsed_args = self.check_parser(self.cmd, ['web', self.path], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+
+class TestL7PolicyEvaluate(TestL7Policy):
+
+    def setUp(self):
+        super(TestL7PolicyEvaluate, self).setUp()
+        self.tmp = self.useFixture(fixtures.TempDir()).path
+        self.requests = os.path.join(self.tmp, 'requests.txt')
+        with open(self.requests, 'w') as f:
+            f.write('# sample\n'
+                    'www.example.com /api/users\n'
+                    '{"host": "www.example.com", "path": "/"}\n'
+                    'www.example.com\n')
+        self.api_mock.listener_list.return_value = {
+            'listeners': [{'id': 'listener_id', 'name': 'web'}]}
+        self.api_mock.listener_show.return_value = {
+            'id': 'listener_id', 'default_pool_id': 'default'}
+        self.api_mock.l7policy_list.return_value = {'l7policies': [
+            {'id': 'id-a', 'name': 'api', 'position': 1,
+             'action': 'REDIRECT_TO_POOL', 'redirect_pool_id': 'api-pool',
+             'rules': [{'id': 'r1'}]}]}
+        self.api_mock.l7rule_list.return_value = {'rules': [
+            {'id': 'r1', 'type': 'PATH', 'compare_type': 'STARTS_WITH',
+             'value': '/api'}]}
+        self.cmd = l7policy.EvaluateL7Policy(self.app, None)
+
+    def test_l7policy_evaluate(self):
+        arglist = ['web', self.requests]
+        verifylist = [('listener', 'web'), ('requests', self.requests)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.L7POLICY_EVALUATE_COLUMNS, columns)
+        self.assertEqual([
+            ('www.example.com', '/api/users', 'api', 'REDIRECT_TO_POOL',
+             'api-pool'),
+            ('www.example.com', '/', None, 'DEFAULT_POOL', 'default'),
+            ('www.example.com', '/', None, 'DEFAULT_POOL', 'default'),
+        ], list(data))
+        self.api_mock.l7rule_list.assert_called_once_with('id-a')
+
+    def test_l7policy_evaluate_summary_table(self):
+        table = os.path.join(self.tmp, 'table.json')
+        arglist = ['web', self.requests, '--summary', '--table', table]
+        verifylist = [('summary', True), ('table', table)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.L7POLICY_EVALUATE_SUMMARY_COLUMNS,
+                         columns)
+        self.assertEqual([(None, 'DEFAULT_POOL', 'default', 2),
+                          ('api', 'REDIRECT_TO_POOL', 'api-pool', 1)],
+                         list(data))
+        with open(table) as f:
+            self.assertEqual('default', json.load(f)['default_pool_id'])
+
+        # The saved table is used instead of the API
+        self.api_mock.reset_mock()
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertEqual(3, sum(row[3] for row in data))
+        self.api_mock.l7policy_list.assert_not_called()
+
+    def test_l7policy_evaluate_invalid_request(self):
+        with open(self.requests, 'w') as f:
+            f.write('{"host": \n')
+        parsed_args = self.check_parser(self.cmd, ['web', self.requests], [])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertRaises(exceptions.CommandError, list, data)
+
+    def test_l7policy_evaluate_unreadable_files(self):
+        missing = os.path.join(self.tmp, 'missing.txt')
+        parsed_args = self.check_parser(self.cmd, ['web', missing], [])
+        self.assertRaisesRegex(exceptions.CommandError, 'Unable to read',
+                               self.cmd.take_action, parsed_args)
+
+        with open(self.requests, 'wb') as f:
+            f.write(b'www.example.com /\xff\n')
+        parsed_args = self.check_parser(self.cmd, ['web', self.requests], [])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertRaisesRegex(exceptions.CommandError, 'Unable to read',
+                               list, data)
+
+        table = os.path.join(self.tmp, 'table.json')
+        for content in ('not json', '[]'):
+            with open(table, 'w') as f:
+                f.write(content)
+            parsed_args = self.check_parser(
+                self.cmd, ['web', self.requests, '--table', table], [])
+            self.assertRaises(exceptions.CommandError,
+                              self.cmd.take_action, parsed_args)
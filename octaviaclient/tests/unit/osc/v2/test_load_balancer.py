@@ -15,11 +15,17 @@ import copy
 import itertools
 import mock
 
+import fixtures
+
 from osc_lib import exceptions
 from oslo_utils import uuidutils
 
+from octaviaclient.api.v2 import address_index
+from octaviaclient.api.v2 import failover
+from octaviaclient.api.v2 import fanout
 from octaviaclient.osc.v2 import constants
 from octaviaclient.osc.v2 import load_balancer
+from octaviaclient.osc.v2 import utils as v2_utils
 from octaviaclient.tests.unit.osc.v2 import constants as attr_consts
 from octaviaclient.tests.unit.osc.v2 import fakes
 
@@ -72,6 +78,54 @@ class TestLoadBalancerList(TestLoadBalancer):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
 
+    @mock.patch('octaviaclient.api.v2.fanout.FanoutClient.from_catalog')
+    def test_load_balancer_list_all_regions(self, mock_from_catalog):
+        self.app.client_manager.interface = 'public'
+        one = mock.Mock()
+        one.load_balancer_iter.return_value = iter(
+            [attr_consts.LOADBALANCER_ATTRS])
+        two = mock.Mock()
+        two.load_balancer_iter.side_effect = exceptions.NotFound(404)
+        mock_from_catalog.return_value = fanout.FanoutClient(
+            [('RegionOne', one), ('RegionTwo', two)])
+        arglist = ['--all-regions', '--region', 'RegionOne',
+                   '--region', 'RegionTwo', '--name', 'rainbarrel']
+        verifylist = [('all_regions', True),
+                      ('regions', ['RegionOne', 'RegionTwo'])]
+
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.LOAD_BALANCER_REGION_COLUMNS, columns)
+        self.assertEqual((('RegionOne',) + self.datalist[0],), tuple(data))
+        self.assertEqual(['RegionOne', 'RegionTwo'],
+                         mock_from_catalog.call_args[1]['regions'])
+        one.load_balancer_iter.assert_called_with(name='rainbarrel')
+        one.load_balancer_list.assert_not_called()
+        self.api_mock.load_balancer_list.assert_not_called()
+
+    def test_load_balancer_list_region_without_all_regions(self):
+        parsed_args = self.check_parser(self.cmd, ['--region', 'RegionOne'],
+                                        [('regions', ['RegionOne'])])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.api_mock.load_balancer_list.assert_not_called()
+
+    @mock.patch('octaviaclient.api.v2.fanout.FanoutClient.from_catalog')
+    def test_load_balancer_list_all_regions_failed(self, mock_from_catalog):
+        self.app.client_manager.interface = 'public'
+        one = mock.Mock()
+        one.load_balancer_iter.side_effect = exceptions.NotFound(404)
+        mock_from_catalog.return_value = fanout.FanoutClient(
+            [('RegionOne', one)])
+        parsed_args = self.check_parser(self.cmd, ['--all-regions'], [])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertRaises(exceptions.CommandError, tuple, data)
+
+        mock_from_catalog.return_value = fanout.FanoutClient([])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
 
 class TestLoadBalancerDelete(TestLoadBalancer):
 
@@ -187,6 +241,52 @@ class TestLoadBalancerCreate(TestLoadBalancer):
                         self.fail("%s raised unexpectedly" % e)
 
 
+class TestNetworkResolution(TestLoadBalancer):
+
+    def test_port_by_name(self):
+        neutron = self.app.client_manager.neutronclient
+        port_id = uuidutils.generate_uuid()
+        neutron.list_ports.return_value = {'ports': [{'id': port_id}]}
+        for _ in range(2):
+            self.assertEqual(port_id, v2_utils.get_resource_id(
+                neutron.list_ports, 'ports', 'vip-port'))
+            self.assertEqual(port_id, v2_utils.get_resource_id(
+                neutron.list_ports, 'ports', port_id))
+        neutron.list_ports.assert_called_once_with(name='vip-port')
+
+    def test_subnet_by_id(self):
+        neutron = self.app.client_manager.neutronclient
+        subnet_id = uuidutils.generate_uuid()
+        neutron.list_subnets.return_value = {'subnets': [{'id': subnet_id}]}
+        self.assertEqual(subnet_id, v2_utils.get_resource_id(
+            neutron.list_subnets, 'subnets', subnet_id))
+        neutron.list_subnets.assert_called_once_with(id=subnet_id)
+
+    def test_cache_per_project(self):
+        neutron = mock.Mock()
+        neutron.httpclient.region_name = 'RegionOne'
+        neutron.httpclient.session.auth.auth_url = 'http://keystone/v3'
+        neutron.httpclient.session.get_project_id.return_value = 'p1'
+        first = v2_utils.network_cache(neutron)
+        first.set('networks:private', 'net1')
+
+        self.assertIs(first, v2_utils.network_cache(neutron))
+        neutron.httpclient.session.get_project_id.return_value = 'p2'
+        second = v2_utils.network_cache(neutron)
+        self.assertIsNot(first, second)
+        self.assertIsNone(second.get('networks:private'))
+
+    def test_network_not_found_or_duplicate(self):
+        neutron = self.app.client_manager.neutronclient
+        neutron.list_networks.return_value = {'networks': []}
+        self.assertRaises(exceptions.CommandError, v2_utils.get_resource_id,
+                          neutron.list_networks, 'networks', 'missing')
+        neutron.list_networks.return_value = {
+            'networks': [{'id': 'net1'}, {'id': 'net2'}]}
+        self.assertRaises(exceptions.CommandError, v2_utils.get_resource_id,
+                          neutron.list_networks, 'networks', 'dup')
+
+
 class TestLoadBalancerShow(TestLoadBalancer):
 
     def setUp(self):
@@ -300,3 +400,155 @@ class TestLoadBalancerFailover(TestLoadBalancer):
         self.cmd.take_action(parsed_args)
         self.api_mock.load_balancer_failover.assert_called_with(
             lb_id=self._lb.id)
+
+    def test_load_balancer_failover_dry_run(self):
+        self.api_mock.planning = mock.MagicMock()
+        plan = self.api_mock.planning.return_value.__enter__.return_value
+        plan.format.return_value = ['wave 1:']
+        arglist = [self._lb.id, '--dry-run']
+        verifylist = [
+            ('loadbalancer', self._lb.id),
+            ('dry_run', True),
+        ]
+
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+        self.api_mock.planning.assert_called_with()
+        self.api_mock.load_balancer_failover.assert_called_with(
+            lb_id=self._lb.id)
+        self.assertIn('wave 1:', self.fake_stdout.make_string())
+
+
+class TestLoadBalancerBulkFailover(TestLoadBalancer):
+
+    def setUp(self):
+        super(TestLoadBalancerBulkFailover, self).setUp()
+        self.cmd = load_balancer.BulkFailoverLoadBalancer(self.app, None)
+
+    @mock.patch('octaviaclient.api.v2.failover.FailoverOrchestrator')
+    @mock.patch('octaviaclient.api.v2.failover.select_loadbalancers')
+    def test_load_balancer_bulk_failover(self, mock_select, mock_orch):
+        mock_select.return_value = ['lb1', 'lb2']
+        mock_orch.return_value.run.return_value = [
+            failover.FailoverResult('lb1', failover.COMPLETED, None),
+            failover.FailoverResult('lb2', failover.FAILED,
+                                    ValueError('boom')),
+        ]
+        server = mock.Mock(id='vm1')
+        self.app.client_manager.compute = mock.Mock()
+        self.app.client_manager.compute.servers.list.return_value = [server]
+        arglist = ['--image', 'img1', '--compute-host', 'host1',
+                   '--provisioning-status', 'active', '--rate', '30',
+                   '--max-error-rate', '20']
+        verifylist = [('image', 'img1'), ('compute_host', 'host1'),
+                      ('provisioning_status', 'ACTIVE'), ('rate', 30),
+                      ('max_error_rate', 20)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.LOAD_BALANCER_BULK_FAILOVER_COLUMNS,
+                         columns)
+        self.assertEqual((('lb1', 'COMPLETED', None),
+                          ('lb2', 'FAILED', 'boom')), tuple(data))
+        self.app.client_manager.compute.servers.list.assert_called_with(
+            search_opts={'host': 'host1', 'all_tenants': True})
+        mock_select.assert_called_with(
+            self.api_mock, project_id=None, provisioning_status='ACTIVE',
+            image_id='img1', compute_ids=['vm1'])
+        mock_orch.assert_called_with(
+            self.api_mock, max_workers=4, rate=0.5, max_error_rate=0.2,
+            timeout=600, wait=True)
+        mock_orch.return_value.run.assert_called_with(['lb1', 'lb2'])
+
+
+class TestLoadBalancerFind(TestLoadBalancer):
+
+    def setUp(self):
+        super(TestLoadBalancerFind, self).setUp()
+        self.cmd = load_balancer.FindLoadBalancer(self.app, None)
+
+    @mock.patch('octaviaclient.api.v2.address_index.AddressIndex.from_api')
+    def test_load_balancer_find(self, mock_from_api):
+        index = address_index.AddressIndex(
+            [{'id': 'lb1', 'name': 'web', 'vip_address': '10.0.0.1'}],
+            [{'id': 'pool1', 'name': 'web-pool',
+              'loadbalancers': [{'id': 'lb1'}]}],
+            [('pool1', {'id': 'm1', 'address': '10.1.2.3',
+                        'protocol_port': 80})])
+        index.errors = {'pool2': ValueError('boom')}
+        mock_from_api.return_value = index
+        arglist = ['--member-address', '10.1.2.3', '--vip-address',
+                   '10.0.0.1', '--max-workers', '16']
+        verifylist = [('member_addresses', ['10.1.2.3']),
+                      ('vip_addresses', ['10.0.0.1']),
+                      ('max_workers', 16)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.LOAD_BALANCER_FIND_COLUMNS, columns)
+        self.assertEqual(
+            (('10.0.0.1', 'vip', 'lb1', 'web', None, None, None, None),
+             ('10.1.2.3', 'member', 'lb1', 'web', 'pool1', 'web-pool', 'm1',
+              80)),
+            tuple(data))
+        mock_from_api.assert_called_with(self.api_mock, ['10.1.2.3'],
+                                         max_workers=16)
+
+    def test_load_balancer_find_no_address(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+
+class TestLoadBalancerMirror(TestLoadBalancer):
+
+    def setUp(self):
+        super(TestLoadBalancerMirror, self).setUp()
+        patcher = mock.patch('appdirs.user_cache_dir')
+        patcher.start().return_value = self.useFixture(
+            fixtures.TempDir()).path
+        self.addCleanup(patcher.stop)
+        self.api_mock.endpoint = 'http://example.com/load-balancer'
+        collections = {'loadbalancers': [self.lb_info]}
+        self.api_mock.iter_list.side_effect = (
+            lambda path, resource: iter(collections.get(resource, [])))
+        self.cmd = load_balancer.RefreshLoadBalancerMirror(self.app, None)
+
+    def test_load_balancer_mirror_refresh(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['--full', '--max-workers', '2'],
+            [('full', True), ('max_workers', 2)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(constants.MIRROR_REFRESH_COLUMNS, columns)
+        self.assertIn(('loadbalancers', 1, 1), tuple(data))
+
+    def test_load_balancer_from_mirror(self):
+        list_cmd = load_balancer.ListLoadBalancer(self.app, None)
+        show_cmd = load_balancer.ShowLoadBalancer(self.app, None)
+        parsed_args = self.check_parser(list_cmd, ['--from-mirror'],
+                                        [('from_mirror', True)])
+        self.assertRaises(exceptions.CommandError, list_cmd.take_action,
+                          parsed_args)
+
+        self.cmd.take_action(self.check_parser(self.cmd, [], []))
+
+        columns, data = list_cmd.take_action(parsed_args)
+        self.assertEqual((tuple(self.lb_info[k] for k in self.columns),),
+                         tuple(data))
+        parsed_args = self.check_parser(
+            list_cmd, ['--from-mirror', '--name', 'unknown'], [])
+        columns, data = list_cmd.take_action(parsed_args)
+        self.assertEqual((), tuple(data))
+
+        parsed_args = self.check_parser(
+            show_cmd, ['--from-mirror', self.lb_info['name']], [])
+        with mock.patch('osc_lib.utils.get_dict_properties') as mock_props:
+            show_cmd.take_action(parsed_args)
+        self.assertEqual(self.lb_info, mock_props.call_args[0][0])
+        parsed_args = self.check_parser(
+            show_cmd, ['--from-mirror', 'unknown'], [])
+        self.assertRaises(exceptions.CommandError, show_cmd.take_action,
+                          parsed_args)
+        self.api_mock.load_balancer_list.assert_not_called()
+        self.api_mock.load_balancer_show.assert_not_called()
@@ -74,6 +74,59 @@ class TestListMember(TestMember):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
 
+    @mock.patch('time.sleep')
+    @mock.patch('octaviaclient.osc.v2.utils.get_member_attrs')
+    def test_member_list_watch(self, mock_attrs, mock_sleep):
+        mock_attrs.return_value = {'pool_id': 'pool_id'}
+        self.app.stdout.flush = mock.Mock()
+        m1 = {'id': 'm1', 'name': 'web1', 'address': '10.0.0.1',
+              'protocol_port': 80, 'operating_status': 'ONLINE',
+              'provisioning_status': 'ACTIVE'}
+        m2 = dict(m1, id='m2', name='web2', address='10.0.0.2')
+        m3 = dict(m1, id='m3', name=None, address='10.0.0.3')
+        self.api_mock.member_iter.side_effect = [
+            iter([m1, m2]),
+            iter([dict(m1, operating_status='ERROR'), m2]),
+            iter([dict(m1, operating_status='ERROR'),
+                  dict(m3, provisioning_status='PENDING_CREATE')]),
+        ]
+        arglist = ['pool_id', '--watch', '--interval', '2', '--count', '3']
+        verifylist = [('watch', True), ('interval', 2), ('count', 3)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        output = self.fake_stdout.make_string().splitlines()
+        self.assertEqual('Watching 2 members of pool pool_id', output[0])
+        self.assertEqual([
+            'm1 web1 10.0.0.1:80 operating_status ONLINE -> ERROR',
+            'm3 - 10.0.0.3:80 added',
+            'm2 web2 10.0.0.2:80 removed',
+        ], [line.split(' ', 1)[1] for line in output[1:]])
+        self.assertEqual(['m1', 'm2', 'm3'],
+                         sorted(row[0] for row in data))
+        self.api_mock.member_iter.assert_called_with(pool_id='pool_id')
+        self.api_mock.member_list.assert_not_called()
+        self.assertEqual(2, mock_sleep.call_count)
+        mock_sleep.assert_called_with(2)
+
+    @mock.patch('octaviaclient.osc.v2.export.write_parquet')
+    @mock.patch('octaviaclient.osc.v2.utils.get_member_attrs')
+    def test_member_list_export(self, mock_attrs, mock_write):
+        mock_attrs.return_value = {'pool_id': 'pool_id'}
+        mock_write.return_value = 0
+        arglist = ['pool_id', '--export', 'members.parquet']
+        verifylist = [('export', 'members.parquet')]
+
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.api_mock.member_iter.assert_called_with(pool_id='pool_id')
+        mock_write.assert_called_with(
+            'members.parquet', self.api_mock.member_iter.return_value,
+            constants.MEMBER_ROWS)
+        self.assertEqual([('members.parquet', 0)], data)
+
 
 class TestCreateMember(TestMember):
 
@@ -12,12 +12,14 @@
 #
 
 import copy
+import fixtures
 import mock
 
 from osc_lib import exceptions
 
 from octaviaclient.osc.v2 import constants
 from octaviaclient.osc.v2 import pool as pool
+from octaviaclient.osc.v2 import utils as v2_utils
 from octaviaclient.tests.unit.osc.v2 import constants as attr_consts
 from octaviaclient.tests.unit.osc.v2 import fakes
 
@@ -58,6 +60,82 @@ class TestPoolList(TestPool):
         self.assertEqual(self.columns, columns)
         self.assertEqual(self.datalist, tuple(data))
 
+    @mock.patch('appdirs.user_cache_dir')
+    def test_pool_list_changes_since(self, mock_cache_dir):
+        mock_cache_dir.return_value = self.useFixture(
+            fixtures.TempDir()).path
+        self.api_mock.endpoint = 'http://example.com/load-balancer'
+        pool_info = dict(self.pool_info, updated_at='2018-01-01T00:00:05')
+        self.api_mock.iter_list.return_value = iter([pool_info])
+        self.api_mock.changes_since.return_value = iter([])
+
+        parsed_args = self.check_parser(
+            self.cmd, ['--changes-since', 'last'],
+            [('changes_since', 'last')])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(self.datalist, tuple(data))
+        self.api_mock.iter_list.assert_called_with('/lbaas/pools', 'pools')
+        self.api_mock.pool_list.assert_not_called()
+
+        # The next listing starts from the newest change
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertEqual((), tuple(data))
+        self.api_mock.changes_since.assert_called_with(
+            'pools', '2018-01-01T00:00:05')
+
+        parsed_args = self.check_parser(
+            self.cmd, ['--changes-since', '2018-01-01 01:00:00+01:00'], [])
+        self.cmd.take_action(parsed_args)
+        self.api_mock.changes_since.assert_called_with(
+            'pools', '2018-01-01T00:00:00')
+
+        parsed_args = self.check_parser(
+            self.cmd, ['--changes-since', 'yesterday'], [])
+        self.assertRaises(exceptions.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+    @mock.patch('appdirs.user_cache_dir')
+    def test_pool_list_from_mirror(self, mock_cache_dir):
+        mock_cache_dir.return_value = self.useFixture(
+            fixtures.TempDir()).path
+        self.api_mock.endpoint = 'http://example.com/load-balancer'
+        lb_id = self.pool_info['loadbalancers'][0]['id']
+        collections = {'pools': [self.pool_info],
+                       'loadbalancers': [{'id': lb_id, 'name': 'lb'}]}
+        self.api_mock.iter_list.side_effect = (
+            lambda path, resource: iter(collections.get(resource, [])))
+        self.api_mock.member_iter.return_value = iter([])
+        local = v2_utils.open_mirror(self.api_mock)
+        local.refresh()
+        local.close()
+
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-mirror', '--loadbalancer', 'lb'],
+            [('from_mirror', True)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(self.datalist, tuple(data))
+        self.api_mock.pool_list.assert_not_called()
+        self.api_mock.load_balancer_list.assert_not_called()
+
+    @mock.patch('octaviaclient.osc.v2.export.write_parquet')
+    def test_pool_list_export(self, mock_write):
+        mock_write.return_value = 1
+        self.api_mock.pool_iter.return_value = iter([self.pool_info])
+        arglist = ['--export', 'pools.parquet']
+        verifylist = [('export', 'pools.parquet')]
+
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.api_mock.pool_iter.assert_called_with()
+        self.api_mock.pool_list.assert_not_called()
+        mock_write.assert_called_with('pools.parquet', mock.ANY,
+                                      constants.POOL_ROWS)
+        self.assertEqual(('path', 'rows'), columns)
+        self.assertEqual([('pools.parquet', 1)], data)
+
 
 class TestPoolDelete(TestPool):
 
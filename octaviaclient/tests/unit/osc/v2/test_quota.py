@@ -12,12 +12,15 @@
 #
 
 import copy
-import mock
+import os
 
+import fixtures
+import mock
 from osc_lib import exceptions
 
 from octaviaclient.osc.v2 import constants
 from octaviaclient.osc.v2 import quota
+from octaviaclient.osc.v2 import utils as v2_utils
 from octaviaclient.tests.unit.osc.v2 import constants as attr_consts
 from octaviaclient.tests.unit.osc.v2 import fakes
 
@@ -59,6 +62,72 @@ class TestQuotaList(TestQuota):
         self.assertEqual(self.datalist, tuple(data))
 
 
+class TestQuotaUsage(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaUsage, self).setUp()
+        self.project_id = self._qt.project_id
+        self.other_project = 'other_project_id'
+        self.api_mock.quota_defaults_show.return_value = {'quota': {
+            'health_monitor': -1, 'listener': 10, 'load_balancer': 2,
+            'member': 100, 'pool': 4}}
+        listings = {
+            'quota_iter': [attr_consts.QUOTA_ATTRS],
+            'load_balancer_iter': [
+                {'project_id': self.project_id},
+                {'project_id': self.project_id},
+                {'project_id': self.project_id},
+                {'project_id': self.other_project}],
+            'listener_iter': [{'project_id': self.project_id}],
+            'pool_iter': [
+                {'project_id': self.project_id,
+                 'members': [{'id': 'm1'}] * 10},
+                {'project_id': self.other_project, 'members': []}],
+            'health_monitor_iter': [],
+        }
+        for method, objects in listings.items():
+            getattr(self.api_mock, method).side_effect = (
+                lambda objects=objects, **kw: iter(objects))
+        self.columns = copy.deepcopy(constants.QUOTA_USAGE_COLUMNS)
+        self.cmd = quota.ListQuotaUsage(self.app, None)
+
+    def test_quota_usage(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(self.columns, columns)
+        self.assertEqual(
+            ((self.project_id, '3/5', '1/10', '1/4', '0/unlimited', '10/50',
+              40),
+             (self.other_project, '1/2', '0/10', '1/4', '0/unlimited',
+              '0/100', 50)),
+            tuple(data))
+        self.api_mock.quota_iter.assert_called_with()
+        self.api_mock.pool_iter.assert_called_with()
+        self.api_mock.pool_list.assert_not_called()
+
+    def test_quota_usage_threshold(self):
+        arglist = ['--threshold', '45']
+        verifylist = [('threshold', 45)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([self.project_id], [row[0] for row in data])
+
+    @mock.patch('octaviaclient.osc.v2.utils.get_quota_attrs')
+    def test_quota_usage_project(self, mock_attrs):
+        mock_attrs.return_value = {'project_id': self.project_id}
+        arglist = ['--project', self.project_id]
+        verifylist = [('project', self.project_id)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+
+        self.api_mock.quota_iter.assert_called_with(
+            project_id=self.project_id)
+        self.api_mock.load_balancer_iter.assert_called_with(
+            project_id=self.project_id)
+
+
 class TestQuotaShow(TestQuota):
 
     def setUp(self):
@@ -198,3 +267,151 @@ class TestQuotaReset(TestQuota):
         self.cmd.take_action(parsed_args)
         self.api_mock.quota_reset.assert_called_with(
             project_id=qt_reset.project_id)
+
+
+class TestQuotaBulk(TestQuota):
+
+    def setUp(self):
+        super(TestQuotaBulk, self).setUp()
+        self.tmp = self.useFixture(fixtures.TempDir()).path
+        projects = []
+        for project_id, name in (('id1', 'alpha'), ('id2', 'beta'),
+                                 ('id3', 'dup'), ('id4', 'dup')):
+            project = mock.Mock(id=project_id)
+            project.name = name
+            projects.append(project)
+        self.identity = mock.Mock()
+        self.identity.projects.list.return_value = projects
+        self.app.client_manager.identity = self.identity
+        self.columns = copy.deepcopy(constants.QUOTA_BULK_COLUMNS)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_quota_bulk_set_csv(self):
+        path = self._write('quotas.csv',
+                           'project,loadbalancer,member,pool\n'
+                           'alpha,10,,5\n'
+                           'id2,-1,100,\n'
+                           'dup,1,,\n'
+                           'gamma,1,,\n')
+        cmd = quota.BulkSetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path], [('file', path)])
+        columns, data = cmd.take_action(parsed_args)
+
+        self.assertEqual(self.columns, columns)
+        data = tuple(data)
+        self.assertEqual(('alpha', 'id1', 'OK'), data[0])
+        self.assertEqual(('id2', 'id2', 'OK'), data[1])
+        self.assertEqual(('dup', None), data[2][:2])
+        self.assertIn('More than one project', data[2][2])
+        self.assertEqual(('gamma', None), data[3][:2])
+        self.assertIn('No project', data[3][2])
+        self.identity.projects.list.assert_called_once_with()
+        self.assertEqual('id1', v2_utils.project_cache(self.identity).get(
+            'alpha'))
+        self.assertIsNone(v2_utils.project_cache(self.identity).get('dup'))
+        self.api_mock.quota_set.assert_has_calls([
+            mock.call('id1', json={'quota': {'load_balancer': 10,
+                                             'pool': 5}}),
+            mock.call('id2', json={'quota': {'load_balancer': -1,
+                                             'member': 100}}),
+        ], any_order=True)
+        self.assertEqual(2, self.api_mock.quota_set.call_count)
+
+    def test_quota_bulk_set_yaml(self):
+        path = self._write('quotas.yaml',
+                           'alpha:\n'
+                           '  healthmonitor: 3\n'
+                           'beta:\n'
+                           '  listener: 4\n')
+        cmd = quota.BulkSetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path], [('file', path)])
+        columns, data = cmd.take_action(parsed_args)
+
+        self.assertEqual([('alpha', 'id1', 'OK'), ('beta', 'id2', 'OK')],
+                         sorted(data))
+        self.api_mock.quota_set.assert_has_calls([
+            mock.call('id1', json={'quota': {'health_monitor': 3}}),
+            mock.call('id2', json={'quota': {'listener': 4}}),
+        ], any_order=True)
+
+    def test_quota_bulk_set_error(self):
+        self.api_mock.quota_set.side_effect = exceptions.CommandError(
+            'Forbidden')
+        path = self._write('quotas.yaml', '- project: alpha\n  pool: 1\n')
+        cmd = quota.BulkSetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path], [('file', path)])
+        columns, data = cmd.take_action(parsed_args)
+
+        self.assertEqual((('alpha', 'id1', 'Forbidden'),), tuple(data))
+
+    def test_quota_bulk_set_unknown_quota(self):
+        path = self._write('quotas.yaml', 'alpha:\n  router: 1\n')
+        cmd = quota.BulkSetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path], [('file', path)])
+        self.assertRaises(exceptions.CommandError, cmd.take_action,
+                          parsed_args)
+        self.api_mock.quota_set.assert_not_called()
+
+    def test_quota_bulk_reset(self):
+        path = self._write('projects.yaml', '- alpha\n- beta\n')
+        cmd = quota.BulkResetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path], [('file', path)])
+        columns, data = cmd.take_action(parsed_args)
+
+        self.assertEqual((('alpha', 'id1', 'OK'), ('beta', 'id2', 'OK')),
+                         tuple(data))
+        self.api_mock.quota_reset.assert_has_calls([
+            mock.call(project_id='id1'), mock.call(project_id='id2')],
+            any_order=True)
+
+    def test_quota_bulk_reset_dry_run(self):
+        plan = mock.MagicMock()
+        plan.format.return_value = ['DELETE /v2/lbaas/quotas/id1']
+        self.api_mock.planning = mock.MagicMock()
+        self.api_mock.planning.return_value.__enter__.return_value = plan
+        path = self._write('projects.yaml', '- alpha\n')
+        cmd = quota.BulkResetQuota(self.app, None)
+        parsed_args = self.check_parser(cmd, [path, '--dry-run'],
+                                        [('dry_run', True)])
+        cmd.take_action(parsed_args)
+
+        self.api_mock.planning.assert_called_once_with()
+        self.assertIn('DELETE /v2/lbaas/quotas/id1',
+                      self.fake_stdout.make_string())
+
+    def test_quota_bulk_requires_apply(self):
+        self.assertRaises(TypeError, quota._BulkQuotaCommand, self.app, None)
+
+
+class TestProjectCache(TestQuota):
+
+    @mock.patch('openstackclient.identity.common.find_project')
+    def test_project_cache(self, mock_find):
+        mock_find.return_value = mock.Mock(id='project_id')
+        identity = self.app.client_manager.identity
+        for _ in range(2):
+            self.assertEqual('project_id', v2_utils.get_resource_id(
+                identity, 'project', 'project_name'))
+            self.assertEqual('project_id', v2_utils.get_resource_id(
+                identity, 'project', 'project_id'))
+        mock_find.assert_called_once_with(identity, 'project_name')
+
+    @mock.patch('appdirs.user_cache_dir')
+    @mock.patch('openstackclient.identity.common.find_project')
+    def test_project_cache_file(self, mock_find, mock_dir):
+        mock_dir.return_value = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_LOADBALANCER_PROJECT_CACHE', 'true'))
+        mock_find.return_value = mock.Mock(id='project_id')
+        identity = self.app.client_manager.identity
+        v2_utils.get_resource_id(identity, 'project', 'project_name')
+
+        v2_utils._project_caches.clear()
+        self.assertEqual('project_id', v2_utils.get_resource_id(
+            identity, 'project', 'project_name'))
+        mock_find.assert_called_once_with(identity, 'project_name')
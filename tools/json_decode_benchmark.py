@@ -0,0 +1,82 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Benchmark the decoding of large load balancer list responses
+
+Compares json, the fast decoder picked by octaviaclient when one is
+installed, and the streamed decoding of list pages. With the client
+installed:
+
+    python tools/json_decode_benchmark.py [items] [repeat]
+"""
+
+from __future__ import print_function
+
+import json
+import sys
+import timeit
+import uuid
+
+from octaviaclient.api.v2 import decoder
+
+
+def payload(count):
+    loadbalancers = []
+    for i in range(count):
+        loadbalancers.append({
+            'id': str(uuid.uuid4()),
+            'name': 'lb-%06d' % i,
+            'description': '',
+            'project_id': uuid.uuid4().hex,
+            'provisioning_status': 'ACTIVE',
+            'operating_status': 'ONLINE',
+            'admin_state_up': True,
+            'provider': 'amphora',
+            'flavor_id': None,
+            'vip_address': '10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255,
+                                            i & 255),
+            'vip_port_id': str(uuid.uuid4()),
+            'vip_subnet_id': str(uuid.uuid4()),
+            'vip_network_id': str(uuid.uuid4()),
+            'vip_qos_policy_id': None,
+            'listeners': [{'id': str(uuid.uuid4())}],
+            'pools': [{'id': str(uuid.uuid4())}, {'id': str(uuid.uuid4())}],
+            'created_at': '2019-01-01T00:00:00',
+            'updated_at': '2019-01-02T00:00:00',
+            'tags': [],
+        })
+    return json.dumps({'loadbalancers': loadbalancers,
+                       'loadbalancers_links': []}).encode('utf-8')
+
+
+def main(count=100000, repeat=3):
+    data = payload(count)
+    print('%d load balancers, %.1f MiB' % (count, len(data) / 1048576.0))
+
+    def streamed():
+        chunks = (data[i:i + decoder.CHUNK_SIZE]
+                  for i in range(0, len(data), decoder.CHUNK_SIZE))
+        for _ in decoder.iter_items(chunks, 'loadbalancers'):
+            pass
+
+    cases = [('json', lambda: json.loads(data))]
+    if decoder.loads is not json.loads:
+        cases.append((decoder.loads.__module__, lambda: decoder.loads(data)))
+    cases.append(('streamed', streamed))
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print('%-12s %8.3fs' % (name, best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])